@@ -0,0 +1,160 @@
+"""
+Prompt size & latency of the application materials calls, with every
+applicant info item vs only the ones core.applicant_index retrieves
+
+Generates one applicant with a long history spread over a few fields and
+job descriptions from each field, then writes materials for every job both
+ways through AppAgent with a fake model whose latency grows with the prompt
+(--ms-per-1k-tokens). Reports tokens, latency & how many of the retrieved
+experience / project items are from the job's field.
+
+usage: python scripts/bench_applicant_info.py [--items 80] [--jobs 12] [--ms-per-1k-tokens 400]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from langchain_core.messages import AIMessage
+
+from core.applicant_index import UserIndex, format_info
+from core.description import estimate_tokens
+from core.models import ApplicantInfo, ApplicantInfoType
+from services.apply import apply
+
+FIELDS = {
+    "ml": "pytorch llm training inference embeddings rag evaluation fine-tuning gpu transformers",
+    "web": "react typescript node.js css accessibility frontend graphql nextjs browser",
+    "devops": "kubernetes terraform aws ci pipelines observability prometheus helm docker",
+    "data": "spark airflow sql warehouse dbt etl kafka analytics snowflake",
+    "security": "threat modeling pentest siem incident response iam zero-trust soc",
+}
+FILLER = (
+    "led a team delivered the project on time improved reliability worked with "
+    "stakeholders owned the roadmap mentored engineers shipped features"
+).split()
+
+
+def make_items(n: int, rng: random.Random):
+    """[(field or None, ApplicantInfo)] for one applicant"""
+    items = []
+    kinds = [ApplicantInfoType.PAST_EXPERIENCE] * 6 + [ApplicantInfoType.PROJECT] * 3
+    for i in range(n):
+        field = rng.choice(list(FIELDS))
+        words = rng.sample(FIELDS[field].split(), 5) + rng.sample(FILLER, 10)
+        rng.shuffle(words)
+        items.append(
+            (
+                field,
+                ApplicantInfo(
+                    id=i + 1,
+                    info_type=rng.choice(kinds),
+                    title=f"role {i}",
+                    content=" ".join(words * 3),
+                    user_id=1,
+                ),
+            )
+        )
+    items.append(
+        (
+            None,
+            ApplicantInfo(
+                id=n + 1,
+                info_type=ApplicantInfoType.EDUCATION,
+                title="BSc Computer Science",
+                content="state university, graduated with honors",
+                user_id=1,
+            ),
+        )
+    )
+    return items
+
+
+def make_job(field: str, rng: random.Random) -> str:
+    words = rng.sample(FIELDS[field].split(), 6) + rng.sample(FILLER, 8)
+    return f"We are hiring a {field} engineer. " + " ".join(words * 4)
+
+
+class ProportionalLatencyLLM:
+    """Answers after base + per-token latency on the prompt it's given"""
+
+    def __init__(self, base_ms: float, ms_per_1k_tokens: float):
+        self.base_ms = base_ms
+        self.ms_per_1k_tokens = ms_per_1k_tokens
+
+    async def ainvoke(self, prompt, **kwargs):
+        tokens = sum(estimate_tokens(str(m.content)) for m in prompt)
+        await asyncio.sleep(
+            (self.base_ms + self.ms_per_1k_tokens * tokens / 1000) / 1000
+        )
+        return AIMessage(content="ok")
+
+
+async def write(app_agent, job: str, applicant_info: str) -> float:
+    started = time.perf_counter()
+    await app_agent.awrite_materials(job, applicant_info)
+    return time.perf_counter() - started
+
+
+async def run(args) -> None:
+    rng = random.Random(7)
+    items = make_items(args.items, rng)
+    field_of = {info.id: field for field, info in items}
+    id_of = {format_info(info): info.id for _, info in items}
+    all_info = "\n".join(id_of)
+
+    apply.get_llm = lambda role: ProportionalLatencyLLM(  # type: ignore[assignment]
+        args.base_ms, args.ms_per_1k_tokens
+    )
+    app_agent = apply.AppAgent()
+
+    started = time.perf_counter()
+    index = UserIndex([info for _, info in items])
+    index.search("warm up")  # builds the matrix
+    build_ms = (time.perf_counter() - started) * 1000
+
+    rows = []
+    for j in range(args.jobs):
+        field = list(FIELDS)[j % len(FIELDS)]
+        job = make_job(field, rng)
+        started = time.perf_counter()
+        relevant = index.relevant(job)
+        query_ms = (time.perf_counter() - started) * 1000
+        picked = [field_of[id_of[line]] for line in relevant.text.splitlines()]
+        fields = [f for f in picked if f is not None]
+        rows.append(
+            (
+                relevant.tokens_total,
+                relevant.tokens,
+                await write(app_agent, job, all_info),
+                await write(app_agent, job, relevant.text),
+                query_ms,
+                sum(f == field for f in fields) / max(len(fields), 1),
+            )
+        )
+
+    def mean(column: int) -> float:
+        return statistics.mean(row[column] for row in rows)
+
+    print(f"{len(items)} applicant info items, {args.jobs} jobs")
+    print(f"index build      : {build_ms:.1f}ms, query {mean(4):.2f}ms avg")
+    print(f"applicant tokens : {mean(0):,.0f} all -> {mean(1):,.0f} retrieved")
+    print(f"materials latency: {mean(2):.2f}s all -> {mean(3):.2f}s retrieved")
+    print(f"on-topic share of retrieved experience/projects: {mean(5):.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=80)
+    parser.add_argument("--jobs", type=int, default=12)
+    parser.add_argument("--base-ms", type=float, default=50)
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=400)
+    asyncio.run(run(parser.parse_args()))
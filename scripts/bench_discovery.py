@@ -0,0 +1,83 @@
+"""
+Benchmark sequential vs concurrent source fan-out in JobDiscoveryService
+
+Runs each source against a local stub server with its own latency, so the
+wall-clock difference is just the fan-out (no network, no API key needed).
+
+usage: python scripts/bench_discovery.py [--indeed-delay 1.0] [--remote-delay 0.8] [--serp-delay 1.5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from stub_servers import (
+    StubServer,
+    html_route,
+    indeed_page,
+    json_route,
+    remote_ok_feed,
+    serp_results,
+)
+from core.models import JobSearchQuery
+from services.job_discovery.discover import JobDiscoveryService
+from services.job_discovery.sources.public_scraper import (
+    IndeedSource,
+    PublicJobScraper,
+    RemoteOKSource,
+)
+from services.job_discovery.sources.serp_api import SerpAPIJobSearch, SerpAPISource
+
+
+def build_service(indeed, remote_ok, serp, concurrent: bool) -> JobDiscoveryService:
+    service = JobDiscoveryService(concurrent=concurrent)
+    scraper = PublicJobScraper(
+        indeed_url=f"{indeed.url}/jobs", remote_ok_url=f"{remote_ok.url}/api"
+    )
+    searcher = SerpAPIJobSearch(api_key="bench")
+    searcher.base_url = f"{serp.url}/search"
+    service.sources = [
+        ("indeed", IndeedSource(scraper)),
+        ("remote_ok", RemoteOKSource(scraper)),
+        ("serp_api", SerpAPISource(searcher)),
+    ]
+    return service
+
+
+def run(args) -> None:
+    query = JobSearchQuery(keywords="AI Engineer", location="Remote", max_results=100)
+    with (
+        StubServer(
+            {"/jobs": html_route(indeed_page(20))}, delay=args.indeed_delay
+        ) as indeed,
+        StubServer(
+            {"/api": json_route(remote_ok_feed(500))}, delay=args.remote_delay
+        ) as remote_ok,
+        StubServer(
+            {"/search": json_route(serp_results(20))}, delay=args.serp_delay
+        ) as serp,
+    ):
+        for label, concurrent in (("sequential", False), ("concurrent", True)):
+            timings = []
+            for _ in range(args.repeat):
+                service = build_service(indeed, remote_ok, serp, concurrent)
+                start = time.perf_counter()
+                jobs = service.search_jobs(query)
+                timings.append(time.perf_counter() - start)
+            best = min(timings)
+            print(f"{label:>10}: {best:.2f}s best of {args.repeat} ({len(jobs)} jobs)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--indeed-delay", type=float, default=1.0)
+    parser.add_argument("--remote-delay", type=float, default=0.8)
+    parser.add_argument("--serp-delay", type=float, default=1.5)
+    parser.add_argument("--repeat", type=int, default=3)
+    run(parser.parse_args())
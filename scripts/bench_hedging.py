@@ -0,0 +1,133 @@
+"""
+Tail latency & extra requests of routed LLM calls with & without hedging
+
+Two fake Ollama servers (a primary & a backup route) answer /api/chat
+after a heavy-tailed, Pareto distributed delay. The same calls go through
+a RoutedLLM with hedging off, hedging on the same route & hedging on the
+backup route; route stats are reset per run & the first --warmup calls
+(which fill the rolling p95) aren't measured.
+
+usage: python scripts/bench_hedging.py [--calls 400] [--concurrency 8] [--scale-ms 50] [--alpha 1.5] [--max-extra 0.1]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from langchain_core.messages import HumanMessage
+from langchain_ollama import ChatOllama
+
+from core import llm_routing
+from core.llm_routing import Route, RouteStats, RoutedLLM
+from stub_servers import StubServer
+
+ANSWER = (
+    json.dumps(
+        {
+            "model": "fake",
+            "created_at": "2025-01-01T00:00:00Z",
+            "message": {"role": "assistant", "content": "ok"},
+            "done": True,
+            "done_reason": "stop",
+        }
+    )
+    + "\n"
+).encode()
+
+
+def fake_ollama(scale_ms: float, alpha: float, max_ms: float, seed: int):
+    """/api/chat route answering after min(Pareto(alpha) * scale, max) ms"""
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    def chat(path: str):
+        with lock:
+            delay_ms = min(scale_ms * rng.paretovariate(alpha), max_ms)
+        time.sleep(delay_ms / 1000)
+        return 200, {"Content-Type": "application/x-ndjson"}, ANSWER
+
+    return {"/api/chat": chat}
+
+
+def quantile(latencies, q: float) -> float:
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(args, servers, hedge: bool, target: str) -> None:
+    llm_routing.route_stats = RouteStats()
+    llm_routing.LLM_HEDGE_TARGET = target
+    routes = [Route("ollama", "fake"), Route("ollama", "fake-backup")]
+    clients = [
+        ChatOllama(base_url=server.url, model=route.model, cache=False)
+        for server, route in zip(servers, routes)
+    ]
+    llm = RoutedLLM("summary", routes, clients, budget=60.0, hedge=hedge)
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def call(i: int) -> float:
+        async with limit:
+            started = time.perf_counter()
+            await llm.ainvoke([HumanMessage(content=f"summarize job {i}")])
+            return time.perf_counter() - started
+
+    await asyncio.gather(*(call(i) for i in range(args.warmup)))
+    requests = sum(server.requests for server in servers)
+    latencies = await asyncio.gather(*(call(i) for i in range(args.calls)))
+    extra = sum(server.requests for server in servers) - requests - args.calls
+
+    hedging = llm_routing.route_stats.hedges.get("summary", {})
+    label = f"hedge {target}" if hedge else "no hedging"
+    print(
+        f"{label:<14}: p50 {quantile(latencies, 0.5) * 1000:5.0f}ms  "
+        f"p95 {quantile(latencies, 0.95) * 1000:5.0f}ms  "
+        f"p99 {quantile(latencies, 0.99) * 1000:5.0f}ms  "
+        f"mean {statistics.mean(latencies) * 1000:5.0f}ms  "
+        f"extra requests {extra / args.calls:5.1%}  "
+        f"({hedging.get('won', 0)} hedges won)"
+    )
+
+
+async def main(args) -> None:
+    llm_routing.LLM_HEDGE_MAX_EXTRA = args.max_extra
+    llm_routing.HEDGE_MIN_DELAY = 0.0
+    servers = [
+        StubServer(fake_ollama(args.scale_ms, args.alpha, args.max_ms, seed))
+        for seed in (1, 2)
+    ]
+    for server in servers:
+        server.__enter__()
+    try:
+        print(
+            f"{args.calls} calls, {args.concurrency} at a time, Pareto(alpha="
+            f"{args.alpha}) latency x {args.scale_ms:.0f}ms, hedges capped at "
+            f"{args.max_extra:.0%}"
+        )
+        await run(args, servers, hedge=False, target="same")
+        await run(args, servers, hedge=True, target="same")
+        await run(args, servers, hedge=True, target="backup")
+    finally:
+        for server in servers:
+            server.__exit__()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scale-ms", type=float, default=50)
+    parser.add_argument("--alpha", type=float, default=1.5)
+    parser.add_argument("--max-ms", type=float, default=5000)
+    parser.add_argument("--max-extra", type=float, default=0.1)
+    asyncio.run(main(parser.parse_args()))
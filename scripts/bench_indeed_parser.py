@@ -0,0 +1,144 @@
+"""
+Benchmark the Indeed results-page parsers: cards parsed per second & peak memory
+
+Parses saved Indeed pages (or generated ones) with every installed backend,
+plus the original full-tree BeautifulSoup + lambda parser as a baseline.
+Each backend runs in a fresh subprocess so peak RSS isn't shared.
+
+usage: python scripts/bench_indeed_parser.py [--pages saved/*.html] [--rounds 20]
+"""
+
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from stub_servers import indeed_page
+from services.job_discovery.sources.indeed_parser import (
+    IndeedCard,
+    available_parsers,
+    get_parser,
+)
+
+BASELINE = "baseline"
+
+
+class BaselineParser:
+    """The pre-backend parser: whole page via html.parser, lambda class matches"""
+
+    name = BASELINE
+
+    def parse(self, content: bytes, max_results: int = 10):
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(content, "html.parser")
+        job_cards = soup.find_all(
+            "div", {"class": lambda x: x and "job_seen_beacon" in x}
+        )
+        for card in job_cards[:max_results]:
+            title = card.find("a", {"data-jk": True})
+            elems = [
+                card.find(tag, {"class": lambda x, part=part: x and part in x})
+                for tag, part in (
+                    ("span", "companyName"),
+                    ("div", "companyLocation"),
+                    ("div", "summary"),
+                    ("span", "date"),
+                )
+            ]
+            yield IndeedCard(
+                title.get_text(strip=True) if title else None,
+                title.get("href") if title else None,
+                *(elem.get_text(strip=True) if elem else None for elem in elems),
+            )
+
+
+def load_pages(patterns, num_pages: int, cards: int) -> list:
+    paths = [path for pattern in patterns or [] for path in glob.glob(pattern)]
+    if paths:
+        pages = []
+        for path in paths:
+            with open(path, "rb") as f:
+                pages.append(f.read())
+        return pages
+    return [indeed_page(cards, i * cards).encode() for i in range(num_pages)]
+
+
+def run_backend(name: str, pages: list, rounds: int) -> dict:
+    parser = BaselineParser() if name == BASELINE else get_parser(name)
+    list(parser.parse(pages[0], 1000))  # warm up imports & compiled selectors
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    tracemalloc.start()
+    cards = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for page in pages:
+            cards += sum(1 for _ in parser.parse(page, 1000))
+    elapsed = time.perf_counter() - started
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "backend": name,
+        "cards": cards,
+        "seconds": elapsed,
+        "cards_per_s": cards / elapsed,
+        "py_peak_kb": py_peak / 1024,
+        "rss_growth_kb": rss_after - rss_before,  # linux reports KB
+        "output": [list(card) for card in parser.parse(pages[0], 1000)],
+    }
+
+
+def run(args) -> None:
+    backends = [BASELINE] + available_parsers()
+    results = []
+    for name in backends:
+        cmd = [sys.executable, __file__, "--child", name, "--rounds", str(args.rounds)]
+        cmd += ["--num-pages", str(args.num_pages), "--cards", str(args.cards)]
+        if args.pages:
+            cmd += ["--pages", *args.pages]
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout))
+
+    baseline = results[0]
+    print(
+        f"{len(load_pages(args.pages, args.num_pages, args.cards))} pages x {args.rounds} rounds"
+    )
+    print(
+        f"{'backend':<12}{'cards/s':>10}{'speedup':>9}{'py peak KB':>12}"
+        f"{'rss +KB':>10}  same output"
+    )
+    for r in results:
+        print(
+            f"{r['backend']:<12}{r['cards_per_s']:>10.0f}"
+            f"{r['cards_per_s'] / baseline['cards_per_s']:>8.1f}x"
+            f"{r['py_peak_kb']:>12.0f}{r['rss_growth_kb']:>10}"
+            f"  {r['output'] == baseline['output']}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", nargs="*", help="saved Indeed result pages")
+    parser.add_argument("--num-pages", type=int, default=20)
+    parser.add_argument("--cards", type=int, default=15)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        pages = load_pages(args.pages, args.num_pages, args.cards)
+        print(json.dumps(run_backend(args.child, pages, args.rounds)))
+    else:
+        run(args)
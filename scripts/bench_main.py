@@ -0,0 +1,205 @@
+"""
+Benchmark the whole main() pipeline offline by replaying a recorded archive
+
+  record      run discovery against the live sites, saving every response
+  synthesize  build an archive from canned pages (no network needed)
+  run         replay the archive into main() at each --latency (ms), with a
+              fresh temp database & fixed-delay stand-ins for the LLM agents
+
+usage:
+  python scripts/bench_main.py record [--archive a.jsonl.gz]
+  python scripts/bench_main.py synthesize [--archive a.jsonl.gz]
+  python scripts/bench_main.py run [--archive a.jsonl.gz] [--latency 0 200 1000] [--jitter 100]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+os.environ["HTTP_CACHE_DISABLED"] = "1"  # replay every request, don't cache it
+os.environ["LLM_CACHE_DISABLED"] = "1"  # the agents are stand-ins anyway
+os.environ["LLM_WARM_UP"] = "0"
+os.environ.setdefault("SERP_API_KEY", "offline")  # not part of archived keys
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "src"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from stub_servers import indeed_page, remote_ok_feed, serp_results
+from services.job_discovery.discover import JobDiscoveryService, ai_engineer_query
+from services.job_discovery.http_cache import CachedResponse
+from services.job_discovery.transport import (
+    DISCOVERY_ARCHIVE,
+    RecordingTransport,
+    configure_transport,
+    set_transport,
+)
+
+
+async def discover_all() -> int:
+    service = JobDiscoveryService()
+    return sum(
+        [len(batch) async for batch in service.astream_batches(ai_engineer_query())]
+    )
+
+
+class CannedSession:
+    """Answers each source's requests with generated pages"""
+
+    def get(self, url, params=None, **kwargs):
+        params = params or {}
+        host = urlsplit(url).hostname or ""
+        if "indeed" in host:
+            start = int(params.get("start", 0))
+            body = indeed_page(15, start).encode()
+            return CachedResponse(url, 200, {"Content-Type": "text/html"}, body)
+        if "remoteok" in host:
+            body = json_bytes(remote_ok_feed(500))
+        elif "serpapi" in host:
+            page = int(params.get("next_page_token") or 0)
+            data = serp_results(10, str(page + 1) if page < 2 else None)
+            for job in data["jobs_results"]:
+                job["title"] += f" (page {page})"
+                job["share_link"] += f"&page={page}"
+            body = json_bytes(data)
+        else:
+            return CachedResponse(url, 404, {}, b"")
+        return CachedResponse(url, 200, {"Content-Type": "application/json"}, body)
+
+
+def json_bytes(data) -> bytes:
+    return json.dumps(data).encode()
+
+
+class CannedRecorder(RecordingTransport):
+    def get(self, session, url, params=None, **kwargs):
+        return super().get(CannedSession(), url, params=params, **kwargs)
+
+
+def record(args) -> None:
+    transport = configure_transport("record", args.archive)
+    print(f"Discovered {asyncio.run(discover_all())} postings")
+    transport.save()
+
+
+def synthesize(args) -> None:
+    transport = set_transport(CannedRecorder(args.archive))
+    print(f"Discovered {asyncio.run(discover_all())} postings")
+    transport.save()
+
+
+def patch_pipeline(llm_delay: float):
+    """Temp sqlite db + LLM agents that answer after a fixed delay"""
+    from sqlmodel import create_engine
+    import core.db
+    import main
+    from core.llm import llm_concurrency
+    from core.models import CompanyInfo, ExperienceLevel, JobSummary, JobType
+    from services.company_review import review
+    from services.job_discovery.sources import remote_ok_index
+
+    def fixed_summary() -> JobSummary:
+        return JobSummary(
+            salary_range="not listed",
+            job_type=JobType.NOT_LISTED,
+            experience_level=ExperienceLevel.NOT_LISTED,
+            standout_features="-",
+            qualifications="-",
+        )
+
+    class FixedDelaySummaryAgent:
+        max_concurrency = llm_concurrency()
+        map_reduced = 0
+
+        def summarize_job(self, job_description=None) -> JobSummary:
+            time.sleep(llm_delay)
+            return fixed_summary()
+
+        async def asummarize_jobs(self, job_descriptions, max_concurrency=None):
+            limit = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+            async def summarize(i):
+                async with limit:
+                    await asyncio.sleep(llm_delay)
+                    return i, fixed_summary()
+
+            tasks = [summarize(i) for i in range(len(job_descriptions))]
+            for done in asyncio.as_completed(tasks):
+                yield await done
+
+    class FixedDelayReviewAgent:
+        def review_company(self, company_name=None) -> CompanyInfo:
+            time.sleep(llm_delay)
+            return self.company_info(company_name)
+
+        async def areview_company(self, company_name=None) -> CompanyInfo:
+            await asyncio.sleep(llm_delay)
+            return self.company_info(company_name)
+
+        @staticmethod
+        def company_info(company_name) -> CompanyInfo:
+            return CompanyInfo(
+                name=company_name or "",
+                **{
+                    field: "-"
+                    for field in (
+                        "overview",
+                        "products_services",
+                        "size_locations",
+                        "culture",
+                        "recent_news",
+                        "appeal_to_applicants",
+                        "potential_concerns",
+                    )
+                },
+            )
+
+    db_dir = tempfile.mkdtemp(prefix="bench_main_")
+    core.db.engine = create_engine(
+        f"sqlite:///{os.path.join(db_dir, 'job_search.db')}",
+        connect_args={"check_same_thread": False},
+    )
+    # every run downloads (replays) the Remote OK feed again
+    remote_ok_index._snapshots.clear()
+    main.SummaryAgent = FixedDelaySummaryAgent
+    review.ReviewAgent = FixedDelayReviewAgent
+    return main
+
+
+def run(args) -> None:
+    print(f"{'latency':>8}{'jitter':>8}{'wall s':>9}  counters")
+    for latency in args.latency:
+        transport = configure_transport(
+            "replay",
+            args.archive,
+            latency=latency / 1000,
+            jitter=args.jitter / 1000,
+            seed=args.seed,
+        )
+        main = patch_pipeline(args.llm_delay)
+        started = time.perf_counter()
+        report = main.main()
+        elapsed = time.perf_counter() - started
+        counters = ", ".join(
+            f"{k}={v}"
+            for k, v in sorted(report.counters.items())
+            if k.startswith("postings") or k.startswith("llm")
+        )
+        print(f"{latency:>7}ms{args.jitter:>6}ms{elapsed:>9.2f}  {counters}")
+        print(f"{'':>25}{transport.summary()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("mode", choices=["record", "synthesize", "run"])
+    parser.add_argument("--archive", default=DISCOVERY_ARCHIVE)
+    parser.add_argument("--latency", type=float, nargs="+", default=[0, 200, 1000])
+    parser.add_argument("--jitter", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-delay", type=float, default=0.05)
+    args = parser.parse_args()
+    {"record": record, "synthesize": synthesize, "run": run}[args.mode](args)
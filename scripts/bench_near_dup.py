@@ -0,0 +1,93 @@
+"""
+Precision / recall & throughput of MinHash-LSH near-duplicate detection
+
+Generates a synthetic set of postings where a share are lightly edited
+copies of earlier ones (reworded title, changed company suffix, a few
+words swapped), then streams them through the LSH index the way main()
+does: query for a canonical posting, then add.
+
+usage: python scripts/bench_near_dup.py [--n 100000] [--dup-rate 0.3] [--edit-rate 0.05]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from core.near_dup import LSHIndex, MinHasher
+
+TITLE_VARIANTS = [("Senior", "Sr."), ("Engineer", "Eng."), ("AI", "A.I.")]
+
+
+def make_postings(n: int, dup_rate: float, edit_rate: float, seed: int = 7):
+    """[(group_id, description)] with each duplicate after its original"""
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(20_000)]
+    originals = []
+    postings = []
+    for _ in range(n):
+        if originals and rng.random() < dup_rate:
+            group, words = rng.choice(originals)
+            words = [
+                rng.choice(vocab) if rng.random() < edit_rate else w for w in words
+            ]
+            title = "Senior AI Engineer"
+            for long, short in TITLE_VARIANTS:
+                if rng.random() < 0.5:
+                    title = title.replace(long, short)
+            company = rng.choice(["Acme", "Acme Inc.", "ACME, LLC"])
+        else:
+            group = len(originals)
+            words = [rng.choice(vocab) for _ in range(rng.randint(150, 400))]
+            originals.append((group, words))
+            title, company = "Senior AI Engineer", "Acme"
+        postings.append((group, f"<h2>{title}</h2><p>{company}</p> " + " ".join(words)))
+    return postings
+
+
+def run(args) -> None:
+    start = time.perf_counter()
+    postings = make_postings(args.n, args.dup_rate, args.edit_rate)
+    print(f"generated {len(postings)} postings in {time.perf_counter() - start:.1f}s")
+
+    hasher = MinHasher()
+    start = time.perf_counter()
+    signatures = [hasher.signature(text) for _, text in postings]
+    sig_time = time.perf_counter() - start
+
+    index = LSHIndex()
+    seen_groups = set()
+    true_pos = false_pos = actual_dups = 0
+    start = time.perf_counter()
+    for key, ((group, _), signature) in enumerate(zip(postings, signatures)):
+        is_dup = group in seen_groups
+        actual_dups += is_dup
+        match = index.query(signature)  # type: ignore[arg-type]
+        if match:
+            if postings[match[0]][0] == group:  # type: ignore[index]
+                true_pos += 1
+            else:
+                false_pos += 1
+        index.add(key, signature)  # type: ignore[arg-type]
+        seen_groups.add(group)
+    lsh_time = time.perf_counter() - start
+
+    predicted = true_pos + false_pos
+    print(f"duplicates: {actual_dups}, flagged: {predicted}")
+    print(f"precision: {true_pos / predicted if predicted else 1:.4f}")
+    print(f"recall   : {true_pos / actual_dups if actual_dups else 1:.4f}")
+    print(f"signatures: {len(postings) / sig_time:,.0f} postings/s")
+    print(f"lsh query+add: {len(postings) / lsh_time:,.0f} postings/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dup-rate", type=float, default=0.3)
+    parser.add_argument("--edit-rate", type=float, default=0.05)
+    run(parser.parse_args())
@@ -0,0 +1,112 @@
+"""
+Benchmark Remote OK per-query download + linear scan vs the indexed snapshot
+
+Serves a recorded feed (or a generated 10k-item one) from a local stub
+server, then answers the same keyword queries both ways.
+
+usage: python scripts/bench_remote_ok.py [--feed recorded_feed.json] [--items 10000] [--save out.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+os.environ["HTTP_CACHE_DISABLED"] = "1"  # measure the source, not the http cache
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from stub_servers import StubServer, json_route, remote_ok_feed
+from services.job_discovery.sources.public_scraper import PublicJobScraper
+from services.job_discovery.sources.remote_ok_index import RemoteOKIndex
+
+QUERIES = [
+    "AI Engineer",
+    "python",
+    "golang",
+    "react",
+    "devops",
+    "machine learning",
+    "backend developer",
+    "ml",
+    "data engineer",
+    "rust",
+    "llm",
+    "engineer",
+]
+TAGS = [
+    "python", "ai", "ml", "llm", "engineer", "react", "golang", "devops", "rust",
+    "data", "backend", "frontend", "typescript", "kubernetes", "aws", "security",
+]  # fmt: skip
+
+
+def ms(seconds: float) -> str:
+    return f"{seconds * 1000:.3f}ms"
+
+
+def run(args) -> None:
+    if args.feed:
+        with open(args.feed) as f:
+            feed = json.load(f)
+    else:
+        feed = remote_ok_feed(args.items, seed_tags=TAGS)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(feed, f)
+    print(f"feed: {len(feed) - 1} items, {len(json.dumps(feed)) / 1e6:.1f}MB")
+
+    with StubServer({"/api": json_route(feed)}) as server:
+        scraper = PublicJobScraper(remote_ok_url=f"{server.url}/api")
+
+        # today: download + parse + scan for every query
+        per_query = []
+        for q in QUERIES:
+            start = time.perf_counter()
+            data = scraper.fetch_remote_ok_feed()
+            list(scraper.parse_remote_ok_jobs(data, q, args.max_results))
+            per_query.append(time.perf_counter() - start)
+
+        # scan only, feed already in memory
+        scan_only = []
+        for q in QUERIES:
+            start = time.perf_counter()
+            list(scraper.parse_remote_ok_jobs(data, q, args.max_results))
+            scan_only.append(time.perf_counter() - start)
+
+        # snapshot: one download + index build, then index lookups
+        start = time.perf_counter()
+        index = RemoteOKIndex(scraper.fetch_remote_ok_feed())
+        build = time.perf_counter() - start
+        lookups = []
+        for _ in range(args.repeat):
+            for q in QUERIES:
+                start = time.perf_counter()
+                index.search(q, args.max_results)
+                lookups.append(time.perf_counter() - start)
+
+    print(f"download+scan per query: median {ms(statistics.median(per_query))}")
+    print(f"scan per query (in mem): median {ms(statistics.median(scan_only))}")
+    print(f"snapshot build (once)  : {ms(build)}")
+    print(
+        f"index lookup per query : median {ms(statistics.median(lookups))}, "
+        f"max {ms(max(lookups))}"
+    )
+    total_today = sum(per_query)
+    total_snapshot = build + sum(lookups) / args.repeat
+    print(
+        f"{len(QUERIES)} queries total: {ms(total_today)} today vs {ms(total_snapshot)} snapshot"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--feed", help="recorded /api feed (json) to replay")
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--save", help="write the feed used to this path")
+    parser.add_argument("--max-results", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    run(parser.parse_args())
@@ -0,0 +1,144 @@
+"""
+Local stub HTTP servers + canned payloads for offline benchmarks
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def indeed_page(num_cards: int = 15, offset: int = 0) -> str:
+    """Build an Indeed-like search results page with job cards"""
+    cards = []
+    for i in range(offset, offset + num_cards):
+        cards.append(f"""
+            <div class="cardOutline tapItem"><div class="job_seen_beacon">
+              <h2 class="jobTitle"><a data-jk="jk{i:06d}" href="/viewjob?jk=jk{i:06d}">AI Engineer {i}</a></h2>
+              <span class="companyName">Indeed Co {i}</span>
+              <div class="companyLocation">Remote</div>
+              <div class="job-snippet summary"><ul><li>Build LLM systems {i}</li></ul></div>
+              <span class="date">Posted {i % 30} days ago</span>
+            </div></div>""")
+    nav = "<div>" + "<a href='#'>nav</a>" * 200 + "</div>"
+    return f"<html><head><title>jobs</title></head><body>{nav}{''.join(cards)}{nav}</body></html>"
+
+
+def remote_ok_feed(num_items: int = 100, seed_tags: Optional[List[str]] = None) -> list:
+    """Build a RemoteOK-like /api feed (first item is metadata)"""
+    tags = seed_tags or ["python", "ai", "ml", "engineer", "react", "golang", "devops"]
+    feed: list = [{"legal": "stub feed"}]
+    for i in range(num_items):
+        feed.append(
+            {
+                "id": str(100000 - i),
+                "epoch": 1_700_000_000 - i * 3600,
+                "date": time.strftime(
+                    "%Y-%m-%dT%H:%M:%S+00:00",
+                    time.gmtime(1_700_000_000 - i * 3600),
+                ),
+                "position": ("AI Engineer" if i % 5 == 0 else "Backend Developer")
+                + f" {i}",
+                "company": f"Remote Co {i % 400}",
+                "tags": [tags[i % len(tags)], tags[(i * 3) % len(tags)]],
+                "description": f"<p>Role {i}: work on <b>distributed</b> systems.</p>",
+                "url": f"https://remoteok.io/remote-jobs/{100000 - i}",
+            }
+        )
+    return feed
+
+
+def serp_results(num_results: int = 10, next_page_token: Optional[str] = None) -> dict:
+    """Build a SerpAPI google_jobs response"""
+    data: dict = {
+        "jobs_results": [
+            {
+                "title": f"Machine Learning Engineer {i}",
+                "company_name": f"Serp Co {i}",
+                "location": "New York, NY",
+                "description": f"Serp description {i}",
+                "share_link": f"https://www.google.com/search?jobs={i}",
+                "job_id": f"serp{i}",
+                "detected_extensions": {"posted_at": f"{i + 1} days ago"},
+            }
+            for i in range(num_results)
+        ]
+    }
+    if next_page_token:
+        data["serpapi_pagination"] = {"next_page_token": next_page_token}
+    return data
+
+
+# handler(path_with_query) -> (status, headers, body)
+Route = Callable[[str], Tuple[int, Dict[str, str], bytes]]
+
+
+class StubServer:
+    """
+    Serves fixed routes (GET or POST) on 127.0.0.1 with an artificial
+    per-request delay.
+    Use as a context manager; `url` is the server root.
+    """
+
+    def __init__(self, routes: Dict[str, Route], delay: float = 0.0):
+        self.routes = routes
+        self.delay = delay
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                route = stub.routes.get(self.path.split("?", 1)[0])
+                if route is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                status, headers, body = route(self.path)
+                try:
+                    self.send_response(status)
+                    for k, v in headers.items():
+                        self.send_header(k, v)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up (e.g. a cancelled request)
+
+            def do_POST(self):
+                # request bodies are ignored; routes answer by path
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.do_GET()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StubServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def html_route(body: str) -> Route:
+    payload = body.encode()
+    return lambda path: (200, {"Content-Type": "text/html"}, payload)
+
+
+def json_route(data) -> Route:
+    payload = json.dumps(data).encode()
+    return lambda path: (200, {"Content-Type": "application/json"}, payload)
@@ -0,0 +1,212 @@
+"""
+Retrieval over a user's ApplicantInfo for the application prompts
+
+Each item is a TF-IDF vector (sublinear term frequency, smoothed idf,
+L2-normalized) over that user's items. A job description is scored against
+them by cosine similarity and only the top-k items that fit a token budget
+go into the resume / cover letter prompts. ApplicantInfoRepo keeps the index
+current on add / update / delete; edits made by another process are picked
+up by comparing a cheap stamp of the user's rows
+(see ApplicantInfoRepo.get_stamp).
+"""
+
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from .description import estimate_tokens
+from .models import ApplicantInfo, ApplicantInfoType
+
+APPLICANT_INFO_TOP_K = int(os.getenv("APPLICANT_INFO_TOP_K", "8"))
+APPLICANT_INFO_TOKEN_BUDGET = int(os.getenv("APPLICANT_INFO_TOKEN_BUDGET", "1200"))
+
+# keeps "c++", "c#" & "node.js" whole
+WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our "
+    "that the this to was we were will with you your".split()
+)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [
+        word
+        for word in (w.rstrip(".") for w in WORD_RE.findall((text or "").lower()))
+        if word and word not in STOPWORDS
+    ]
+
+
+def format_info(info: ApplicantInfo) -> str:
+    """How an item reads in the prompt"""
+    heading = info.info_type.display_name
+    if info.title:
+        heading += f" - {info.title}"
+    return f"{heading}: {info.content}"
+
+
+class RelevantInfo(NamedTuple):
+    text: str  # what goes into the prompts
+    items: int
+    items_total: int
+    tokens: int
+    tokens_total: int  # had every item been sent
+
+
+class _Item(NamedTuple):
+    info_type: ApplicantInfoType
+    text: str
+    terms: Counter
+
+
+class UserIndex:
+    """One user's items & their TF-IDF matrix (rebuilt lazily after changes)"""
+
+    def __init__(self, infos: Sequence[ApplicantInfo] = ()):
+        self._items: Dict[int, _Item] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._ids: List[int] = []
+        self._vocab: Dict[str, int] = {}
+        self._idf: Optional[np.ndarray] = None
+        for info in infos:
+            self.upsert(info)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def upsert(self, info: ApplicantInfo) -> None:
+        text = format_info(info)
+        self._items[info.id] = _Item(info.info_type, text, Counter(tokenize(text)))  # type: ignore[index]
+        self._matrix = None
+
+    def remove(self, info_id: int) -> None:
+        if self._items.pop(info_id, None) is not None:
+            self._matrix = None
+
+    def _build(self) -> np.ndarray:
+        self._ids = list(self._items)
+        self._vocab = {}
+        for item in self._items.values():
+            for term in item.terms:
+                self._vocab.setdefault(term, len(self._vocab))
+        counts = np.zeros((len(self._ids), len(self._vocab)), dtype=np.float32)
+        for row, info_id in enumerate(self._ids):
+            for term, count in self._items[info_id].terms.items():
+                counts[row, self._vocab[term]] = count
+        df = np.count_nonzero(counts, axis=0)
+        self._idf = np.log((1 + len(self._ids)) / (1 + df)) + 1
+        weights = np.zeros_like(counts)
+        np.log(counts, out=weights, where=counts > 0)
+        weights = np.where(counts > 0, weights + 1, 0) * self._idf
+        self._matrix = weights / np.maximum(
+            np.linalg.norm(weights, axis=1, keepdims=True), 1e-12
+        )
+        return self._matrix
+
+    def search(self, query: str) -> List[Tuple[int, float]]:
+        """[(info id, cosine similarity)], best first"""
+        matrix = self._matrix if self._matrix is not None else self._build()
+        if not self._ids:
+            return []
+        vector = np.zeros(len(self._vocab), dtype=np.float32)
+        for term, count in Counter(tokenize(query)).items():
+            column = self._vocab.get(term)
+            if column is not None:
+                vector[column] = 1 + math.log(count)
+        vector *= self._idf  # type: ignore[arg-type]
+        norm = np.linalg.norm(vector)
+        scores = matrix @ (vector / norm) if norm else np.zeros(len(self._ids))
+        order = np.argsort(-scores, kind="stable")
+        return [(self._ids[i], float(scores[i])) for i in order]
+
+    def relevant(
+        self,
+        query: str,
+        top_k: int = APPLICANT_INFO_TOP_K,
+        token_budget: int = APPLICANT_INFO_TOKEN_BUDGET,
+    ) -> RelevantInfo:
+        """
+        The best matching items that fit the budget. The top item of each
+        type goes first, so a resume never loses e.g. education entirely
+        to more on-topic projects.
+        """
+        ranked = [info_id for info_id, _ in self.search(query)]
+        best_of_type: Dict[ApplicantInfoType, int] = {}
+        for info_id in ranked:
+            best_of_type.setdefault(self._items[info_id].info_type, info_id)
+        picked, tokens = set(), 0
+        for info_id in list(best_of_type.values()) + ranked:
+            if len(picked) >= top_k:
+                break
+            cost = estimate_tokens(self._items[info_id].text)
+            if info_id in picked or tokens + cost > token_budget:
+                continue
+            picked.add(info_id)
+            tokens += cost
+        texts = [self._items[info_id].text for info_id in ranked if info_id in picked]
+        text = "\n".join(texts)
+        return RelevantInfo(
+            text,
+            len(texts),
+            len(self._items),
+            estimate_tokens(text),
+            estimate_tokens("\n".join(item.text for item in self._items.values())),
+        )
+
+
+class ApplicantIndex:
+    """Per-user indexes for this process, tagged with the row stamp they match"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users: Dict[int, UserIndex] = {}
+        self._stamps: Dict[int, Hashable] = {}
+
+    def relevant(
+        self,
+        user_id: int,
+        stamp: Hashable,
+        load: Callable[[], Sequence[ApplicantInfo]],
+        query: str,
+        top_k: int = APPLICANT_INFO_TOP_K,
+        token_budget: int = APPLICANT_INFO_TOKEN_BUDGET,
+    ) -> RelevantInfo:
+        """
+        UserIndex.relevant on the user's index, (re)built from load() unless
+        it matches stamp
+        """
+        with self._lock:
+            if self._stamps.get(user_id) != stamp or user_id not in self._users:
+                self._users[user_id] = UserIndex(load())
+                self._stamps[user_id] = stamp
+            return self._users[user_id].relevant(query, top_k, token_budget)
+
+    def upsert(self, info: ApplicantInfo, stamp: Hashable) -> None:
+        with self._lock:
+            index = self._users.get(info.user_id)  # type: ignore[arg-type]
+            if index is not None:
+                index.upsert(info)
+                self._stamps[info.user_id] = stamp  # type: ignore[index]
+
+    def remove(self, user_id: Optional[int], info_id: int, stamp: Hashable) -> None:
+        with self._lock:
+            index = self._users.get(user_id)  # type: ignore[arg-type]
+            if index is not None:
+                index.remove(info_id)
+                self._stamps[user_id] = stamp  # type: ignore[index]
+
+
+applicant_index = ApplicantIndex()
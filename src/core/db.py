@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import inspect, literal, text
 import os
 
 # Import all models so they're registered with SQLModel
@@ -8,17 +9,57 @@ from .models import JobSearchQuery, JobPosting, JobSummary
 PROJECT_ROOT = os.path.dirname(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 )
-DATABASE_PATH = os.path.join(PROJECT_ROOT, "job_search.db")
+# override to share one db file between machines (e.g. on a network mount)
+DATABASE_PATH = os.getenv("DATABASE_PATH", os.path.join(PROJECT_ROOT, "job_search.db"))
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+# seconds a write waits for another process's lock (queue workers) before failing
+DATABASE_LOCK_TIMEOUT = float(os.getenv("DATABASE_LOCK_TIMEOUT", "30"))
 
 engine = create_engine(
-    DATABASE_URL, echo=True, connect_args={"check_same_thread": False}
+    DATABASE_URL,
+    echo=True,
+    connect_args={"check_same_thread": False, "timeout": DATABASE_LOCK_TIMEOUT},
 )
 
 
+def _add_missing_columns() -> None:
+    """
+    create_all() won't alter existing tables, so add any model columns (and
+    their indexes) that an older job_search.db doesn't have yet
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.tables.values():
+            if not inspector.has_table(table.name):
+                continue
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                ddl = (
+                    f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {col_type}'
+                )
+                # sqlite needs a default to add a NOT NULL column to existing rows
+                default = column.default
+                if (
+                    default is not None
+                    and default.is_scalar
+                    and default.arg is not None
+                ):
+                    value = literal(default.arg, column.type).compile(
+                        dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+                    )
+                    ddl += f" NOT NULL DEFAULT {value}"
+                conn.execute(text(ddl))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
 def init_db() -> None:
     """Create all tables in the database if they don't exist"""
     SQLModel.metadata.create_all(engine)
+    _add_missing_columns()
 
 
 def get_session() -> Session:
@@ -0,0 +1,181 @@
+"""
+Clean job descriptions before they're stored & summarized
+
+Scraped descriptions are often raw HTML padded with EEO statements and
+benefits blurbs repeated across postings. clean_description() turns one
+into compact text for the LLM (boilerplate paragraphs dropped, capped at a
+token budget) plus sanitized HTML for display. Boilerplate is recognized
+by hashing normalized paragraphs: short EEO notices are dropped always, other
+long paragraphs once BoilerplateLibrary has seen them in enough postings.
+"""
+
+import hashlib
+import html
+import math
+import os
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from bs4 import BeautifulSoup, Comment
+
+from .fingerprint import normalize_text
+
+# token budget for the text sent to the LLM (~4 characters per token); longer
+# than fits one summary call on a small model, those are map-reduced
+DESCRIPTION_TOKEN_BUDGET = int(os.getenv("DESCRIPTION_TOKEN_BUDGET", "4000"))
+CHARS_PER_TOKEN = 4
+# a repeated paragraph counts as boilerplate once this many postings have it
+BOILERPLATE_MIN_POSTINGS = int(os.getenv("BOILERPLATE_MIN_POSTINGS", "3"))
+# shorter paragraphs (headings, "Benefits:") are never learned as boilerplate
+BOILERPLATE_MIN_WORDS = 12
+
+# boilerplate whatever the posting: EEO / accommodation / E-Verify notices,
+# as long as the paragraph is short (a long one likely carries real content)
+KNOWN_BOILERPLATE = re.compile(
+    r"equal (employment )?opportunity|without regard to (race|age|sex)|"
+    r"reasonable accommodations?|e-verify|protected veteran|"
+    r"affirmative action employer",
+    re.IGNORECASE,
+)
+KNOWN_BOILERPLATE_MAX_WORDS = 60
+# salary ranges & pay rates: a paragraph with these is never dropped
+PAY_FIGURES = re.compile(
+    r"[$€£]\s?\d|\b\d{2,3}(,\d{3})+\b|\b\d{2,3}k\b|"
+    r"\b(salary|compensation|per hour|hourly rate)\b",
+    re.IGNORECASE,
+)
+
+BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "tr", "section", "article",
+    "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "table",
+}  # fmt: skip
+ALLOWED_TAGS = {
+    "p", "br", "ul", "ol", "li", "strong", "b", "em", "i", "u",
+    "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "a",
+}  # fmt: skip
+DROPPED_TAGS = ["script", "style", "iframe", "object", "embed", "form", "noscript"]
+LOOKS_LIKE_HTML = re.compile(r"<\s*/?\s*[a-zA-Z][^>]*>")
+
+
+class CleanedDescription(NamedTuple):
+    text: str  # compact text for the LLM
+    html: str  # sanitized HTML for display
+    tokens_before: int
+    tokens_after: int
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def paragraph_hash(paragraph: str) -> str:
+    return hashlib.sha1(normalize_text(paragraph).encode()).hexdigest()[:16]
+
+
+def _soup(raw: str) -> BeautifulSoup:
+    soup = BeautifulSoup(raw, "html.parser")
+    for tag in soup(DROPPED_TAGS):
+        tag.decompose()
+    for comment in soup.find_all(string=lambda s: isinstance(s, Comment)):
+        comment.extract()
+    return soup
+
+
+def to_paragraphs(raw: str) -> List[str]:
+    """Plain-text paragraphs of an HTML or text description"""
+    if LOOKS_LIKE_HTML.search(raw):
+        soup = _soup(raw)
+        for tag in soup.find_all(BLOCK_TAGS):
+            if tag.name == "li":
+                tag.insert_before("\n- ")
+            else:
+                tag.insert_before("\n")
+            tag.insert_after("\n")
+        raw = soup.get_text()
+    raw = html.unescape(raw)
+    paragraphs = []
+    for line in raw.splitlines():
+        line = " ".join(line.split())
+        if line and line != "-":
+            paragraphs.append(line)
+    return paragraphs
+
+
+def sanitize_html(raw: str) -> str:
+    """Display-safe HTML: allow-listed tags, no attributes but http(s) links"""
+    if not LOOKS_LIKE_HTML.search(raw):
+        return "".join(f"<p>{html.escape(p)}</p>" for p in to_paragraphs(raw))
+    soup = _soup(raw)
+    for tag in soup.find_all(True):
+        if tag.name not in ALLOWED_TAGS:
+            tag.unwrap()
+            continue
+        href = tag.get("href") if tag.name == "a" else None
+        tag.attrs = {}
+        if isinstance(href, str) and href.startswith(("http://", "https://")):
+            tag.attrs = {"href": href, "rel": "nofollow noopener", "target": "_blank"}
+    return str(soup).strip()
+
+
+class BoilerplateLibrary:
+    """
+    Paragraph hashes -> number of postings they were seen in; persisted
+    between runs (see BoilerplateRepo)
+    """
+
+    def __init__(
+        self,
+        counts: Optional[Dict[str, int]] = None,
+        min_postings: int = BOILERPLATE_MIN_POSTINGS,
+    ):
+        self.counts: Dict[str, int] = dict(counts or {})
+        self.min_postings = min_postings
+        self.changed: Set[str] = set()
+
+    def observe(self, paragraphs: Iterable[str]) -> None:
+        """Count one posting's (long enough) paragraphs"""
+        for digest in {
+            paragraph_hash(p)
+            for p in paragraphs
+            if len(p.split()) >= BOILERPLATE_MIN_WORDS
+        }:
+            self.counts[digest] = self.counts.get(digest, 0) + 1
+            self.changed.add(digest)
+
+    def is_boilerplate(self, paragraph: str) -> bool:
+        if PAY_FIGURES.search(paragraph):
+            return False
+        words = len(paragraph.split())
+        if words <= KNOWN_BOILERPLATE_MAX_WORDS and KNOWN_BOILERPLATE.search(paragraph):
+            return True
+        if words < BOILERPLATE_MIN_WORDS:
+            return False
+        return self.counts.get(paragraph_hash(paragraph), 0) >= self.min_postings
+
+
+def cap_tokens(paragraphs: List[str], budget: int) -> List[str]:
+    """Leading paragraphs that fit the budget (the last one cut at a word)"""
+    kept, chars = [], budget * CHARS_PER_TOKEN
+    for paragraph in paragraphs:
+        if len(paragraph) + 1 <= chars:
+            kept.append(paragraph)
+            chars -= len(paragraph) + 1
+            continue
+        if chars > 1:
+            kept.append(paragraph[: chars - 1].rsplit(" ", 1)[0] + "…")
+        break
+    return kept
+
+
+def clean_description(
+    raw: Optional[str],
+    library: Optional[BoilerplateLibrary] = None,
+    token_budget: int = DESCRIPTION_TOKEN_BUDGET,
+) -> CleanedDescription:
+    raw = raw or ""
+    library = library or BoilerplateLibrary()
+    paragraphs = [p for p in to_paragraphs(raw) if not library.is_boilerplate(p)]
+    text = "\n".join(cap_tokens(paragraphs, token_budget))
+    return CleanedDescription(
+        text, sanitize_html(raw), estimate_tokens(raw), estimate_tokens(text)
+    )
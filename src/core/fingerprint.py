@@ -0,0 +1,91 @@
+"""
+Stable identity for job postings across runs & sources
+"""
+
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .models import JobPosting
+
+# query params that track the click rather than identify the posting
+TRACKING_PARAMS = {"fbclid", "gclid", "ref", "refid", "source", "srsltid", "from"}
+# hosts where a single param, when present, identifies the posting
+ID_PARAMS = {"indeed.com": "jk"}
+
+COMPANY_SUFFIXES = re.compile(
+    r"\b(inc|incorporated|llc|ltd|limited|corp|corporation|co|company|gmbh|plc)\b\.?"
+)
+NON_WORD = re.compile(r"[^a-z0-9]+")
+# near-duplicate descriptions only link postings whose titles share this
+# much (token Jaccard): 'Senior Engineer' ~ 'Sr. Engineer', not ~ 'Designer'
+TITLE_SIMILARITY = 0.6
+
+
+def canonical_url(url: str | None) -> str | None:
+    """Lowercased host, no fragment/tracking params, sorted query"""
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    query = parse_qsl(parts.query, keep_blank_values=True)
+
+    id_param = next((p for h, p in ID_PARAMS.items() if host.endswith(h)), None)
+    if id_param and any(k == id_param for k, _ in query):
+        query = [(k, v) for k, v in query if k == id_param]
+    else:
+        # no id (e.g. an Indeed sponsored /pagead/clk link): the rest of
+        # the query is what tells postings apart
+        query = [
+            (k, v)
+            for k, v in query
+            if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+        ]
+
+    return urlunsplit(
+        ("https", host, parts.path.rstrip("/") or "/", urlencode(sorted(query)), "")
+    )
+
+
+def normalize_text(text: str | None) -> str:
+    return NON_WORD.sub(" ", (text or "").lower()).strip()
+
+
+def normalize_company(company: str | None) -> str:
+    return normalize_text(COMPANY_SUFFIXES.sub(" ", (company or "").lower()))
+
+
+def company_key(name: str | None) -> str:
+    """Company identity: 'Acme, Inc.' / 'ACME Inc' / 'acme' -> 'acme'"""
+    # names with no ascii letters normalize to nothing; don't lump those together
+    return normalize_company(name) or (name or "").casefold().strip()
+
+
+def title_similarity(a: str | None, b: str | None) -> float:
+    tokens_a, tokens_b = set(normalize_text(a).split()), set(normalize_text(b).split())
+    if not tokens_a or not tokens_b:
+        return 0.0
+    return len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+
+
+def same_role(a: JobPosting, b: JobPosting) -> bool:
+    """Same company & a similar title (a shared description isn't enough)"""
+    return (
+        company_key(a.company) == company_key(b.company)
+        and title_similarity(a.title, b.title) >= TITLE_SIMILARITY
+    )
+
+
+def posting_fingerprint(title: str, company: str, location: str) -> str:
+    """Hash of the normalized title / company / location"""
+    key = "|".join(
+        (normalize_text(title), normalize_company(company), normalize_text(location))
+    )
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def fingerprint_posting(job: JobPosting) -> JobPosting:
+    """Fill in job.canonical_url & job.fingerprint in place"""
+    job.canonical_url = canonical_url(job.url)
+    job.fingerprint = posting_fingerprint(job.title, job.company, job.location)
+    return job
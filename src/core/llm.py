@@ -1,10 +1,29 @@
-from langchain_openai import AzureChatOpenAI
-from langchain_ollama import ChatOllama
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from typing import Union
+"""
+Chat model clients, created lazily & shared per process
+
+get_llm(role) hands every agent with the same role the role's routed model
+(see core.llm_routing): its chain of provider / model routes, plus
+LLM_FALLBACK_ROUTE when one is configured. Routes share one client per provider & model, so they share its
+HTTP connection pool (and, on Azure, one credential & cached token).
+Nothing provider-specific is imported or authenticated until a client is
+first asked for. warm_up_llm() loads the Ollama model (or fetches the
+Azure token) ahead of the first real call; warm_up_roles() does it for
+each role's primary route.
+"""
+
 import os
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+import httpx
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    from langchain_ollama import ChatOllama
+    from langchain_openai import AzureChatOpenAI
+
+    from .llm_routing import Route, RoutedLLM
+
 load_dotenv()
 
 LLM_PROVIDER = os.getenv("LLM_PROVIDER", "ollama")
@@ -16,30 +35,221 @@ AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01")
 AZURE_OPENAI_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-5-nano")
 
 scope = "https://cognitiveservices.azure.com/.default"
-token_provider = get_bearer_token_provider(DefaultAzureCredential(), scope)
 
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "openchat:7b")
 # OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "deepseek-r1:7b")
+# how long Ollama keeps the model loaded after a request
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# route appended to every role's chain, e.g. "ollama:openchat:7b" when a
+# local model is running (none by default)
+LLM_FALLBACK_ROUTE = os.getenv("LLM_FALLBACK_ROUTE", "")
+# warm the providers up in the background when a pipeline run starts
+LLM_WARM_UP = os.getenv("LLM_WARM_UP", "true").lower() in ("1", "true")
+
+# in-flight requests per provider for batch calls: a local Ollama serves a
+# couple at a time (OLLAMA_NUM_PARALLEL), Azure is bound by its TPM quota
+LLM_CONCURRENCY = {
+    "azure": int(os.getenv("AZURE_OPENAI_CONCURRENCY", "8")),
+    "ollama": int(os.getenv("OLLAMA_CONCURRENCY", "2")),
+}
+
+ChatModel = Union["AzureChatOpenAI", "ChatOllama"]
+
+
+def llm_concurrency(provider: str = LLM_PROVIDER) -> int:
+    return LLM_CONCURRENCY.get(provider, 1)
+
+
+def default_model(provider: str) -> str:
+    return AZURE_OPENAI_DEPLOYMENT if provider == "azure" else OLLAMA_MODEL
+
+
+def role_routes(role: str) -> List["Route"]:
+    """
+    Provider / model chain for an agent role: LLM_ROUTE_<ROLE> (e.g.
+    "azure:gpt-5-nano,ollama:openchat:7b"), else LLM_PROVIDER_<ROLE> or
+    LLM_PROVIDER with its default model; then LLM_FALLBACK_ROUTE, if set &
+    not already in the chain
+    """
+    from .llm_routing import Route, parse_routes
+
+    routes = parse_routes(os.getenv(f"LLM_ROUTE_{role.upper()}", ""))
+    if not routes:
+        routes = [Route(os.getenv(f"LLM_PROVIDER_{role.upper()}", LLM_PROVIDER), "")]
+    routes += parse_routes(LLM_FALLBACK_ROUTE)
+    chain: List[Route] = []
+    for r in routes:
+        route = Route(r.provider, r.model or default_model(r.provider))
+        if route not in chain:
+            chain.append(route)
+    return chain
+
+
+def role_provider(role: str) -> str:
+    """Primary provider for an agent role (see role_routes)"""
+    return role_routes(role)[0].provider
+
+
+_lock = threading.Lock()
+_token_provider = None
+_azure_http: Optional[Tuple[httpx.Client, httpx.AsyncClient]] = None
+_clients: Dict[Tuple[str, str, bool], ChatModel] = {}
+_routed: Dict[Tuple[str, bool], "RoutedLLM"] = {}
+
 
+def azure_token_provider():
+    """
+    Bearer token provider over one DefaultAzureCredential; it caches the
+    token & only goes back to Azure AD when it's about to expire
+    """
+    global _token_provider
+    with _lock:
+        if _token_provider is None:
+            from azure.identity import (
+                DefaultAzureCredential,
+                get_bearer_token_provider,
+            )
 
-def make_llm() -> Union[AzureChatOpenAI, ChatOllama]:
-    if LLM_PROVIDER == "azure":
+            _token_provider = get_bearer_token_provider(DefaultAzureCredential(), scope)
+        return _token_provider
+
+
+def _azure_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """Connection pools shared by every Azure client in the process"""
+    global _azure_http
+    with _lock:
+        if _azure_http is None:
+            _azure_http = (httpx.Client(), httpx.AsyncClient())
+        return _azure_http
+
+
+def make_llm(
+    provider: str = LLM_PROVIDER, use_cache: bool = True, model: Optional[str] = None
+) -> ChatModel:
+    """
+    New chat model for a provider & model (default: the provider's
+    configured one; agents should use get_llm). Identical calls are
+    answered from the persistent response cache (see core.llm_cache)
+    unless use_cache=False or LLM_CACHE_DISABLED is set.
+    """
+    from .llm_cache import get_llm_cache
+
+    # installs the process-wide cache the models consult by default
+    cache = None if use_cache and get_llm_cache() else False
+    if provider == "azure":
+        from langchain_openai import AzureChatOpenAI
+
+        http_client, http_async_client = _azure_http_clients()
         return AzureChatOpenAI(
             azure_endpoint=AZURE_OPENAI_ENDPOINT,
             api_version=AZURE_OPENAI_API_VERSION,
-            azure_deployment=AZURE_OPENAI_DEPLOYMENT,
-            azure_ad_token_provider=token_provider,
+            azure_deployment=model or AZURE_OPENAI_DEPLOYMENT,
+            azure_ad_token_provider=azure_token_provider(),
+            http_client=http_client,
+            http_async_client=http_async_client,
+            cache=cache,
         )
 
     # default: local Ollama
+    from langchain_ollama import ChatOllama
+
     return ChatOllama(
         base_url=OLLAMA_BASE_URL,
-        model=OLLAMA_MODEL,
+        model=model or OLLAMA_MODEL,
         temperature=0,
+        keep_alive=OLLAMA_KEEP_ALIVE,
+        cache=cache,
     )
 
 
+def get_client(provider: str, model: str, use_cache: bool = True) -> ChatModel:
+    """Process-wide client for a provider & model"""
+    key = (provider, model, use_cache)
+    client = _clients.get(key)
+    if client is None:
+        client = make_llm(provider, use_cache, model)
+        with _lock:
+            client = _clients.setdefault(key, client)
+    return client
+
+
+def get_llm(role: str = "default", use_cache: bool = True) -> "RoutedLLM":
+    """
+    Process-wide routed model for an agent role ("summary", "review",
+    "resume", "cover_letter", ...). Routes whose client can't be created
+    (e.g. no Azure credentials) are left out of the chain.
+    """
+    from .llm_routing import RoutedLLM, role_budget
+
+    key = (role, use_cache)
+    routed = _routed.get(key)
+    if routed is None:
+        routes, clients = [], []
+        error: Optional[Exception] = None
+        for route in role_routes(role):
+            try:
+                clients.append(get_client(route.provider, route.model, use_cache))
+                routes.append(route)
+            except Exception as e:
+                print(f"LLM route {route} for '{role}' unavailable: {e}")
+                error = e
+        if not routes:
+            raise error or ValueError(f"no LLM route for '{role}'")
+        routed = RoutedLLM(role, routes, clients, role_budget(role))
+        with _lock:
+            routed = _routed.setdefault(key, routed)
+    return routed
+
+
+def warm_up_llm(
+    provider: str = LLM_PROVIDER, timeout: float = 120.0, model: Optional[str] = None
+) -> bool:
+    """
+    Get the provider ready for the first real call: Ollama loads the model
+    (default: OLLAMA_MODEL; an empty generate request, kept loaded for
+    OLLAMA_KEEP_ALIVE), Azure fetches the AD token. Returns False, without
+    raising, when it can't.
+    """
+    try:
+        if provider == "azure":
+            azure_token_provider()()
+        else:
+            httpx.post(
+                f"{OLLAMA_BASE_URL.rstrip('/')}/api/generate",
+                json={"model": model or OLLAMA_MODEL, "keep_alive": OLLAMA_KEEP_ALIVE},
+                timeout=timeout,
+            ).raise_for_status()
+        return True
+    except Exception as e:
+        print(f"LLM warm-up failed ({provider}:{model or ''}): {e}")
+        return False
+
+
+def warm_up_in_background(
+    provider: str = LLM_PROVIDER, model: Optional[str] = None
+) -> threading.Thread:
+    thread = threading.Thread(
+        target=warm_up_llm, args=(provider,), kwargs={"model": model}, daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def warm_up_roles(*roles: str) -> List[threading.Thread]:
+    """
+    Warm up the primary route of each role (the model its calls go to
+    first) in the background; fallback routes load on first use
+    """
+    routes = {role_routes(role)[0] for role in roles}
+    # one AD token covers every Azure deployment
+    azure = [route for route in routes if route.provider == "azure"][:1]
+    return [
+        warm_up_in_background(route.provider, route.model)
+        for route in azure + [r for r in routes if r.provider != "azure"]
+    ]
+
+
 # def make_llm() -> AzureChatOpenAI:
 #     return AzureChatOpenAI(
 #         azure_endpoint=AZURE_OPENAI_ENDPOINT,
@@ -0,0 +1,179 @@
+"""
+Persistent cache of LLM responses
+
+A LangChain BaseCache backed by a small SQLite file. Entries are keyed on a
+hash of the model's llm_string (provider, model, parameters & any bound
+output schema) and the serialized prompt (system + user messages), so an
+identical call is answered from disk instead of the model. Entries expire
+after LLM_CACHE_TTL and the least recently used are evicted once the cache
+outgrows LLM_CACHE_MAX_BYTES. LLM_CACHE_DISABLED=1 bypasses it entirely.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from langchain_core._api import suppress_langchain_beta_warning
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.globals import get_llm_cache as get_global_llm_cache
+from langchain_core.globals import set_llm_cache
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, Generation
+
+from .db import PROJECT_ROOT
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(PROJECT_ROOT, "llm_cache.db"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 60 * 60)))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+LLM_CACHE_DISABLED = os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true")
+
+# what a cached response may deserialize to (nothing that can carry config)
+CACHED_TYPES = [Generation, ChatGeneration, AIMessage, AIMessageChunk]
+
+
+def response_key(prompt: str, llm_string: str) -> str:
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+
+def model_label(llm_string: str) -> str:
+    """Short name for stats: the model / deployment in the llm_string"""
+    for field in ("model", "model_name", "deployment_name", "azure_deployment"):
+        marker = f"('{field}', '"
+        if marker in llm_string:
+            return llm_string.split(marker, 1)[1].split("'", 1)[0]
+    return "llm"
+
+
+class LLMResponseCache(BaseCache):
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        ttl: int = LLM_CACHE_TTL,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                body BLOB NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)"
+        )
+        self._conn.commit()
+        # model -> {"hits": n, "misses": n}
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0}
+        )
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = response_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM llm_cache WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+            self.stats[model_label(llm_string)]["hits" if row else "misses"] += 1
+        if row is None:
+            return None
+        with suppress_langchain_beta_warning():
+            return loads(zlib.decompress(row[0]).decode(), allowed_objects=CACHED_TYPES)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        body = zlib.compress(dumps(return_val).encode(), 6)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, model, body, expires_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    response_key(prompt, llm_string),
+                    model_label(llm_string),
+                    body,
+                    now + self.ttl,
+                    now,
+                    len(body),
+                ),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM llm_cache ORDER BY last_access ASC"
+        ).fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", doomed)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    @property
+    def hit_rate(self) -> float:
+        hits = sum(s["hits"] for s in self.stats.values())
+        lookups = hits + sum(s["misses"] for s in self.stats.values())
+        return hits / lookups if lookups else 0.0
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{model}: {s['hits']} hit / {s['misses']} miss"
+            for model, s in sorted(self.stats.items())
+        )
+
+
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    Process-wide cache (None when disabled via LLM_CACHE_DISABLED). It's
+    installed as LangChain's global llm cache, which every chat model
+    consults unless it was built with cache=False.
+    """
+    if LLM_CACHE_DISABLED:
+        return None
+    with _llm_cache_lock:
+        # the global (not a module variable) so core.* & src.core.* imports
+        # of this module share one instance
+        cache = get_global_llm_cache()
+        if cache is None:
+            cache = LLMResponseCache()
+            set_llm_cache(cache)
+    return cache  # type: ignore[return-value]
@@ -0,0 +1,345 @@
+"""
+Per-role model routing with fallback
+
+Each agent role has a chain of routes (provider & model), e.g. the small
+JobSummary extraction on a cheap deployment, falling back to local Ollama.
+A call goes to the first route; if it errors or overruns the role's
+latency budget, the next route is tried. A route that keeps failing is
+skipped for a cool-down instead of costing every call its budget. The
+last route isn't time limited (a slow answer beats none).
+
+    LLM_ROUTE_SUMMARY="azure:gpt-5-nano,ollama:qwen2.5:3b"
+    LLM_BUDGET_SUMMARY=20
+
+Latency & success rate per route are kept in route_stats for the run
+report, so chains & budgets can be tuned from real numbers.
+
+With hedging on (LLM_HEDGE=true), an async call still running at its
+route's rolling p95 gets a duplicate request, on the next route in the
+chain or (LLM_HEDGE_TARGET=same, or no next route) the same one. The first
+good answer wins & the other request is cancelled. Hedges are capped at
+LLM_HEDGE_MAX_EXTRA of a role's calls, which bounds the extra spend.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+# seconds a role's call may take on a route before falling back
+LLM_BUDGETS = {
+    "summary": 30.0,
+    "review": 60.0,
+    "resume": 120.0,
+    "cover_letter": 120.0,
+}
+DEFAULT_LLM_BUDGET = 60.0
+# consecutive failures / timeouts that put a route on cool-down
+ROUTE_MAX_FAILURES = 3
+ROUTE_COOLDOWN_SECONDS = float(os.getenv("LLM_ROUTE_COOLDOWN_SECONDS", "120"))
+LATENCY_WINDOW = 200  # recent calls kept per route for percentiles
+
+LLM_HEDGE = os.getenv("LLM_HEDGE", "false").lower() in ("1", "true")
+# "backup" (next route in the chain, if any) or "same"
+LLM_HEDGE_TARGET = os.getenv("LLM_HEDGE_TARGET", "backup")
+# hedged requests allowed per role call, i.e. at most 10% extra requests
+LLM_HEDGE_MAX_EXTRA = float(os.getenv("LLM_HEDGE_MAX_EXTRA", "0.1"))
+# successful calls on a route before its p95 is trusted for hedging
+HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+# never hedge sooner than this (cache hits drag the p95 down)
+HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "0.5"))
+
+
+class Route(NamedTuple):
+    provider: str
+    model: str
+
+    def __str__(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+
+def parse_routes(spec: str) -> List[Route]:
+    """ "azure:gpt-5-nano,ollama:openchat:7b" -> routes (model may hold ':')"""
+    routes = []
+    for part in spec.split(","):
+        provider, _, model = part.strip().partition(":")
+        if provider:
+            routes.append(Route(provider, model))
+    return routes
+
+
+def role_budget(role: str) -> float:
+    budget = os.getenv(f"LLM_BUDGET_{role.upper()}")
+    return float(budget) if budget else LLM_BUDGETS.get(role, DEFAULT_LLM_BUDGET)
+
+
+class RouteStats:
+    """
+    Calls, failures & recent latencies per (role, route); hedged calls per
+    role
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: Dict[tuple, Dict[str, int]] = {}
+        self.latencies: Dict[tuple, deque] = {}
+        self.hedges: Dict[str, Dict[str, int]] = {}
+        self._failing: Dict[tuple, int] = {}
+        self._cooling_until: Dict[tuple, float] = {}
+
+    def record(self, role: str, route: Route, seconds: float, outcome: str) -> None:
+        """
+        outcome: "ok", "error", "timeout" or "cancelled" (lost a hedge; not
+        a failure)
+        """
+        key = (role, str(route))
+        with self._lock:
+            calls = self.calls.setdefault(
+                key, {"ok": 0, "error": 0, "timeout": 0, "cancelled": 0}
+            )
+            calls[outcome] += 1
+            if outcome == "cancelled":
+                return
+            if outcome == "ok":
+                self.latencies.setdefault(key, deque(maxlen=LATENCY_WINDOW)).append(
+                    seconds
+                )
+                self._failing[key] = 0
+                return
+            self._failing[key] = self._failing.get(key, 0) + 1
+            if self._failing[key] >= ROUTE_MAX_FAILURES:
+                self._cooling_until[key] = time.monotonic() + ROUTE_COOLDOWN_SECONDS
+                self._failing[key] = 0
+
+    def is_cooling(self, role: str, route: Route) -> bool:
+        return self._cooling_until.get((role, str(route)), 0.0) > time.monotonic()
+
+    def percentile(self, role: str, route: Route, q: float) -> Optional[float]:
+        latencies = sorted(self.latencies.get((role, str(route)), ()))
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    def success_rate(self, role: str, route: Route) -> Optional[float]:
+        calls = self.calls.get((role, str(route)))
+        finished = calls and sum(calls.values()) - calls["cancelled"]
+        if not finished:
+            return None
+        return calls["ok"] / finished  # type: ignore[index]
+
+    def hedge_delay(self, role: str, route: Route) -> Optional[float]:
+        """Seconds before a call on the route is hedged; None: not enough data"""
+        if len(self.latencies.get((role, str(route)), ())) < HEDGE_MIN_SAMPLES:
+            return None
+        return max(self.percentile(role, route, 0.95), HEDGE_MIN_DELAY)  # type: ignore[type-var]
+
+    def _hedging(self, role: str) -> Dict[str, int]:
+        return self.hedges.setdefault(
+            role, {"calls": 0, "hedged": 0, "won": 0, "capped": 0}
+        )
+
+    def count_hedge(self, role: str, event: str) -> None:
+        """event: "calls" (a hedgeable call started) or "won" (the hedge won)"""
+        with self._lock:
+            self._hedging(role)[event] += 1
+
+    def allow_hedge(self, role: str) -> bool:
+        """Counts the hedge if it fits under LLM_HEDGE_MAX_EXTRA"""
+        with self._lock:
+            hedging = self._hedging(role)
+            if hedging["hedged"] + 1 > LLM_HEDGE_MAX_EXTRA * hedging["calls"]:
+                hedging["capped"] += 1
+                return False
+            hedging["hedged"] += 1
+            return True
+
+    def summary(self) -> str:
+        parts = []
+        for (role, route_name), calls in sorted(self.calls.items()):
+            route = Route(*route_name.split(":", 1))
+            p50, p95 = (self.percentile(role, route, q) for q in (0.5, 0.95))
+            finished = sum(calls.values()) - calls["cancelled"]
+            parts.append(
+                f"{role} -> {route}: {calls['ok']}/{finished} ok, "
+                f"{calls['timeout']} timed out, "
+                f"p50 {f'{p50:.1f}s' if p50 is not None else '-'}, "
+                f"p95 {f'{p95:.1f}s' if p95 is not None else '-'}"
+            )
+        for role, hedging in sorted(self.hedges.items()):
+            parts.append(
+                f"{role} hedged {hedging['hedged']}/{hedging['calls']} calls "
+                f"({hedging['won']} won, {hedging['capped']} over the cap)"
+            )
+        return "; ".join(parts)
+
+
+route_stats = RouteStats()
+
+
+def failure_kind(error: BaseException) -> str:
+    return "timeout" if isinstance(error, TimeoutError) else "error"
+
+
+# runs sync calls so they can be abandoned at the budget
+_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=32, thread_name_prefix="llm-route"
+)
+
+
+class RoutedLLM(Runnable):
+    """
+    A role's chat model: invoke / ainvoke (and batch / abatch) go down the
+    route chain; with_structured_output binds the schema on every route.
+    Only ainvoke hedges (a sync call's thread can't be cancelled).
+    """
+
+    def __init__(
+        self,
+        role: str,
+        routes: List[Route],
+        clients: List[Runnable],
+        budget: float,
+        bind: Optional[Callable[[Runnable], Runnable]] = None,
+        hedge: bool = LLM_HEDGE,
+    ):
+        self.role = role
+        self.routes = routes
+        self.clients = clients
+        self.budget = budget
+        self.hedge = hedge
+        self._runnables = [bind(c) if bind else c for c in clients]
+
+    def with_structured_output(self, schema, **kwargs) -> "RoutedLLM":
+        return RoutedLLM(
+            self.role,
+            self.routes,
+            self.clients,
+            self.budget,
+            lambda client: client.with_structured_output(schema, **kwargs),
+            self.hedge,
+        )
+
+    def _chain(self):
+        """(route, runnable, is last) to try, routes on cool-down skipped"""
+        chain = [
+            (route, runnable)
+            for route, runnable in zip(self.routes, self._runnables)
+            if not route_stats.is_cooling(self.role, route)
+        ] or list(zip(self.routes, self._runnables))[-1:]
+        return [
+            (r, runnable, i == len(chain) - 1) for i, (r, runnable) in enumerate(chain)
+        ]
+
+    def invoke(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> Any:
+        error: Optional[BaseException] = None
+        for route, runnable, last in self._chain():
+            started = time.monotonic()
+            try:
+                if last:
+                    result = runnable.invoke(input, config, **kwargs)
+                else:
+                    result = _executor.submit(
+                        runnable.invoke, input, config, **kwargs
+                    ).result(timeout=self.budget)
+            except Exception as e:  # TimeoutError once past the budget
+                route_stats.record(
+                    self.role, route, time.monotonic() - started, failure_kind(e)
+                )
+                error = e
+                continue
+            route_stats.record(self.role, route, time.monotonic() - started, "ok")
+            return result
+        raise error  # type: ignore[misc]
+
+    async def _acall(
+        self, step: tuple, input: Any, config: Optional[RunnableConfig], kwargs: dict
+    ) -> Any:
+        """One request on one route, recorded unless it's cancelled"""
+        route, runnable, last = step
+        started = time.monotonic()
+        try:
+            call = runnable.ainvoke(input, config, **kwargs)
+            result = await (call if last else asyncio.wait_for(call, self.budget))
+        except Exception as e:  # TimeoutError once past the budget
+            route_stats.record(
+                self.role, route, time.monotonic() - started, failure_kind(e)
+            )
+            raise
+        route_stats.record(self.role, route, time.monotonic() - started, "ok")
+        return result
+
+    async def _ahedged(
+        self,
+        chain: list,
+        n: int,
+        input: Any,
+        config: Optional[RunnableConfig],
+        kwargs: dict,
+    ) -> Any:
+        """
+        chain[n]'s request, plus a hedge request if it's still running at
+        the route's p95 & the cap allows; the first to succeed wins
+        """
+        step = chain[n]
+        route_stats.count_hedge(self.role, "calls")
+        started = {}
+        primary = asyncio.ensure_future(self._acall(step, input, config, kwargs))
+        started[primary] = (step[0], time.monotonic())
+        try:
+            delay = route_stats.hedge_delay(self.role, step[0])
+            if delay is not None:
+                await asyncio.wait([primary], timeout=delay)
+            if (
+                delay is None
+                or primary.done()
+                or not route_stats.allow_hedge(self.role)
+            ):
+                return await primary
+
+            if LLM_HEDGE_TARGET == "backup" and n + 1 < len(chain):
+                step = chain[n + 1]
+            hedge = asyncio.ensure_future(self._acall(step, input, config, kwargs))
+            started[hedge] = (step[0], time.monotonic())
+            pending = {primary, hedge}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                winners = [task for task in done if task.exception() is None]
+                if winners:
+                    for loser in pending:
+                        loser.cancel()
+                        route, since = started[loser]
+                        route_stats.record(
+                            self.role, route, time.monotonic() - since, "cancelled"
+                        )
+                    if winners[0] is hedge:
+                        route_stats.count_hedge(self.role, "won")
+                    return winners[0].result()
+                error = next(iter(done)).exception()
+            raise error  # type: ignore[misc]
+        finally:
+            for task in started:
+                task.cancel()
+
+    async def ainvoke(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> Any:
+        error: Optional[BaseException] = None
+        chain = self._chain()
+        for n, step in enumerate(chain):
+            try:
+                if self.hedge:
+                    return await self._ahedged(chain, n, input, config, kwargs)
+                return await self._acall(step, input, config, kwargs)
+            except Exception as e:
+                error = e
+        raise error  # type: ignore[misc]
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 from enum import Enum
 
@@ -17,8 +17,10 @@ class JobSearchQuery(SQLModel, table=True):
     experience_level: Optional[str] = None
     remote_ok: bool = True
     max_results: int = 20
+    is_active: bool = True  # picked up by the daily batch run
 
     created_at: datetime = Field(default=func.now())
+    user_id: Optional[int] = Field(default=None, foreign_key="user.id")
 
 
 class JobStatus(str, Enum):
@@ -46,14 +48,22 @@ class JobPosting(SQLModel, table=True):
     title: str
     company: str
     location: str
-    description: str
+    description: str  # as scraped
+    # cleaned at ingest (see core.description): compact text for the LLM &
+    # sanitized HTML for display
+    description_text: Optional[str] = None
+    description_html: Optional[str] = None
     url: str
-    posted_date: Optional[str] = None  # keep as string for now, can normalize later
+    posted_date: Optional[str] = None  # raw text from the source
+    posted_at: Optional[datetime] = Field(default=None, index=True)  # normalized (UTC)
     source: str
     salary_range: Optional[str] = None
     job_type: Optional[str] = None
     experience_level: Optional[str] = None
     status: JobStatus = JobStatus.NEW
+    # identity used to skip postings already in the db (see core.fingerprint)
+    canonical_url: Optional[str] = Field(default=None, index=True)
+    fingerprint: Optional[str] = Field(default=None, index=True)
 
     created_at: datetime = Field(default=func.now())
 
@@ -64,6 +74,104 @@ class JobPosting(SQLModel, table=True):
     job_summary_id: Optional[int] = Field(default=None, foreign_key="jobsummary.id")
     company_info_id: Optional[int] = Field(default=None, foreign_key="companyinfo.id")
     user_id: Optional[int] = Field(default=None, foreign_key="user.id")
+    # set when this posting is a near-duplicate of an earlier one (see core.near_dup)
+    canonical_posting_id: Optional[int] = Field(
+        default=None, foreign_key="jobposting.id"
+    )
+
+
+class JobPostingSignature(SQLModel, table=True):
+    """MinHash signature of a posting's cleaned description"""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    job_posting_id: int = Field(foreign_key="jobposting.id", index=True, unique=True)
+    signature: bytes
+
+
+class JobPostingLshBand(SQLModel, table=True):
+    """One LSH band hash per (posting, band); shared band keys mark candidates"""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    band_key: str = Field(index=True)
+    job_posting_id: int = Field(foreign_key="jobposting.id", index=True)
+
+
+class SourceWatermark(SQLModel, table=True):
+    """
+    Per-(source, query) state: the newest posting date seen (incremental
+    runs stop there) & how many new postings the last run produced
+    """
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    source: str = Field(index=True)
+    query_key: str = Field(index=True)  # normalized keywords | location
+    newest_posted_at: Optional[datetime] = None
+    last_new_postings: Optional[int] = None  # used to rank queries for credits
+    updated_at: datetime = Field(default=func.now())
+
+
+class SearchCreditUsage(SQLModel, table=True):
+    """Paid search credits (e.g. SerpAPI searches) spent by one run"""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    source: str = Field(index=True)
+    day: date = Field(index=True)  # UTC
+    credits: int
+    pages: int = 0
+    created_at: datetime = Field(default=func.now())
+
+
+class SourceHealthState(SQLModel, table=True):
+    """Circuit breaker state & recent fetch outcomes per discovery source"""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    source: str = Field(index=True, unique=True)
+    state: str = "closed"
+    opened_until: float = 0.0  # unix time the cool-down ends
+    open_count: int = 0
+    consecutive_failures: int = 0
+    recent: str = "[]"  # JSON [[succeeded, seconds], ...]
+    last_error: Optional[str] = None
+    updated_at: datetime = Field(default=func.now())
+
+
+class BoilerplateBlock(SQLModel, table=True):
+    """How many postings a (normalized, hashed) description paragraph was seen in"""
+
+    hash: str = Field(primary_key=True)
+    postings: int = 0
+    updated_at: datetime = Field(default=func.now())
+
+
+class TaskStatus(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"  # out of attempts
+
+
+class Task(SQLModel, table=True):
+    """
+    Durable unit of LLM work (see core.task_queue): claimed by a worker
+    under a lease, retried with backoff until max_attempts
+    """
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str = Field(index=True)  # "summarize", "company_review", "application"
+    payload: str = "{}"  # JSON arguments for the kind's handler
+    priority: int = Field(default=0, index=True)  # higher is claimed first
+    # a second enqueue with the same key is dropped while the first is pending/running
+    idempotency_key: Optional[str] = Field(default=None, index=True, unique=True)
+    status: TaskStatus = Field(default=TaskStatus.PENDING, index=True)
+    attempts: int = 0
+    max_attempts: int = 5
+    run_after: float = 0.0  # unix time; retries wait out their backoff
+    lease_expires_at: Optional[float] = None  # unix time; then anyone may reclaim it
+    worker: Optional[str] = None
+    last_error: Optional[str] = None
+    result: Optional[str] = None
+    created_at: datetime = Field(default=func.now())
+    updated_at: datetime = Field(default=func.now())
 
 
 class JobType(str, Enum):
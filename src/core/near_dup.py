@@ -0,0 +1,144 @@
+"""
+Near-duplicate detection for job postings (MinHash + LSH banding)
+
+Each description (the cleaned description_text, see core.description) is
+split into word shingles & reduced to a NUM_PERM-value MinHash signature.
+Signatures are cut into BANDS bands of ROWS values; postings sharing any
+band hash are candidates, and candidates whose estimated Jaccard similarity
+clears NEAR_DUP_THRESHOLD are duplicates.
+"""
+
+import hashlib
+import html
+import os
+import re
+import zlib
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+NUM_PERM = 100
+BANDS = 20
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+# shorter descriptions (e.g. search snippets, "N/A") are too thin to compare
+MIN_TOKENS = 20
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.6"))
+
+_SHINGLE_MULTIPLIER = np.uint64(1_000_003)
+TAG_RE = re.compile(r"<[^>]+>")
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def shingle_tokens(text: Optional[str]) -> List[str]:
+    """Lowercased word tokens (any markup & entities removed) to shingle"""
+    return WORD_RE.findall(html.unescape(TAG_RE.sub(" ", text or "")).lower())
+
+
+@lru_cache(maxsize=262_144)
+def _token_hash(token: str) -> int:
+    return zlib.crc32(token.encode())
+
+
+def shingle_hashes(tokens: List[str], size: int = SHINGLE_SIZE) -> np.ndarray:
+    """64-bit hashes of the distinct word n-grams"""
+    hashes = np.fromiter(
+        (_token_hash(t) for t in tokens), dtype=np.uint64, count=len(tokens)
+    )
+    if len(hashes) >= size:
+        # combine each window of token hashes positionally (wraps mod 2**64)
+        combined = hashes[: len(hashes) - size + 1].copy()
+        for offset in range(1, size):
+            combined = (
+                combined * _SHINGLE_MULTIPLIER
+                + hashes[offset : len(hashes) - size + 1 + offset]
+            )
+        hashes = combined
+    return np.unique(hashes)
+
+
+class MinHasher:
+    """MinHash via multiply-shift hashing: h(x) = (a * x + b) mod 2**64 >> 32"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 42):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        max_uint = np.iinfo(np.uint64).max
+        # odd multipliers keep each h a permutation of the 64-bit space
+        self.a = rng.integers(1, max_uint, size=num_perm, dtype=np.uint64) | np.uint64(
+            1
+        )
+        self.b = rng.integers(0, max_uint, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: Optional[str]) -> Optional[np.ndarray]:
+        tokens = shingle_tokens(text)
+        if len(tokens) < MIN_TOKENS:
+            return None
+        hashes = shingle_hashes(tokens)
+        with np.errstate(over="ignore"):
+            permuted = np.outer(self.a, hashes) + self.b[:, None]
+        return (permuted.min(axis=1) >> np.uint64(32)).astype(np.uint32)
+
+
+def band_keys(signature: np.ndarray, bands: int = BANDS) -> List[str]:
+    """One hash per band of the signature; shared keys mark LSH candidates"""
+    rows = len(signature) // bands
+    return [
+        f"{band}:"
+        + hashlib.blake2b(
+            signature[band * rows : (band + 1) * rows].tobytes(), digest_size=8
+        ).hexdigest()
+        for band in range(bands)
+    ]
+
+
+def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+def to_bytes(signature: np.ndarray) -> bytes:
+    return signature.astype(np.uint32).tobytes()
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.uint32)
+
+
+def best_match(
+    signature: np.ndarray,
+    candidates: Dict[Hashable, np.ndarray],
+    threshold: float = NEAR_DUP_THRESHOLD,
+) -> Optional[Tuple[Hashable, float]]:
+    """Most similar candidate at or above the threshold"""
+    best = None
+    for key, candidate in candidates.items():
+        score = similarity(signature, candidate)
+        if score >= threshold and (best is None or score > best[1]):
+            best = (key, score)
+    return best
+
+
+class LSHIndex:
+    """In-memory band index (the db-backed equivalent is JobSignatureRepo)"""
+
+    def __init__(self, bands: int = BANDS, threshold: float = NEAR_DUP_THRESHOLD):
+        self.bands = bands
+        self.threshold = threshold
+        self.buckets: Dict[str, List[Hashable]] = defaultdict(list)
+        self.signatures: Dict[Hashable, np.ndarray] = {}
+
+    def add(self, key: Hashable, signature: np.ndarray) -> None:
+        self.signatures[key] = signature
+        for band_key in band_keys(signature, self.bands):
+            self.buckets[band_key].append(key)
+
+    def query(self, signature: np.ndarray) -> Optional[Tuple[Hashable, float]]:
+        candidates = {
+            key: self.signatures[key]
+            for band_key in band_keys(signature, self.bands)
+            for key in self.buckets.get(band_key, ())
+        }
+        return best_match(signature, candidates, self.threshold)
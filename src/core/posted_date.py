@@ -0,0 +1,70 @@
+"""
+Normalize the posted dates sources report ("3 days ago", ISO strings,
+unix epochs) to aware UTC datetimes so postings can be compared by age
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+
+RELATIVE_RE = re.compile(
+    r"(\d+)\+?\s*(minute|min|hour|hr|day|week|month|year)s?\s+ago", re.IGNORECASE
+)
+UNIT_DELTAS = {
+    "minute": timedelta(minutes=1),
+    "min": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "hr": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=30),
+    "year": timedelta(days=365),
+}
+JUST_NOW = ("just posted", "today", "just now")
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value: datetime | None) -> datetime | None:
+    """
+    Aware UTC datetime; naive values are taken to be UTC (sqlite keeps no
+    offset, and older sqlmodel versions hand its timestamps back naive)
+    """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def parse_posted_date(value, now: datetime | None = None) -> datetime | None:
+    """
+    Best-effort datetime for a source's posted date, or None when it can't
+    be read. Relative dates are resolved against `now` (default: utc now).
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return as_utc(value)
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc)
+
+    text = str(value).strip()
+    if text.isdigit():
+        return parse_posted_date(int(text), now)
+    try:
+        return parse_posted_date(datetime.fromisoformat(text), now)
+    except ValueError:
+        pass
+
+    now = as_utc(now) or utcnow()
+    lowered = text.lower()
+    if match := RELATIVE_RE.search(lowered):
+        amount, unit = int(match.group(1)), match.group(2)
+        return now - amount * UNIT_DELTAS[unit]
+    if "yesterday" in lowered:
+        return now - timedelta(days=1)
+    if any(phrase in lowered for phrase in JUST_NOW):
+        return now
+    return None
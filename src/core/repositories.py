@@ -1,10 +1,24 @@
-from typing import Sequence, List, Optional
-from sqlmodel import Session, select
-from sqlalchemy import func, desc
+import json
+from datetime import date, datetime
+from typing import Dict, Iterable, Sequence, List, Optional, Set, Tuple
+from sqlmodel import Session, select, or_
+from sqlalchemy import bindparam, func, desc, text
+from sqlalchemy.exc import IntegrityError
+from .applicant_index import RelevantInfo, applicant_index
+from .fingerprint import company_key
+from .posted_date import as_utc
 from .models import (
+    BoilerplateBlock,
     JobSearchQuery,
     JobPosting,
+    JobPostingLshBand,
+    JobPostingSignature,
     JobSummary,
+    SearchCreditUsage,
+    SourceHealthState,
+    SourceWatermark,
+    Task,
+    TaskStatus,
     ApplicantInfo,
     ApplicationMaterials,
     User,
@@ -22,6 +36,12 @@ class JobSearchQueryRepo:
             select(JobSearchQuery).where(JobSearchQuery.id == id)
         ).first()
 
+    def get_active(self) -> Sequence[JobSearchQuery]:
+        """Every active saved query, across all users"""
+        return self.session.exec(
+            select(JobSearchQuery).where(JobSearchQuery.is_active == True)  # noqa: E712
+        ).all()
+
     def add(self, job_search_query: JobSearchQuery) -> JobSearchQuery:
         self.session.add(job_search_query)
         self.session.commit()
@@ -60,6 +80,76 @@ class JobPostingRepo:
             select(JobPosting).where(JobPosting.status == "NEW")
         ).all()
 
+    def get_unsummarized(self) -> Sequence[JobPosting]:
+        """New postings that don't have a JobSummary yet"""
+        return self.session.exec(
+            select(JobPosting).where(
+                JobPosting.status == "NEW",
+                JobPosting.job_summary_id == None,  # noqa: E711
+            )
+        ).all()
+
+    def link_company(self, company: str, company_info_id: int) -> int:
+        """
+        Point postings of this company still lacking a review at it, matched
+        on the normalized name ("Acme, Inc." & "Acme Inc" are one company)
+        """
+        key = company_key(company)
+        postings = [
+            posting
+            for posting in self.session.exec(
+                select(JobPosting).where(
+                    JobPosting.company_info_id == None,  # noqa: E711
+                )
+            ).all()
+            if company_key(posting.company) == key
+        ]
+        for posting in postings:
+            posting.company_info_id = company_info_id
+            self.session.add(posting)
+        self.session.commit()
+        return len(postings)
+
+    def get_existing_keys(
+        self, fingerprints: Iterable[str], canonical_urls: Iterable[str]
+    ) -> Set[Tuple[Optional[int], str]]:
+        """
+        Which of these fingerprints / canonical urls are already stored, as
+        (user_id, key) pairs (one indexed IN query for the whole batch)
+        """
+        fingerprints = {fp for fp in fingerprints if fp}
+        canonical_urls = {url for url in canonical_urls if url}
+        if not fingerprints and not canonical_urls:
+            return set()
+        rows = self.session.exec(
+            select(
+                JobPosting.user_id, JobPosting.fingerprint, JobPosting.canonical_url
+            ).where(
+                or_(
+                    JobPosting.fingerprint.in_(fingerprints),  # type: ignore[union-attr]
+                    JobPosting.canonical_url.in_(canonical_urls),  # type: ignore[union-attr]
+                )
+            )
+        ).all()
+        found = set()
+        for user_id, fingerprint, canonical_url in rows:
+            if fingerprint in fingerprints:
+                found.add((user_id, fingerprint))
+            if canonical_url in canonical_urls:
+                found.add((user_id, canonical_url))
+        return found
+
+    def get_by_fingerprint(
+        self, fingerprint: str, canonical_url: Optional[str] = None
+    ) -> JobPosting | None:
+        """Earliest stored posting with this fingerprint or canonical url"""
+        condition = JobPosting.fingerprint == fingerprint
+        if canonical_url:
+            condition = or_(condition, JobPosting.canonical_url == canonical_url)  # type: ignore[assignment]
+        return self.session.exec(
+            select(JobPosting).where(condition).order_by(JobPosting.id)  # type: ignore[arg-type]
+        ).first()
+
     def update(self, job_id: int, **fields) -> JobPosting:
         statement = select(JobPosting).where(JobPosting.id == job_id)
         results = self.session.exec(statement)
@@ -119,6 +209,325 @@ class JobPostingRepo:
         return locations
 
 
+class JobSignatureRepo:
+    """MinHash signatures + LSH bands used for near-duplicate lookups"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add(self, job_posting_id: int, signature: bytes, band_keys: List[str]) -> None:
+        self.session.add(
+            JobPostingSignature(job_posting_id=job_posting_id, signature=signature)
+        )
+        self.session.add_all(
+            [
+                JobPostingLshBand(band_key=band_key, job_posting_id=job_posting_id)
+                for band_key in band_keys
+            ]
+        )
+        self.session.commit()
+
+    def get_candidates(self, band_keys: List[str]) -> Dict[int, bytes]:
+        """Signatures of every posting sharing at least one band key"""
+        if not band_keys:
+            return {}
+        rows = self.session.exec(
+            select(JobPostingSignature.job_posting_id, JobPostingSignature.signature)
+            .join(
+                JobPostingLshBand,
+                JobPostingLshBand.job_posting_id == JobPostingSignature.job_posting_id,  # type: ignore[arg-type]
+            )
+            .where(JobPostingLshBand.band_key.in_(band_keys))  # type: ignore[attr-defined]
+            .distinct()
+        ).all()
+        return {job_posting_id: signature for job_posting_id, signature in rows}
+
+
+class SourceWatermarkRepo:
+    """Per-(source, query) high-water marks for incremental discovery"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def _get_or_new(self, source: str, query_key: str) -> SourceWatermark:
+        mark = self.session.exec(
+            select(SourceWatermark).where(
+                SourceWatermark.source == source,
+                SourceWatermark.query_key == query_key,
+            )
+        ).first()
+        return mark or SourceWatermark(source=source, query_key=query_key)
+
+    def get_all(self) -> Dict[Tuple[str, str], datetime]:
+        return {
+            (mark.source, mark.query_key): as_utc(mark.newest_posted_at)  # type: ignore[misc]
+            for mark in self.session.exec(select(SourceWatermark)).all()
+            if mark.newest_posted_at
+        }
+
+    def get_yields(self) -> Dict[Tuple[str, str], int]:
+        """New postings each (source, query) produced on its last run"""
+        return {
+            (mark.source, mark.query_key): mark.last_new_postings
+            for mark in self.session.exec(select(SourceWatermark)).all()
+            if mark.last_new_postings is not None
+        }
+
+    def advance(self, marks: Dict[Tuple[str, str], datetime]) -> None:
+        """Move each mark forward (never back) to the given posted date"""
+        for (source, query_key), posted_at in marks.items():
+            mark = self._get_or_new(source, query_key)
+            if mark.newest_posted_at and posted_at <= as_utc(mark.newest_posted_at):  # type: ignore[operator]
+                continue
+            mark.newest_posted_at = posted_at
+            mark.updated_at = func.now()  # type: ignore[assignment]
+            self.session.add(mark)
+        self.session.commit()
+
+    def set_yields(self, yields: Dict[Tuple[str, str], int]) -> None:
+        for (source, query_key), new_postings in yields.items():
+            mark = self._get_or_new(source, query_key)
+            mark.last_new_postings = new_postings
+            mark.updated_at = func.now()  # type: ignore[assignment]
+            self.session.add(mark)
+        self.session.commit()
+
+
+class SearchCreditRepo:
+    """Paid search credits spent per source & UTC day"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def used_on(self, source: str, day: date) -> int:
+        used = self.session.exec(
+            select(func.sum(SearchCreditUsage.credits)).where(
+                SearchCreditUsage.source == source, SearchCreditUsage.day == day
+            )
+        ).first()
+        return used or 0
+
+    def add(self, usage: SearchCreditUsage) -> SearchCreditUsage:
+        self.session.add(usage)
+        self.session.commit()
+        self.session.refresh(usage)
+        return usage
+
+
+class SourceHealthRepo:
+    """Persisted circuit breaker state, one row per source"""
+
+    FIELDS = (
+        "state",
+        "opened_until",
+        "open_count",
+        "consecutive_failures",
+        "recent",
+        "last_error",
+    )
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_states(self) -> Dict[str, dict]:
+        return {
+            row.source: {field: getattr(row, field) for field in self.FIELDS}
+            for row in self.session.exec(select(SourceHealthState)).all()
+        }
+
+    def save_states(self, states: Dict[str, dict]) -> None:
+        for source, state in states.items():
+            row = self.session.exec(
+                select(SourceHealthState).where(SourceHealthState.source == source)
+            ).first() or SourceHealthState(source=source)
+            for field in self.FIELDS:
+                setattr(row, field, state[field])
+            row.updated_at = func.now()  # type: ignore[assignment]
+            self.session.add(row)
+        self.session.commit()
+
+
+class BoilerplateRepo:
+    """Paragraph counts behind core.description.BoilerplateLibrary"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_counts(self) -> Dict[str, int]:
+        return {
+            block.hash: block.postings
+            for block in self.session.exec(select(BoilerplateBlock)).all()
+        }
+
+    def save_counts(self, counts: Dict[str, int]) -> None:
+        existing = {
+            block.hash: block
+            for block in self.session.exec(
+                select(BoilerplateBlock).where(
+                    BoilerplateBlock.hash.in_(list(counts))  # type: ignore[attr-defined]
+                )
+            ).all()
+        }
+        for digest, postings in counts.items():
+            block = existing.get(digest) or BoilerplateBlock(hash=digest)
+            block.postings = postings
+            block.updated_at = func.now()  # type: ignore[assignment]
+            self.session.add(block)
+        self.session.commit()
+
+
+class TaskRepo:
+    """
+    Persistence behind core.task_queue. Claims are a single UPDATE, so
+    workers in other processes (or on another machine sharing the db file)
+    never get the same task while its lease holds.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_by_key(self, idempotency_key: str) -> Task | None:
+        return self.session.exec(
+            select(Task).where(Task.idempotency_key == idempotency_key)
+        ).first()
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict,
+        priority: int = 0,
+        idempotency_key: Optional[str] = None,
+        max_attempts: int = 5,
+    ) -> Task | None:
+        """
+        Add a task; None if one with the same key is already pending or
+        running. A finished / failed task with the key is queued again.
+        """
+        existing = self.get_by_key(idempotency_key) if idempotency_key else None
+        if existing and existing.status in (TaskStatus.PENDING, TaskStatus.RUNNING):
+            return None
+        task = existing or Task(kind=kind, idempotency_key=idempotency_key)
+        task.payload = json.dumps(payload)
+        task.priority = priority
+        task.max_attempts = max_attempts
+        task.status = TaskStatus.PENDING
+        task.attempts = 0
+        task.run_after = 0.0
+        task.lease_expires_at = None
+        task.worker = None
+        task.last_error = None
+        task.result = None
+        task.updated_at = func.now()  # type: ignore[assignment]
+        try:
+            self.session.add(task)
+            self.session.commit()
+        except IntegrityError:  # another process enqueued the same key first
+            self.session.rollback()
+            return None
+        self.session.refresh(task)
+        return task
+
+    def claim(
+        self,
+        worker: str,
+        limit: int,
+        lease_seconds: float,
+        now: float,
+        kinds: Optional[List[str]] = None,
+    ) -> List[Task]:
+        """
+        Lease up to `limit` due tasks (highest priority first) to this
+        worker, including running ones whose lease ran out
+        """
+        kind_filter = "AND kind IN :kinds" if kinds else ""
+        statement = text(f"""
+            UPDATE task
+            SET status = 'RUNNING', worker = :worker, lease_expires_at = :lease,
+                attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE id IN (
+                SELECT id FROM task
+                WHERE ((status = 'PENDING' AND run_after <= :now)
+                    OR (status = 'RUNNING' AND lease_expires_at <= :now))
+                {kind_filter}
+                ORDER BY priority DESC, id
+                LIMIT :limit
+            )
+            RETURNING id
+            """)
+        params = {
+            "worker": worker,
+            "lease": now + lease_seconds,
+            "now": now,
+            "limit": limit,
+        }
+        if kinds:
+            statement = statement.bindparams(bindparam("kinds", expanding=True))
+            params["kinds"] = kinds
+        ids = [row[0] for row in self.session.connection().execute(statement, params)]
+        self.session.commit()
+        if not ids:
+            return []
+        return list(
+            self.session.exec(
+                select(Task)
+                .where(Task.id.in_(ids))  # type: ignore[union-attr]
+                .order_by(desc(Task.priority), Task.id)  # type: ignore[arg-type]
+                .execution_options(populate_existing=True)
+            ).all()
+        )
+
+    def _update_leased(self, ids: List[int], worker: str, sets: str, **params) -> int:
+        """Update tasks this worker still holds; returns how many it did"""
+        if not ids:
+            return 0
+        statement = text(f"""
+            UPDATE task SET {sets}, updated_at = CURRENT_TIMESTAMP
+            WHERE id IN :ids AND worker = :worker AND status = 'RUNNING'
+            """).bindparams(bindparam("ids", expanding=True))
+        result = self.session.connection().execute(
+            statement, {"ids": ids, "worker": worker, **params}
+        )
+        self.session.commit()
+        return result.rowcount  # type: ignore[attr-defined]
+
+    def extend_leases(self, ids: List[int], worker: str, lease_until: float) -> int:
+        return self._update_leased(
+            ids, worker, "lease_expires_at = :lease", lease=lease_until
+        )
+
+    def complete(self, id: int, worker: str, result: Optional[str] = None) -> bool:
+        return bool(
+            self._update_leased(
+                [id],
+                worker,
+                "status = 'DONE', lease_expires_at = NULL, result = :result",
+                result=result,
+            )
+        )
+
+    def fail(
+        self, id: int, worker: str, error: str, retry_at: Optional[float] = None
+    ) -> bool:
+        """Back to pending until retry_at, or FAILED for good when it's None"""
+        if retry_at is None:
+            sets = "status = 'FAILED', lease_expires_at = NULL, last_error = :error"
+        else:
+            sets = (
+                "status = 'PENDING', lease_expires_at = NULL, "
+                "last_error = :error, run_after = :retry_at"
+            )
+        return bool(
+            self._update_leased([id], worker, sets, error=error, retry_at=retry_at)
+        )
+
+    def counts(self) -> Dict[str, int]:
+        """Tasks per status, for reports"""
+        rows = self.session.exec(
+            select(Task.status, func.count()).group_by(Task.status)  # type: ignore[call-overload]
+        ).all()
+        return {status.value: count for status, count in rows}
+
+
 class JobSummaryRepo:
     def __init__(self, session: Session):
         self.session = session
@@ -137,6 +546,33 @@ class JobSummaryRepo:
         self.session.refresh(job_summary)
         return job_summary
 
+    def add_many(self, job_summaries: List[JobSummary]) -> List[JobSummary]:
+        """
+        Add summaries & point each one's posting at it, in one transaction
+        (rolled back as a whole if any write fails)
+        """
+        try:
+            self.session.add_all(job_summaries)
+            self.session.flush()  # assigns the summary ids
+            postings = self.session.exec(
+                select(JobPosting).where(
+                    JobPosting.id.in_(  # type: ignore[union-attr]
+                        [summary.job_posting_id for summary in job_summaries]
+                    )
+                )
+            ).all()
+            summary_ids = {
+                summary.job_posting_id: summary.id for summary in job_summaries
+            }
+            for posting in postings:
+                posting.job_summary_id = summary_ids[posting.id]
+                self.session.add(posting)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return job_summaries
+
     def update_job(self, summary_id: int, **fields) -> JobSummary:
         statement = select(JobSummary).where(JobSummary.id == summary_id)
         results = self.session.exec(statement)
@@ -168,10 +604,32 @@ class ApplicantInfoRepo:
         results = self.session.exec(statement).all()
         return results
 
+    def get_stamp(self, user_id: int | None) -> Tuple:
+        """Changes whenever the user's rows do (keys core.applicant_index)"""
+        return tuple(
+            self.session.exec(
+                select(  # type: ignore[call-overload]
+                    func.count(ApplicantInfo.id),
+                    func.max(ApplicantInfo.id),
+                    func.max(ApplicantInfo.updated_at),
+                ).where(ApplicantInfo.user_id == user_id)
+            ).one()
+        )
+
+    def get_relevant(self, user_id: int, job_description: str) -> RelevantInfo:
+        """The user's items most relevant to a job, within the prompt budget"""
+        return applicant_index.relevant(
+            user_id,
+            self.get_stamp(user_id),
+            lambda: self.get_info_by_user_id(user_id),
+            job_description,
+        )
+
     def add(self, app_info: ApplicantInfo) -> ApplicantInfo:
         self.session.add(app_info)
         self.session.commit()
         self.session.refresh(app_info)
+        applicant_index.upsert(app_info, self.get_stamp(app_info.user_id))
         return app_info
 
     def update(self, app_info_id: int, **fields) -> ApplicantInfo:
@@ -188,13 +646,16 @@ class ApplicantInfoRepo:
         self.session.add(app_info)
         self.session.commit()
         self.session.refresh(app_info)
+        applicant_index.upsert(app_info, self.get_stamp(app_info.user_id))
         return app_info
 
     def delete(self, app_info_id: int) -> None:
         statement = select(ApplicantInfo).where(ApplicantInfo.id == app_info_id)
         app_info = self.session.exec(statement).one()
+        user_id = app_info.user_id
         self.session.delete(app_info)
         self.session.commit()
+        applicant_index.remove(user_id, app_info_id, self.get_stamp(user_id))
 
 
 class ApplicationMaterialsRepo:
@@ -0,0 +1,38 @@
+"""
+Counters & timings collected over one pipeline run, logged at the end
+"""
+
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+@dataclass
+class RunReport:
+    started_at: float = field(default_factory=time.monotonic)
+    counters: Dict[str, float] = field(default_factory=lambda: defaultdict(int))
+    notes: List[str] = field(default_factory=list)
+
+    def incr(self, name: str, amount: float = 1) -> None:
+        self.counters[name] += amount
+
+    def set(self, name: str, value: float) -> None:
+        self.counters[name] = value
+
+    def note(self, line: str) -> None:
+        self.notes.append(line)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def log(self, logger: logging.Logger) -> None:
+        logger.info("=" * 80)
+        logger.info(f"Run report ({self.elapsed:.1f}s)")
+        for name, value in self.counters.items():
+            shown = f"{value:.2f}" if isinstance(value, float) else value
+            logger.info(f"   {name}: {shown}")
+        for line in self.notes:
+            logger.info(f"   {line}")
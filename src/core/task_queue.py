@@ -0,0 +1,78 @@
+"""
+Durable queue for LLM work
+
+Summaries, company reviews & application materials can be queued as Task
+rows instead of run inline (TASK_QUEUE=1), so a crash loses nothing: a
+worker (src/worker.py) claims tasks in batches under a lease it keeps
+renewing while they run. A task whose worker died is reclaimed once its
+lease runs out; a failed one is retried with exponential backoff until it
+is out of attempts. Tasks with the same idempotency key are queued once.
+Workers may run in several processes, or on another machine sharing the
+db file, since claims are atomic in SQLite.
+"""
+
+import os
+import random
+import socket
+from typing import Optional
+
+from .fingerprint import company_key
+from .models import Task
+from .repositories import TaskRepo
+
+TASK_QUEUE = os.getenv("TASK_QUEUE", "").lower() in ("1", "true")
+TASK_LEASE_SECONDS = float(os.getenv("TASK_LEASE_SECONDS", "300"))
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "5"))
+TASK_RETRY_BASE_SECONDS = float(os.getenv("TASK_RETRY_BASE_SECONDS", "30"))
+TASK_RETRY_MAX_SECONDS = float(os.getenv("TASK_RETRY_MAX_SECONDS", "3600"))
+
+SUMMARIZE = "summarize"
+COMPANY_REVIEW = "company_review"
+APPLICATION = "application"
+# someone is waiting on application materials; summaries can wait the longest
+PRIORITY = {APPLICATION: 20, COMPANY_REVIEW: 10, SUMMARIZE: 0}
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before retry number `attempts`: doubling, capped, with jitter"""
+    delay = min(TASK_RETRY_MAX_SECONDS, TASK_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def enqueue_summary(
+    repo: TaskRepo, job_posting_id: int, is_duplicate: bool = False
+) -> Optional[Task]:
+    # canonical postings first, so their duplicates can copy the summaries
+    return repo.enqueue(
+        SUMMARIZE,
+        {"job_posting_id": job_posting_id},
+        priority=PRIORITY[SUMMARIZE] + (0 if is_duplicate else 1),
+        idempotency_key=f"{SUMMARIZE}:{job_posting_id}",
+        max_attempts=TASK_MAX_ATTEMPTS,
+    )
+
+
+def enqueue_company_review(repo: TaskRepo, company: str) -> Optional[Task]:
+    return repo.enqueue(
+        COMPANY_REVIEW,
+        {"company": company},
+        priority=PRIORITY[COMPANY_REVIEW],
+        idempotency_key=f"{COMPANY_REVIEW}:{company_key(company)}",
+        max_attempts=TASK_MAX_ATTEMPTS,
+    )
+
+
+def enqueue_application(
+    repo: TaskRepo, job_posting_id: int, user_id: int
+) -> Optional[Task]:
+    return repo.enqueue(
+        APPLICATION,
+        {"job_posting_id": job_posting_id, "user_id": user_id},
+        priority=PRIORITY[APPLICATION],
+        idempotency_key=f"{APPLICATION}:{user_id}:{job_posting_id}",
+        max_attempts=TASK_MAX_ATTEMPTS,
+    )
@@ -1,12 +1,57 @@
+import asyncio
 import logging
-from services.job_discovery.discover import find_ai_engineer_jobs
-from services.job_summary.summarize import SummaryAgent
-from services.company_review.review import ReviewAgent
-from core.db import get_session
+import os
+import time
+from typing import Any, AsyncIterator, List, Set, Tuple
+from core.description import (
+    BoilerplateLibrary,
+    clean_description,
+    estimate_tokens,
+    to_paragraphs,
+)
+from core.fingerprint import fingerprint_posting, same_role
+from core.llm import LLM_WARM_UP, warm_up_roles
+from core.llm_cache import get_llm_cache
+from core.llm_routing import route_stats
+from core.near_dup import MinHasher, band_keys, best_match, from_bytes, to_bytes
+from core.models import (
+    CompanyInfo,
+    JobPosting,
+    JobSearchQuery,
+    JobSummary,
+    SearchCreditUsage,
+)
+from core.posted_date import utcnow
+from core.run_report import RunReport
+from core.task_queue import TASK_QUEUE, enqueue_company_review, enqueue_summary
+from services.job_discovery.discover import (
+    JobDiscoveryService,
+    abatched,
+    ai_engineer_query,
+)
+from services.job_discovery.health import HealthTracker
+from services.job_discovery.http_cache import get_http_cache
+from services.job_discovery.rate_limit import rate_limiter
+from services.job_discovery.sources.serp_api import (
+    SERP_API_DAILY_CREDITS,
+    SERP_API_RUN_CREDITS,
+    SOURCE_LABEL as SERP_API_LABEL,
+    credit_budget,
+)
+from services.job_summary.summarize import SummaryAgent, copy_summary, llm_description
+from services.company_review.review import CompanyReviewService
+from core.db import get_session, init_db
 from core.repositories import (
+    BoilerplateRepo,
     JobPostingRepo,
+    JobSearchQueryRepo,
+    JobSignatureRepo,
     JobSummaryRepo,
     CompanyInfoRepo,
+    SearchCreditRepo,
+    SourceHealthRepo,
+    SourceWatermarkRepo,
+    TaskRepo,
 )
 
 # Configure logging
@@ -17,6 +62,361 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+minhasher = MinHasher()
+# finished summaries saved per transaction
+SUMMARY_CHUNK_SIZE = int(os.getenv("SUMMARY_CHUNK_SIZE", "20"))
+
+
+def log_job(i: int, job: JobPosting) -> None:
+    logger.info(f"{i}. {job.title}")
+    logger.info(f"   Company: {job.company}")
+    logger.info(f"   Location: {job.location}")
+    logger.info(f"   Source: {job.source}")
+    if job.url:
+        logger.info(f"   URL: {job.url}")
+    logger.info(f"   Description: {(job.description_text or job.description)[:200]}...")
+    if job.description_text is not None:
+        logger.info(
+            f"   Tokens: {estimate_tokens(job.description)} scraped, "
+            f"{estimate_tokens(job.description_text)} after cleaning"
+        )
+    logger.info("-" * 50)
+
+
+def find_canonical(
+    job: JobPosting,
+    signature,
+    job_posting_repo: JobPostingRepo,
+    signature_repo: JobSignatureRepo,
+) -> JobPosting | None:
+    """Earliest stored posting this one duplicates or near-duplicates, if any"""
+    # the same posting already saved for another user / query
+    canonical = job_posting_repo.get_by_fingerprint(job.fingerprint, job.canonical_url)  # type: ignore[arg-type]
+    score = 1.0
+    if canonical is None and signature is not None:
+        candidates = {
+            id: from_bytes(sig)
+            for id, sig in signature_repo.get_candidates(band_keys(signature)).items()
+        }
+        # most similar description first, but only at the same company & role
+        while canonical is None and (match := best_match(signature, candidates)):
+            del candidates[match[0]]
+            posting = job_posting_repo.get_by_id(match[0])  # type: ignore[arg-type]
+            if posting and same_role(job, posting):
+                canonical, score = posting, match[1]
+    if canonical and canonical.canonical_posting_id:
+        canonical = job_posting_repo.get_by_id(canonical.canonical_posting_id)
+    if canonical:
+        logger.info(
+            f"'{job.title}' at '{job.company}' duplicates ({score:.2f}) "
+            f"'{canonical.title}' at '{canonical.company}' (id: {canonical.id})"
+        )
+    return canonical
+
+
+def link_duplicate(
+    job: JobPosting,
+    job_posting_repo: JobPostingRepo,
+    signature_repo: JobSignatureRepo,
+    report: RunReport,
+) -> Tuple[JobPosting | None, Any]:
+    """
+    Store a (near-)duplicate linked to its canonical posting, reusing that
+    posting's company review & (later) summary. Returns (saved posting or
+    None when it's an original, its MinHash signature)
+    """
+    # boilerplate & markup are already out of description_text (see
+    # clean_descriptions), so only the posting itself is compared
+    signature = minhasher.signature(job.description_text or job.description)
+    canonical = find_canonical(job, signature, job_posting_repo, signature_repo)
+    if canonical is None:
+        return None, signature
+    job.canonical_posting_id = canonical.id
+    job.company_info_id = canonical.company_info_id
+    report.incr("near_duplicates_linked")
+    saved = job_posting_repo.add(job)
+    if signature is not None:
+        signature_repo.add(saved.id, to_bytes(signature), band_keys(signature))  # type: ignore[arg-type]
+    return saved, signature
+
+
+def lookup_companies(
+    jobs: List[JobPosting],
+    company_reviews: CompanyReviewService,
+    company_info_repo: CompanyInfoRepo,
+) -> List[str]:
+    """Memo the stored reviews of a batch's companies; returns the ones without"""
+    missing = []
+    for job in jobs:
+        if company_reviews.is_known(job.company):
+            continue
+        company_info = company_info_repo.get_by_name(job.company)
+        if company_info:
+            company_reviews.remember(job.company, company_info)
+        else:
+            logger.info(
+                f"No existing company info found for '{job.company}'. Generating new review..."
+            )
+            missing.append(job.company)
+    return missing
+
+
+def store_posting(
+    job: JobPosting,
+    signature,
+    company_info: CompanyInfo | None,
+    company_info_repo: CompanyInfoRepo,
+    job_posting_repo: JobPostingRepo,
+    signature_repo: JobSignatureRepo,
+) -> JobPosting:
+    if company_info is not None:  # None: its review is queued (see link_company)
+        if company_info.id is None:  # reviewed this run, stored with its first posting
+            company_info_repo.add(company_info)
+        job.company_info_id = company_info.id
+    logger.info(f"Writing job '{job.title}' to database...")
+    saved = job_posting_repo.add(job)
+    if signature is not None:
+        signature_repo.add(saved.id, to_bytes(signature), band_keys(signature))  # type: ignore[arg-type]
+    return saved
+
+
+def drop_known(
+    jobs: List[JobPosting],
+    job_posting_repo: JobPostingRepo,
+    seen_keys: Set[Tuple[int | None, str]],
+    report: RunReport,
+) -> List[JobPosting]:
+    """
+    Fingerprint a batch & drop postings already in the db (or earlier in
+    this run) before any company review / summary is spent on them.
+    A posting is known per user; without a user it's known to anyone.
+    """
+    for job in jobs:
+        fingerprint_posting(job)
+    known = job_posting_repo.get_existing_keys(
+        [job.fingerprint for job in jobs],  # type: ignore[misc]
+        [job.canonical_url for job in jobs],  # type: ignore[misc]
+    )
+    known |= seen_keys
+    known_to_anyone = {key for _, key in known}
+
+    new_jobs = []
+    for job in jobs:
+        keys = {
+            (job.user_id, key) for key in (job.fingerprint, job.canonical_url) if key
+        }
+        if job.user_id is None:
+            is_known = any(key in known_to_anyone for _, key in keys)
+        else:
+            is_known = bool(keys & known)
+        if is_known:
+            logger.info(f"Skipping known posting '{job.title}' at '{job.company}'")
+            report.incr("postings_known_skipped")
+            # each known posting would have been summarized again
+            report.incr("llm_calls_saved")
+            continue
+        seen_keys |= keys
+        new_jobs.append(job)
+    return new_jobs
+
+
+def clean_descriptions(
+    jobs: List[JobPosting], boilerplate: BoilerplateLibrary, report: RunReport
+) -> None:
+    """
+    Fill in each posting's description_text / description_html. The batch's
+    paragraphs are counted first, so a block repeated across it is already
+    dropped as boilerplate.
+    """
+    for job in jobs:
+        boilerplate.observe(to_paragraphs(job.description or ""))
+    for job in jobs:
+        cleaned = clean_description(job.description, boilerplate)
+        job.description_text = cleaned.text
+        job.description_html = cleaned.html
+        report.incr("description_tokens_scraped", cleaned.tokens_before)
+        report.incr(
+            "description_tokens_saved", cleaned.tokens_before - cleaned.tokens_after
+        )
+
+
+async def discover_and_store(
+    batches: AsyncIterator[List[JobPosting]],
+    company_info_repo: CompanyInfoRepo,
+    job_posting_repo: JobPostingRepo,
+    signature_repo: JobSignatureRepo,
+    boilerplate: BoilerplateLibrary,
+    report: RunReport,
+    task_repo: TaskRepo | None = None,
+) -> List[JobPosting]:
+    """
+    Review & persist postings as soon as sources yield them, so the slow
+    stages overlap with sources that are still downloading/parsing. With a
+    task_repo, unseen companies' reviews are queued for the workers instead.
+    """
+    stored = []
+    seen_keys: Set[Tuple[int | None, str]] = set()
+    company_reviews = CompanyReviewService()
+    i = 0
+    async for batch in batches:
+        report.incr("postings_discovered", len(batch))
+        new_jobs = await asyncio.to_thread(
+            drop_known, batch, job_posting_repo, seen_keys, report
+        )
+        await asyncio.to_thread(clean_descriptions, new_jobs, boilerplate, report)
+        # review the batch's unseen companies concurrently, while its
+        # postings are stored one at a time (the db session isn't safe for
+        # concurrent use) and the sources keep streaming into the queue
+        missing = await asyncio.to_thread(
+            lookup_companies, new_jobs, company_reviews, company_info_repo
+        )
+        if task_repo is not None:
+            for company in missing:
+                if await asyncio.to_thread(enqueue_company_review, task_repo, company):
+                    report.incr("tasks_enqueued")
+        else:
+            company_reviews.prefetch(missing)
+        for job in new_jobs:
+            i += 1
+            log_job(i, job)
+            try:
+                saved, signature = await asyncio.to_thread(
+                    link_duplicate, job, job_posting_repo, signature_repo, report
+                )
+                if saved is None:
+                    company_info = None
+                    if task_repo is None or company_reviews.is_known(job.company):
+                        logger.info(f"Reviewing company info for '{job.company}'...")
+                        company_info = await company_reviews.areview(job.company)
+                    saved = await asyncio.to_thread(
+                        store_posting,
+                        job,
+                        signature,
+                        company_info,
+                        company_info_repo,
+                        job_posting_repo,
+                        signature_repo,
+                    )
+            except Exception as e:
+                logger.error(f"Storing '{job.title}' at '{job.company}' failed: {e}")
+                report.incr("postings_failed")
+                continue
+            stored.append(saved)
+    await company_reviews.aclose()
+    for name, value in company_reviews.stats.items():
+        report.set(f"company_{name}", value)
+    report.note(f"Company reviews: {company_reviews.summary()}")
+    logger.info(f"Found {i} new jobs")
+    if i:
+        report.set(
+            "description_tokens_saved_per_posting",
+            report.counters["description_tokens_saved"] / i,
+        )
+    report.incr("postings_stored", len(stored))
+    return stored
+
+
+async def summarize_new_jobs(
+    job_posting_repo: JobPostingRepo,
+    job_summary_repo: JobSummaryRepo,
+    report: RunReport,
+) -> int:
+    """
+    Summarize every posting that doesn't have a summary yet. LLM calls run
+    concurrently (up to the provider's limit) & finished summaries are saved
+    SUMMARY_CHUNK_SIZE at a time; a posting whose call or chunk fails is
+    logged & left unsummarized for the next run. Duplicates copy their
+    canonical posting's summary, once that exists.
+    """
+    jobs = []
+    for job in job_posting_repo.get_unsummarized():
+        if not job.id:
+            logger.warning(f"Skipping job without ID: {job.title}")
+            continue
+        jobs.append(job)
+    if not jobs:
+        return 0
+
+    summarizer = SummaryAgent()
+    pending: List[JobSummary] = []
+    saved = 0
+
+    def flush() -> None:
+        nonlocal saved
+        if not pending:
+            return
+        try:
+            job_summary_repo.add_many(pending)
+            saved += len(pending)
+        except Exception as e:
+            logger.error(f"Saving {len(pending)} summaries failed: {e}")
+            report.incr("summaries_failed", len(pending))
+        pending.clear()
+
+    async def summarize(batch: List[JobPosting]) -> None:
+        if not batch:
+            return
+        async for i, summary in summarizer.asummarize_jobs(
+            [llm_description(job) for job in batch]
+        ):
+            job = batch[i]
+            report.incr("llm_summary_calls")
+            if isinstance(summary, Exception):
+                logger.error(
+                    f"Summarizing '{job.title}' (id: {job.id}) failed: {summary}"
+                )
+                report.incr("summaries_failed")
+                continue
+            summary.job_posting_id = job.id
+            logger.info(f"Generated summary for job: {job.title} ({job.id})")
+            logger.debug(f"Summary content: {summary}")
+            pending.append(summary)
+            if len(pending) >= SUMMARY_CHUNK_SIZE:
+                flush()
+        flush()
+
+    started = time.monotonic()
+    # canonical postings first, so their duplicates can reuse the summaries
+    await summarize([job for job in jobs if not job.canonical_posting_id])
+    unmatched = []
+    for job in jobs:
+        if not job.canonical_posting_id:
+            continue
+        summary = copy_summary(job, job_summary_repo)
+        if summary is None:
+            unmatched.append(job)
+            continue
+        logger.info(
+            f"Reused summary of posting {job.canonical_posting_id} for: {job.title}"
+        )
+        report.incr("llm_calls_saved")
+        pending.append(summary)
+    flush()
+    await summarize(unmatched)
+
+    elapsed = time.monotonic() - started
+    report.set("summaries_saved", saved)
+    report.set("summaries_map_reduced", summarizer.map_reduced)
+    report.set("summary_postings_per_minute", len(jobs) / max(elapsed, 1e-6) * 60)
+    report.note(
+        f"Summaries: {saved}/{len(jobs)} saved in {elapsed:.1f}s, "
+        f"{summarizer.max_concurrency} in flight"
+    )
+    return saved
+
+
+def enqueue_summaries(
+    job_posting_repo: JobPostingRepo, task_repo: TaskRepo, report: RunReport
+) -> int:
+    """Queue a summary task per unsummarized posting (see src/worker.py)"""
+    queued = 0
+    for job in job_posting_repo.get_unsummarized():
+        if enqueue_summary(task_repo, job.id, bool(job.canonical_posting_id)):  # type: ignore[arg-type]
+            queued += 1
+    report.incr("tasks_enqueued", queued)
+    report.note(f"Task queue: {task_repo.counts()}")
+    return queued
+
 
 def main():
     logger.info("Starting job search process...")
@@ -25,83 +425,122 @@ def main():
         * could this be a tab in the streamlit UI that opens an interactive chat window? 
         * using a speech model for interview practice
     """
+    report = RunReport()
+    if LLM_WARM_UP and not TASK_QUEUE:  # load the models while discovery runs
+        warm_up_roles("summary", "review")
     logger.info("Establishing database connection...")
     try:
+        init_db()
         db_session = get_session()
         logger.info(f"Database connection successful: {db_session}")
         job_posting_repo = JobPostingRepo(db_session)
         job_summary_repo = JobSummaryRepo(db_session)
         company_info_repo = CompanyInfoRepo(db_session)
+        signature_repo = JobSignatureRepo(db_session)
+        search_query_repo = JobSearchQueryRepo(db_session)
+        watermark_repo = SourceWatermarkRepo(db_session)
+        credit_repo = SearchCreditRepo(db_session)
+        health_repo = SourceHealthRepo(db_session)
+        boilerplate_repo = BoilerplateRepo(db_session)
+        # LLM work goes to the durable queue for src/worker.py to run
+        task_repo = TaskRepo(db_session) if TASK_QUEUE else None
     except Exception as e:
         logger.error(f"Database connection failed: {e}")
 
-    # 1. find jobs - service
-    try:  # find new ai engineer jobs
-        logger.info("🔍 Searching for AI Engineer jobs...")
+    # 1. find jobs - service & add jobs to db as they stream in
+    health = None
+    boilerplate = None
+    try:
+        boilerplate = BoilerplateLibrary(boilerplate_repo.get_counts())
+        # only fetch what's newer than each (source, query)'s last run
+        # sources that kept failing on earlier runs stay skipped until their
+        # breaker's cool-down passes
+        health = HealthTracker(health_repo.get_states())
+        service = JobDiscoveryService(
+            watermarks=watermark_repo.get_all(),
+            yields=watermark_repo.get_yields(),
+            health=health,
+        )
+        today = utcnow().date()
+        credits_left = SERP_API_DAILY_CREDITS - credit_repo.used_on("serp_api", today)
+        credit_budget.reset(max(0, min(SERP_API_RUN_CREDITS, credits_left)))
+        saved_queries = search_query_repo.get_active()
+        if saved_queries:  # every user's saved searches, coalesced
+            logger.info(f"🔍 Searching for {len(saved_queries)} saved queries...")
+            batches = abatched(service.astream_batch(saved_queries))
+        else:  # find new ai engineer jobs
+            logger.info("🔍 Searching for AI Engineer jobs...")
+            batches = service.astream_batches(ai_engineer_query())
         logger.info("=" * 80)
-        jobs = find_ai_engineer_jobs()
-
+        jobs = asyncio.run(
+            discover_and_store(
+                batches,
+                company_info_repo,
+                job_posting_repo,
+                signature_repo,
+                boilerplate,
+                report,
+                task_repo,
+            )
+        )
         logger.info("=" * 80)
-        logger.info(f"Found {len(jobs)} AI Engineer jobs")
-
-        for i, job in enumerate(jobs, 1):
-            logger.info(f"{i}. {job.title}")
-            logger.info(f"   Company: {job.company}")
-            logger.info(f"   Location: {job.location}")
-            logger.info(f"   Source: {job.source}")
-            if job.url:
-                logger.info(f"   URL: {job.url}")
-            logger.info(f"   Description: {job.description[:200]}...")
-            logger.info("-" * 50)
+        logger.info(f"Successfully wrote {len(jobs)} jobs to database")
+        # every posting up to these marks has now been stored or skipped;
+        # after failures keep the old marks so the next run retries them
+        if not report.counters["postings_failed"]:
+            watermark_repo.advance(service.high_water)
+            report.set("watermarks_advanced", len(service.high_water))
+        watermark_repo.set_yields(service.last_yields)
+        for name, value in service.last_plan_stats.items():
+            report.set(f"batch_{name}", value)
+        serp_new = sum(job.source == SERP_API_LABEL for job in jobs)
+        report.set("serp_api_new_postings", serp_new)
+        if credit_budget.spent:
+            report.set("serp_api_new_per_credit", serp_new / credit_budget.spent)
     except Exception as e:
         logger.error(f"Job search failed: {e}")
+    finally:
+        if boilerplate is not None and boilerplate.changed:
+            boilerplate_repo.save_counts(
+                {digest: boilerplate.counts[digest] for digest in boilerplate.changed}
+            )
+        if health is not None:
+            health_repo.save_states(health.export())
+            report.note(f"Source health: {health.summary()}")
+        if credit_budget.pages:
+            credit_repo.add(
+                SearchCreditUsage(
+                    source="serp_api",
+                    day=today,
+                    credits=credit_budget.spent,
+                    pages=credit_budget.pages,
+                )
+            )
+        report.set("serp_api_credits", credit_budget.spent)
+        report.set("serp_api_pages", credit_budget.pages)
+        report.note(f"SerpAPI: {credit_budget.summary()}")
 
-    try:  # add jobs to db
-        logger.info("=" * 80)
-        for job in jobs:
-            logger.info(f"Reviewing company info for '{job.company}'...")
-            company_info = company_info_repo.get_by_name(job.company)
-
-            if not company_info:
-                try:
-                    logger.info(
-                        f"No existing company info found for '{job.company}'. Generating new review..."
-                    )
-                    reviewer = ReviewAgent()
-                    company_info = reviewer.review_company(job.company)
-                    company_info_repo.add(company_info)
-                except Exception as e:
-                    logger.error(f"Failed to initialize ReviewAgent: {e}")
-                    continue
-            job.company_info_id = company_info.id if company_info else None
-            logger.info(f"Writing job '{job.title}' to database...")
-            job_posting_repo.add(job)
-        logger.info(f"Successfully wrote {len(jobs)} jobs to database")
-    except Exception as e:
-        logger.error(f"Database write failed: {e}")
+    http_cache = get_http_cache()
+    if http_cache:
+        report.note(f"HTTP cache: {http_cache.summary()}")
+    report.note(f"Rate limits: {rate_limiter.summary()}")
 
     # 2. summarize - graph
     try:  # summarize job posts
-        summarizer = SummaryAgent()
-        # get new jobs from db that haven't been summarized yet
-        new_jobs = job_posting_repo.get_new()
-        for job in new_jobs:
-            if not job.id:
-                logger.warning(f"Skipping job without ID: {job.title}")
-                continue
-            summary = summarizer.summarize_job(job.description)
-            summary.job_posting_id = job.id
-            logger.info(
-                f"Generated summary for job: {job.title} ({summary.job_posting_id})"
-            )
-            logger.debug(f"Summary content: {summary}")
-            logger.info("*-^-" * 20)
-            job_posting_repo.update_job(job_id=job.id, job_summary_id=summary.id)
-            job_summary_repo.add(summary)
-
+        if task_repo is not None:
+            enqueue_summaries(job_posting_repo, task_repo, report)
+        else:
+            asyncio.run(summarize_new_jobs(job_posting_repo, job_summary_repo, report))
     except Exception as e:
         logger.error(f"Job summarization failed: {e}")
 
+    llm_cache = get_llm_cache()
+    if llm_cache:
+        report.set("llm_cache_hit_rate", llm_cache.hit_rate)
+        report.note(f"LLM cache: {llm_cache.summary()}")
+    if route_stats.calls:
+        report.note(f"LLM routes: {route_stats.summary()}")
+
     # 3. send notification - service
     try:  # send email
         """
@@ -112,6 +551,9 @@ def main():
     except Exception as e:
         logger.error(f"Notification error: {e}")
 
+    report.log(logger)
+    return report
+
     # 4. listen for selection
     # 5. write application materials - agent
     # 6. send notification
@@ -1,9 +1,15 @@
-from core.llm import make_llm
-from core.models import ApplicationMaterials
+import asyncio
+import os
+import time
+from core.llm import get_llm, llm_concurrency, role_provider
+from core.models import ApplicationMaterials, JobPosting
 from core.db import get_session
-from core.repositories import ApplicantInfoRepo
+from core.applicant_index import RelevantInfo
+from core.repositories import ApplicantInfoRepo, TaskRepo
+from core.task_queue import enqueue_application
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
-from typing import Dict
+from sqlmodel import Session
+from typing import AsyncIterator, List, Optional, Tuple
 
 APP_SYS = f"""
 You are an expert career coach with a special focus on application materials. you are highly skilled in combining a job description & an applicant's personal information to write concise, impactful application materials. NEVER misrepresent the applicant's experience or skillset. frame skills & experiences in a way that specifically addresses the job description
@@ -32,18 +38,26 @@ Resume Guidelines:
 • Customization: Tailor your resume to emphasize experiences and skills that align with the job description.
 • Proofreading: Ensure the resume is free from grammatical errors and typos.
 """
+# seconds the resume & cover letter (generated together) may take per posting
+APP_DEADLINE = float(os.getenv("APP_DEADLINE_SECONDS", "180"))
 
 
 class AppAgent:
     def __init__(self):
+        # each application is two LLM calls, run side by side
+        self.max_concurrency = max(1, llm_concurrency(role_provider("resume")) // 2)
         try:
-            self.llm = make_llm()
+            # routed separately (see core.llm_routing), e.g. to different models
+            self.resume_llm = get_llm("resume")
+            self.cover_letter_llm = get_llm("cover_letter")
         except Exception as e:
             print(f"AppAgent error: {e}")
+            raise  # not an AttributeError on the first call
 
-    def write_cover_letter(
-        self, job_desc: str | None = None, applicant_info: str | None = None
-    ) -> AIMessage:
+    @staticmethod
+    def cover_letter_prompt(
+        job_desc: str | None = None, applicant_info: str | None = None
+    ) -> list:
         msg = f"""
 use {COVER_LETTER_INSTRUCTIONS} to write a cover letter for the following job & applicant info:            
 JOB DESCRIPTION:
@@ -52,17 +66,15 @@ JOB DESCRIPTION:
 APPLICANT_INFO:
 {applicant_info}
 """
-        prompt = [
+        return [
             SystemMessage(content=APP_SYS),
             HumanMessage(content=msg),
         ]
-        cover_letter = self.llm.invoke(input=prompt)
 
-        return cover_letter  # type: ignore[return-value]
-
-    def write_resume(
-        self, job_desc: str | None = None, applicant_info: str | None = None
-    ) -> AIMessage:
+    @staticmethod
+    def resume_prompt(
+        job_desc: str | None = None, applicant_info: str | None = None
+    ) -> list:
         msg = f"""
 use {RESUME_INSTRUCTIONS} to write a resume for the following job & applicant info:
 JOB DESCRIPTION:
@@ -72,38 +84,170 @@ JOB DESCRIPTION:
 APPLICANT_INFO:
 {applicant_info}
 """
-        prompt = [SystemMessage(content=APP_SYS), HumanMessage(content=msg)]
-        resume = self.llm.invoke(input=prompt)
+        return [SystemMessage(content=APP_SYS), HumanMessage(content=msg)]
+
+    def write_cover_letter(
+        self, job_desc: str | None = None, applicant_info: str | None = None
+    ) -> AIMessage:
+        cover_letter = self.cover_letter_llm.invoke(
+            input=self.cover_letter_prompt(job_desc, applicant_info)
+        )
+
+        return cover_letter  # type: ignore[return-value]
+
+    def write_resume(
+        self, job_desc: str | None = None, applicant_info: str | None = None
+    ) -> AIMessage:
+        resume = self.resume_llm.invoke(
+            input=self.resume_prompt(job_desc, applicant_info)
+        )
         return resume  # type: ignore[return-value]
 
+    async def awrite_materials(
+        self,
+        job_desc: str | None = None,
+        applicant_info: str | None = None,
+        deadline: float = APP_DEADLINE,
+    ) -> Tuple[str, str]:
+        """
+        (resume, cover letter), generated concurrently; raises TimeoutError
+        if both aren't done within deadline seconds
+        """
+        resume, cover_letter = await asyncio.wait_for(
+            asyncio.gather(
+                self.resume_llm.ainvoke(self.resume_prompt(job_desc, applicant_info)),
+                self.cover_letter_llm.ainvoke(
+                    self.cover_letter_prompt(job_desc, applicant_info)
+                ),
+            ),
+            timeout=deadline,
+        )
+        return as_text(resume.content), as_text(cover_letter.content)
 
-def create_job_app(job_description: str, user_id: int) -> ApplicationMaterials:
+
+def as_text(content) -> str:
+    return str(content) if not isinstance(content, str) else content
+
+
+def load_applicant_info(db: Session, user_id: int, job_desc: str) -> RelevantInfo:
+    """Just the applicant info relevant to this job (see core.applicant_index)"""
     try:
-        db = get_session()
-        appl_info_repo = ApplicantInfoRepo(db)
-        user_app_info_records = appl_info_repo.get_info_by_user_id(user_id)
-        applicant_info = "\n".join([record.content for record in user_app_info_records])
+        return ApplicantInfoRepo(db).get_relevant(user_id, job_desc)
     except Exception as e:
         raise ValueError(f"Error retrieving applicant info: {e}")
 
-    app_agent = AppAgent()
-    resume_content = app_agent.write_resume(
-        job_desc=job_description, applicant_info=applicant_info
-    ).content
-    cover_letter_content = app_agent.write_cover_letter(
-        job_desc=job_description, applicant_info=applicant_info
-    ).content
-
-    resume = (
-        str(resume_content) if not isinstance(resume_content, str) else resume_content
+
+async def write_materials(
+    app_agent: AppAgent,
+    job_desc: str,
+    applicant_info: RelevantInfo,
+    deadline: float = APP_DEADLINE,
+) -> Tuple[str, str]:
+    started = time.monotonic()
+    materials = await app_agent.awrite_materials(
+        job_desc, applicant_info.text, deadline
     )
-    cover_letter = (
-        str(cover_letter_content)
-        if not isinstance(cover_letter_content, str)
-        else cover_letter_content
+    print(
+        f"Application materials written in {time.monotonic() - started:.1f}s from "
+        f"{applicant_info.items}/{applicant_info.items_total} applicant info items "
+        f"({applicant_info.tokens}/{applicant_info.tokens_total} tokens)"
+    )
+    return materials
+
+
+def save_materials(
+    db: Session, resume: str, cover_letter: str, job_posting_id: Optional[int] = None
+) -> ApplicationMaterials:
+    app_materials = ApplicationMaterials(
+        resume=resume, cover_letter=cover_letter, job_posting_id=job_posting_id
     )
-    app_materials = ApplicationMaterials(resume=resume, cover_letter=cover_letter)
     db.add(app_materials)
     db.commit()
     db.refresh(app_materials)
     return app_materials
+
+
+async def acreate_job_app(
+    job_description: str,
+    user_id: int,
+    job_posting_id: Optional[int] = None,
+    deadline: float = APP_DEADLINE,
+) -> ApplicationMaterials:
+    db = get_session()
+    applicant_info = load_applicant_info(db, user_id, job_description)
+    resume, cover_letter = await write_materials(
+        AppAgent(), job_description, applicant_info, deadline
+    )
+    return save_materials(db, resume, cover_letter, job_posting_id)
+
+
+def create_job_app(
+    job_description: str, user_id: int, job_posting_id: Optional[int] = None
+) -> ApplicationMaterials:
+    return asyncio.run(acreate_job_app(job_description, user_id, job_posting_id))
+
+
+async def acreate_job_apps(
+    job_postings: List[JobPosting],
+    user_id: int,
+    max_concurrency: Optional[int] = None,
+    deadline: float = APP_DEADLINE,
+) -> AsyncIterator[Tuple[int, ApplicationMaterials | Exception]]:
+    """
+    Application materials for many postings, at most max_concurrency
+    (default: half the provider's LLM limit) generated at once. Yields
+    (index, materials) as each is saved; a failed or timed out posting
+    yields its exception instead of raising.
+    """
+    db = get_session()
+    app_agent = AppAgent()
+    limit = asyncio.Semaphore(max_concurrency or app_agent.max_concurrency)
+
+    async def create(i: int, job: JobPosting):
+        try:
+            job_desc = job.description_text or job.description
+            applicant_info = load_applicant_info(db, user_id, job_desc)
+            async with limit:
+                resume, cover_letter = await write_materials(
+                    app_agent, job_desc, applicant_info, deadline
+                )
+            return i, save_materials(db, resume, cover_letter, job.id)
+        except Exception as e:
+            return i, e
+
+    tasks = [
+        asyncio.ensure_future(create(i, job)) for i, job in enumerate(job_postings)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def create_job_apps(
+    job_postings: List[JobPosting], user_id: int
+) -> List[ApplicationMaterials | Exception]:
+    """acreate_job_apps for sync callers (the UI), results in posting order"""
+
+    async def collect():
+        results: List[ApplicationMaterials | Exception] = [None] * len(job_postings)  # type: ignore[list-item]
+        async for i, result in acreate_job_apps(job_postings, user_id):
+            results[i] = result
+        return results
+
+    return asyncio.run(collect())
+
+
+def queue_job_apps(job_posting_ids: List[int], user_id: int) -> int:
+    """
+    Queue application materials for src/worker.py to generate; returns how
+    many were queued (postings already queued for this user are skipped)
+    """
+    with get_session() as db:
+        task_repo = TaskRepo(db)
+        return sum(
+            enqueue_application(task_repo, job_posting_id, user_id) is not None
+            for job_posting_id in job_posting_ids
+        )
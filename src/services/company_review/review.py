@@ -8,9 +8,13 @@
 6. return company profile
 """
 
-from src.core.llm import make_llm
+import asyncio
+import threading
+from typing import Dict, Iterable, Optional, Set
+from core.fingerprint import company_key
+from core.llm import get_llm, llm_concurrency, role_provider
 from langchain_core.messages import SystemMessage, HumanMessage
-from src.core.models import CompanyInfo
+from core.models import CompanyInfo
 
 REVIEW_SYS = """
     You are Company Summarizer, a concise research assistant for job seekers.
@@ -63,15 +67,99 @@ REVIEW_SYS = """
 class ReviewAgent:
     def __init__(self):
         try:
-            self.llm = make_llm()
+            self.llm = get_llm("review")
         except Exception as e:
-            print(f"SummaryAgent error: {e}")
+            print(f"ReviewAgent error: {e}")
+            raise  # CompanyReviewService records it for every waiting posting
 
-    def review_company(self, company_name: str | None = None) -> CompanyInfo:
-        prompt = [
+    @staticmethod
+    def prompt(company_name: str | None) -> list:
+        return [
             SystemMessage(content=REVIEW_SYS),
             HumanMessage(content=company_name),
         ]
+
+    def review_company(self, company_name: str | None = None) -> CompanyInfo:
+        prompt = self.prompt(company_name)
         summary = self.llm.with_structured_output(CompanyInfo).invoke(input=prompt)
 
         return summary  # type: ignore[return-value]
+
+    async def areview_company(self, company_name: str | None = None) -> CompanyInfo:
+        prompt = self.prompt(company_name)
+        summary = await self.llm.with_structured_output(CompanyInfo).ainvoke(
+            input=prompt
+        )
+
+        return summary  # type: ignore[return-value]
+
+
+class CompanyReviewService:
+    """
+    Company reviews for one run: a single ReviewAgent, a memo keyed on the
+    normalized company name and single-flight calls, so every posting for
+    a company shares one review (or its failure) while distinct companies
+    are reviewed concurrently, up to the provider's concurrency limit
+    """
+
+    def __init__(self, agent: Optional[ReviewAgent] = None, max_concurrency=None):
+        self._agent = agent
+        self._agent_lock = threading.Lock()
+        self._limit = asyncio.Semaphore(
+            max_concurrency or llm_concurrency(role_provider("review"))
+        )
+        self._known: Dict[str, CompanyInfo] = {}
+        self._reviews: Dict[str, asyncio.Task] = {}
+        self._requested: Set[str] = set()
+        # LLM reviews, postings answered from a stored review / from a
+        # review another posting of this run already asked for
+        self.stats = {"reviews": 0, "stored": 0, "shared": 0}
+
+    @property
+    def agent(self) -> ReviewAgent:
+        with self._agent_lock:
+            if self._agent is None:
+                self._agent = ReviewAgent()
+            return self._agent
+
+    def remember(self, company_name: str | None, company_info: CompanyInfo) -> None:
+        """Use an already stored review for this company"""
+        self._known.setdefault(company_key(company_name), company_info)
+
+    def is_known(self, company_name: str | None) -> bool:
+        key = company_key(company_name)
+        return key in self._known or key in self._reviews
+
+    async def _review(self, company_name: str | None) -> CompanyInfo:
+        async with self._limit:
+            self.stats["reviews"] += 1
+            return await self.agent.areview_company(company_name)
+
+    def prefetch(self, company_names: Iterable[str | None]) -> None:
+        """Start reviews for these companies without waiting on them"""
+        for company_name in company_names:
+            key = company_key(company_name)
+            if key not in self._known and key not in self._reviews:
+                self._reviews[key] = asyncio.ensure_future(self._review(company_name))
+
+    async def areview(self, company_name: str | None) -> CompanyInfo:
+        key = company_key(company_name)
+        if key in self._known:
+            self.stats["stored"] += 1
+            return self._known[key]
+        if key in self._requested:
+            self.stats["shared"] += 1
+        self._requested.add(key)
+        self.prefetch([company_name])
+        # shielded: one caller giving up mustn't cancel the others' review
+        return await asyncio.shield(self._reviews[key])
+
+    async def aclose(self) -> None:
+        """Wait out reviews nobody asked for in the end (& retrieve their errors)"""
+        await asyncio.gather(*self._reviews.values(), return_exceptions=True)
+
+    def summary(self) -> str:
+        return (
+            f"{self.stats['reviews']} reviewed, {self.stats['stored']} already "
+            f"stored, {self.stats['shared']} shared within the run"
+        )
@@ -7,10 +7,60 @@ import os
 from dotenv import load_dotenv
 
 load_dotenv()
-SERP_API_KEY = os.getenv("SERP_API_KEY")
+# seconds each source gets before its results are dropped from the run
+SOURCE_TIMEOUT = float(os.getenv("SOURCE_TIMEOUT", "30"))
 
-from typing import List
+import asyncio
+import contextlib
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 from core.models import JobPosting, JobSearchQuery
+from services.job_discovery.health import HealthTracker
+from services.job_discovery.sources.base import JobSource, SOURCE_REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# importing a source module registers its JobSource factories
+SOURCE_MODULES = [
+    "services.job_discovery.sources.public_scraper",
+    "services.job_discovery.sources.serp_api",
+]
+
+# max source requests in flight during a batch run (hosts are rate limited too)
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+# how far before a watermark incremental fetches still look, to absorb
+# coarse relative dates ("1 day ago") & late-indexed postings
+WATERMARK_OVERLAP = timedelta(hours=float(os.getenv("WATERMARK_OVERLAP_HOURS", "24")))
+
+_SOURCE_DONE = object()
+
+# (source name, normalized keywords, normalized location or None)
+FetchKey = Tuple[str, str, Optional[str]]
+# (source name, source, query to run, tag passed through with each posting)
+Fetch = Tuple[str, JobSource, JobSearchQuery, Any]
+# (source name, "keywords|location") as stored in the SourceWatermark table
+WatermarkKey = Tuple[str, str]
+
+
+class _FetchDone(NamedTuple):
+    """Queued after a fetch's last posting"""
+
+    key: FetchKey
+    completed: bool  # False if the fetch failed or timed out
+    fresh: int  # postings newer than the fetch's previous watermark
 
 
 class JobDiscoveryService:
@@ -18,74 +68,307 @@ class JobDiscoveryService:
     Coordinates multiple job search sources that don't require authentication
     """
 
-    def __init__(self):
-        self.sources = []  # Tuple(str, SearchObject)
+    def __init__(
+        self,
+        concurrent: bool = True,
+        source_timeout: float = SOURCE_TIMEOUT,
+        source_timeouts: Optional[Dict[str, float]] = None,
+        watermarks: Optional[Mapping[WatermarkKey, datetime]] = None,
+        watermark_overlap: timedelta = WATERMARK_OVERLAP,
+        yields: Optional[Mapping[WatermarkKey, int]] = None,
+        health: Optional[HealthTracker] = None,
+    ):
+        self.sources: List[Tuple[str, JobSource]] = []
+        self.concurrent = concurrent
+        self.source_timeout = source_timeout
+        self.source_timeouts = source_timeouts or {}
+        self.last_plan_stats: Dict[str, int] = {}
+        # newest posted date already seen per (source, query) - input ...
+        self.watermarks: Mapping[WatermarkKey, datetime] = watermarks or {}
+        self.watermark_overlap = watermark_overlap
+        # ... & newest posted date handed on from each completed fetch this run
+        self.high_water: Dict[WatermarkKey, datetime] = {}
+        # per fetch this run: newest posted date yielded & whether any of its
+        # postings were cut by max_results (see _yielded / _capped)
+        self._newest_yielded: Dict[FetchKey, datetime] = {}
+        self._cut: Set[FetchKey] = set()
+        # fresh postings per (source, query) last run - batch runs start with
+        # the most productive fetches so metered sources spend credits there
+        self.yields: Mapping[WatermarkKey, int] = yields or {}
+        self.last_yields: Dict[WatermarkKey, int] = {}
+        # per-source error rate / latency & circuit breaker
+        self.health = health or HealthTracker()
         self._initialize_sources()
 
     def _initialize_sources(self):
-        """Initialize available job sources"""
+        """Initialize available job sources from the source registry"""
+        import importlib
+
+        for module in SOURCE_MODULES:
+            try:
+                importlib.import_module(module)
+            except ImportError as e:
+                logger.error(f"can't load job sources from {module}: {e}")
+
+        for source_name, factory in SOURCE_REGISTRY.items():
+            try:
+                source = factory()
+            except Exception as e:
+                logger.error(f"can't initialize source {source_name}: {e}")
+                continue
+            if source is not None:
+                self.sources.append((source_name, source))
+
+    def _timeout_for(self, source_name: str) -> float:
+        return self.source_timeouts.get(source_name, self.source_timeout)
+
+    def _since(self, key: FetchKey) -> Optional[datetime]:
+        mark = self.watermarks.get(watermark_key(key))
+        return mark - self.watermark_overlap if mark else None
+
+    def _reset_run(self) -> None:
+        self.high_water, self.last_yields = {}, {}
+        self._newest_yielded, self._cut = {}, set()
+
+    def _yielded(self, key: FetchKey, job: JobPosting) -> None:
+        """A fetch's posting was handed on to the caller"""
+        newest = self._newest_yielded.get(key)
+        if job.posted_at and (newest is None or job.posted_at > newest):
+            self._newest_yielded[key] = job.posted_at
+
+    def _capped(self, key: FetchKey) -> None:
+        """A fetch's posting was dropped because its query hit max_results"""
+        self._cut.add(key)
+
+    def _advance(self, done: _FetchDone) -> None:
+        """
+        A fetch's postings have all been consumed: move its mark up to the
+        newest one actually yielded. A failed fetch, or one cut off by
+        max_results, keeps its old mark so what it missed is fetched again.
+        """
+        key = watermark_key(done.key)
+        self.last_yields[key] = self.last_yields.get(key, 0) + done.fresh
+        if not done.completed or done.key in self._cut:
+            return
+        newest = self._newest_yielded.get(done.key)
+        current = self.high_water.get(key)
+        if newest and (current is None or newest > current):
+            self.high_water[key] = newest
+
+    async def _pump(self, fetch: Fetch, queue, semaphore=None) -> None:
+        """Push one source's (tag, fetch key, posting) onto the queue until done, failed or timed out"""
+        source_name, source, query, tag = fetch
+        key = fetch_key(source_name, source, query)
+        since = self._since(key)
+        mark = self.watermarks.get(watermark_key(key))
+        timeout = self._timeout_for(source_name)
+        fresh = 0
+        completed = False
+        started = None
         try:
-            from services.job_discovery.sources.public_scraper import PublicJobScraper
+            async with semaphore or contextlib.nullcontext():
+                if not self.health.allow(source_name):
+                    logger.warning(
+                        f"Skipping {source_name} for '{query.keywords}': "
+                        "circuit breaker open"
+                    )
+                    return
+                logger.info(f"Searching {source_name} for '{query.keywords}'...")
+                started = time.monotonic()
+                async with asyncio.timeout(timeout):
+                    async for job in source.stream(query, timeout=timeout, since=since):
+                        if not (mark and job.posted_at and job.posted_at <= mark):
+                            fresh += 1
+                        await queue.put((tag, key, job))
+            completed = True
+            self.health.record(source_name, True, time.monotonic() - started)
+        except TimeoutError:
+            logger.warning(
+                f"Timed out searching {source_name} after {timeout:.0f}s; "
+                "skipping remaining results"
+            )
+            self.health.record(source_name, False, timeout, "timeout")
+        except Exception as e:
+            logger.error(f"Error searching {source_name}: {e!r}")
+            self.health.record(
+                source_name,
+                False,
+                time.monotonic() - (started or time.monotonic()),
+                repr(e),
+            )
+        finally:
+            # a partial fetch may have missed postings, so it can't advance the mark
+            await queue.put(_FetchDone(key, completed, fresh))
 
-            self.sources.append(("public_scraper", PublicJobScraper()))
-        except ImportError:
-            print("can't initialize source: PublicJobScraper")
+    async def _stream_sequential(self, fetches: List[Fetch]) -> AsyncIterator:
+        queue: asyncio.Queue = asyncio.Queue()
+        for fetch in fetches:
+            pump = asyncio.create_task(self._pump(fetch, queue))
+            try:
+                while not isinstance(item := await queue.get(), _FetchDone):
+                    yield item
+                self._advance(item)
+            finally:
+                pump.cancel()
+                raise_first(await asyncio.gather(pump, return_exceptions=True))
 
+    async def _stream_concurrent(
+        self, fetches: List[Fetch], max_concurrency: Optional[int] = None
+    ) -> AsyncIterator:
+        """
+        Fan out to every source at once & yield postings as they're parsed.
+        A source that misses its deadline is cancelled, so the run takes as
+        long as the slowest source (capped by its timeout).
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        pumps = [
+            asyncio.create_task(self._pump(fetch, queue, semaphore))
+            for fetch in fetches
+        ]
+        remaining = len(pumps)
         try:
-            from services.job_discovery.sources.serp_api import SerpAPIJobSearch
+            while remaining:
+                item = await queue.get()
+                if isinstance(item, _FetchDone):
+                    self._advance(item)
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            for pump in pumps:
+                pump.cancel()
+            raise_first(await asyncio.gather(*pumps, return_exceptions=True))
 
-            if SERP_API_KEY:
-                self.sources.append(
-                    ("serp_api", SerpAPIJobSearch(api_key=SERP_API_KEY))
-                )
-            else:
-                print("can't initialize source: SerpAPIJobSearch\n**check API key")
-        except ImportError:
-            print("SerpAPI not available")
+    def _stream(self, fetches: List[Fetch], max_concurrency: Optional[int] = None):
+        if self.concurrent:
+            return self._stream_concurrent(fetches, max_concurrency)
+        return self._stream_sequential(fetches)
 
-    def search_jobs(self, query: JobSearchQuery) -> List[JobPosting]:
+    async def astream_jobs(self, query: JobSearchQuery) -> AsyncIterator[JobPosting]:
         """
-        Search for jobs across all available sources
+        Stream unique postings across all sources as soon as each is parsed
         """
-        all_jobs = []
+        self._reset_run()
+        stream = self._stream(
+            [(source_name, source, query, None) for source_name, source in self.sources]
+        )
+        # Remove duplicates based on title + company
+        seen: Set[Tuple[str, str]] = set()
+        emitted = 0
+        try:
+            async for _, fetch, job in stream:
+                key = (job.title.lower(), job.company.lower())
+                if key in seen:
+                    continue
+                # past max_results keep draining (sources are capped too) so
+                # the other fetches still complete & advance their watermarks
+                if emitted >= query.max_results:
+                    self._capped(fetch)
+                    continue
+                seen.add(key)
+                self._yielded(fetch, job)
+                yield job
+                emitted += 1
+        finally:
+            await stream.aclose()
 
-        # todo - refactor sources to all expose .search_jobs() -> simplify this loop
-        for source_name, source in self.sources:
-            try:
-                print(f"Searching {source_name} for '{query.keywords}'...")
+    def astream_batches(
+        self, query: JobSearchQuery, max_size: int = 25
+    ) -> AsyncIterator[List[JobPosting]]:
+        return abatched(self.astream_jobs(query), max_size)
 
-                if source_name == "public_scraper":
-                    indeed_jobs = source.search_indeed_jobs(
-                        query.keywords, query.location, query.max_results // 2
+    def plan_batch(
+        self, queries: Sequence[JobSearchQuery]
+    ) -> Dict[FetchKey, Tuple[JobSearchQuery, List[JobSearchQuery]]]:
+        """
+        Coalesce identical (source, keywords, location) requests across queries:
+        fetch key -> (merged query sized for the largest member, member queries)
+        """
+        plan: Dict[FetchKey, Tuple[JobSearchQuery, List[JobSearchQuery]]] = {}
+        for query in queries:
+            for source_name, source in self.sources:
+                key = fetch_key(source_name, source, query)
+                if key not in plan:
+                    merged = JobSearchQuery(
+                        keywords=query.keywords,
+                        location=query.location,
+                        max_results=query.max_results,
                     )
-                    all_jobs.extend(indeed_jobs)
+                    plan[key] = (merged, [])
+                merged, members = plan[key]
+                merged.max_results = max(merged.max_results, query.max_results)
+                members.append(query)
+        return plan
 
-                    remote_jobs = source.search_remote_ok_jobs(
-                        query.keywords, query.max_results // 2
-                    )
-                    all_jobs.extend(remote_jobs)
+    async def astream_batch(
+        self,
+        queries: Sequence[JobSearchQuery],
+        max_concurrency: int = BATCH_CONCURRENCY,
+    ) -> AsyncIterator[JobPosting]:
+        """
+        Run many saved queries with one fetch per distinct request, fanning each
+        posting back out as a copy linked to every query that asked for it
+        """
+        plan = self.plan_batch(queries)
+        self._reset_run()
+        self.last_plan_stats = {
+            "queries": len(queries),
+            "requests_naive": len(queries) * len(self.sources),
+            "requests_planned": len(plan),
+            "requests_incremental": sum(
+                watermark_key(key) in self.watermarks for key in plan
+            ),
+        }
+        logger.info(
+            f"Planned {len(plan)} fetches for {len(queries)} queries "
+            f"({self.last_plan_stats['requests_naive']} without coalescing)"
+        )
+        sources = dict(self.sources)
+        # most productive first; fetches never run before go ahead of all
+        ordered = sorted(
+            plan.items(),
+            key=lambda item: -self.yields.get(watermark_key(item[0]), float("inf")),
+        )
+        fetches = [
+            (key[0], sources[key[0]], merged, members)
+            for key, (merged, members) in ordered
+        ]
 
-                elif source_name == "serp_api":
-                    serp_jobs = source.search_jobs(
-                        query.keywords, query.location, query.max_results
+        # per query: postings already yielded (title + company)
+        seen: Dict[int, Set[Tuple[str, str]]] = {id(q): set() for q in queries}
+        stream = self._stream(fetches, max_concurrency)
+        try:
+            async for members, fetch, job in stream:
+                key = (job.title.lower(), job.company.lower())
+                for query in members:
+                    query_seen = seen[id(query)]
+                    if key in query_seen:
+                        continue
+                    if len(query_seen) >= query.max_results:
+                        self._capped(fetch)
+                        continue
+                    query_seen.add(key)
+                    self._yielded(fetch, job)
+                    yield JobPosting(
+                        **job.model_dump(
+                            exclude={"id", "created_at", "search_query_id", "user_id"}
+                        ),
+                        search_query_id=query.id,
+                        user_id=query.user_id,
                     )
-                    all_jobs.extend(serp_jobs)
+        finally:
+            await stream.aclose()
 
-            except Exception as e:
-                print(f"Error searching {source_name}: {e}")
-                continue
-
-        # Remove duplicates based on title + company
-        # todo - move this up to compare to jobs in DB
-        seen = set()
-        unique_jobs = []
-        for job in all_jobs:
-            key = (job.title.lower(), job.company.lower())
-            if key not in seen:
-                seen.add(key)
-                unique_jobs.append(job)
+    async def asearch_jobs(self, query: JobSearchQuery) -> List[JobPosting]:
+        return [job async for job in self.astream_jobs(query)]
 
-        return unique_jobs[: query.max_results]
+    def search_jobs(self, query: JobSearchQuery) -> List[JobPosting]:
+        """
+        Search for jobs across all available sources
+        (use astream_jobs / asearch_jobs from inside a running event loop)
+        """
+        return asyncio.run(self.asearch_jobs(query))
 
     def search_ai_engineer_jobs(
         self, location: str = "United States"
@@ -93,10 +376,69 @@ class JobDiscoveryService:
         """
         Convenience method to search for AI Engineer jobs
         """
-        query = JobSearchQuery(
-            keywords="AI Engineer", location=location, max_results=20
-        )
-        return self.search_jobs(query)
+        return self.search_jobs(ai_engineer_query(location))
+
+
+def fetch_key(source_name: str, source: JobSource, query: JobSearchQuery) -> FetchKey:
+    """Identity of the request a source would make for a query"""
+    keywords = " ".join(query.keywords.lower().split())
+    location = (
+        " ".join(query.location.lower().split())
+        if getattr(source, "uses_location", True)
+        else None
+    )
+    return (source_name, keywords, location)
+
+
+def watermark_key(key: FetchKey) -> WatermarkKey:
+    source_name, keywords, location = key
+    return (source_name, f"{keywords}|{location or '*'}")
+
+
+def raise_first(results: Sequence[Any]) -> None:
+    """Re-raise the first error gathered from tasks (cancellation is expected)"""
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+
+
+async def abatched(
+    stream: AsyncIterator[JobPosting], max_size: int = 25
+) -> AsyncIterator[List[JobPosting]]:
+    """
+    Regroup a posting stream into small batches: each batch is whatever has
+    arrived (up to max_size) by the time the consumer asks, so bulk db
+    lookups don't hold up the first postings
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def produce():
+        try:
+            async for job in stream:
+                await queue.put(job)
+        finally:
+            await queue.put(_SOURCE_DONE)
+
+    producer = asyncio.create_task(produce())
+    try:
+        done = False
+        while not done:
+            batch = [await queue.get()]
+            while len(batch) < max_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            if batch[-1] is _SOURCE_DONE:
+                batch.pop()
+                done = True
+            if batch:
+                yield batch
+        await producer  # the stream's own error, if that's what ended it
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+
+
+def ai_engineer_query(location: str = "United States") -> JobSearchQuery:
+    return JobSearchQuery(keywords="AI Engineer", location=location, max_results=20)
 
 
 def find_ai_engineer_jobs(location: str = "United States") -> List[JobPosting]:
@@ -0,0 +1,153 @@
+"""
+Per-source health: rolling error rate & latency, plus a circuit breaker
+
+A source whose recent fetches mostly fail (or that fails several times in
+a row) is opened & skipped for a cool-down that doubles, with jitter, each
+time it trips again. Once the cool-down passes a single probe fetch is let
+through (half-open): success closes the breaker, failure re-opens it.
+State is exported/restored as plain dicts so runs can persist it.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional, Tuple
+
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "4"))
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+BREAKER_MAX_CONSECUTIVE = int(os.getenv("BREAKER_MAX_CONSECUTIVE", "3"))
+# first cool-down in seconds; doubles per consecutive trip up to the max
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", str(15 * 60)))
+BREAKER_MAX_COOLDOWN = float(os.getenv("BREAKER_MAX_COOLDOWN", str(24 * 60 * 60)))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def backoff_delay(base: float, attempt: int, cap: float) -> float:
+    """Exponential backoff with "equal jitter": half fixed, half random"""
+    delay = min(cap, base * 2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+@dataclass
+class SourceHealth:
+    # (succeeded, seconds) for the last BREAKER_WINDOW fetches
+    recent: Deque[Tuple[bool, float]] = field(
+        default_factory=lambda: deque(maxlen=BREAKER_WINDOW)
+    )
+    state: str = CLOSED
+    opened_until: float = 0.0  # unix time
+    open_count: int = 0  # trips since the breaker last closed
+    consecutive_failures: int = 0
+    last_error: Optional[str] = None
+    probing: bool = False
+
+    @property
+    def error_rate(self) -> float:
+        if not self.recent:
+            return 0.0
+        return sum(not ok for ok, _ in self.recent) / len(self.recent)
+
+    @property
+    def avg_latency(self) -> float:
+        if not self.recent:
+            return 0.0
+        return sum(seconds for _, seconds in self.recent) / len(self.recent)
+
+
+class HealthTracker:
+    def __init__(self, states: Optional[Dict[str, dict]] = None):
+        self._lock = threading.Lock()
+        self.sources: Dict[str, SourceHealth] = {}
+        self.skipped: Dict[str, int] = {}
+        for source, state in (states or {}).items():
+            self.sources[source] = SourceHealth(
+                recent=deque(
+                    (tuple(outcome) for outcome in json.loads(state["recent"])),
+                    maxlen=BREAKER_WINDOW,
+                ),
+                state=state["state"],
+                opened_until=state["opened_until"],
+                open_count=state["open_count"],
+                consecutive_failures=state["consecutive_failures"],
+                last_error=state.get("last_error"),
+            )
+
+    def _health(self, source: str) -> SourceHealth:
+        if source not in self.sources:
+            self.sources[source] = SourceHealth()
+        return self.sources[source]
+
+    def allow(self, source: str) -> bool:
+        """Whether to fetch from source now (claims the probe when half-open)"""
+        with self._lock:
+            health = self._health(source)
+            if health.state == CLOSED:
+                return True
+            if health.state == OPEN and time.time() >= health.opened_until:
+                health.state = HALF_OPEN
+            if health.state == HALF_OPEN and not health.probing:
+                health.probing = True
+                return True
+            self.skipped[source] = self.skipped.get(source, 0) + 1
+            return False
+
+    def record(
+        self, source: str, ok: bool, seconds: float, error: Optional[str] = None
+    ) -> None:
+        with self._lock:
+            health = self._health(source)
+            health.recent.append((ok, round(seconds, 3)))
+            health.probing = False
+            if ok:
+                health.consecutive_failures = 0
+                if health.state != CLOSED:
+                    health.state, health.open_count = CLOSED, 0
+                return
+            health.consecutive_failures += 1
+            health.last_error = error
+            tripped = health.state == HALF_OPEN or (
+                health.consecutive_failures >= BREAKER_MAX_CONSECUTIVE
+                or (
+                    len(health.recent) >= BREAKER_MIN_CALLS
+                    and health.error_rate >= BREAKER_ERROR_RATE
+                )
+            )
+            if tripped:
+                cooldown = backoff_delay(
+                    BREAKER_COOLDOWN, health.open_count, BREAKER_MAX_COOLDOWN
+                )
+                health.state = OPEN
+                health.opened_until = time.time() + cooldown
+                health.open_count += 1
+
+    def is_open(self, source: str) -> bool:
+        health = self.sources.get(source)
+        return bool(health and health.state != CLOSED)
+
+    def export(self) -> Dict[str, dict]:
+        """Persistable state per source (see HealthTracker(states=...))"""
+        with self._lock:
+            return {
+                source: {
+                    "recent": json.dumps(list(health.recent)),
+                    "state": OPEN if health.state == HALF_OPEN else health.state,
+                    "opened_until": health.opened_until,
+                    "open_count": health.open_count,
+                    "consecutive_failures": health.consecutive_failures,
+                    "last_error": health.last_error,
+                }
+                for source, health in self.sources.items()
+            }
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{source}: {health.state}, {health.error_rate:.0%} errors, "
+            f"{health.avg_latency:.1f}s avg, {self.skipped.get(source, 0)} skipped"
+            for source, health in sorted(self.sources.items())
+        )
@@ -0,0 +1,316 @@
+"""
+Persistent HTTP cache shared by the job discovery sources
+
+Responses are stored in a small SQLite file keyed on the normalized url +
+params (credentials stripped), zlib-compressed, with a TTL per source.
+Stale entries are revalidated with If-None-Match / If-Modified-Since and
+the cache is trimmed least-recently-used first once it outgrows max_bytes.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+from core.db import PROJECT_ROOT
+from services.job_discovery.http_client import source_timeout
+from services.job_discovery.rate_limit import limited_get
+
+HTTP_CACHE_PATH = os.getenv(
+    "HTTP_CACHE_PATH", os.path.join(PROJECT_ROOT, "http_cache.db")
+)
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+HTTP_CACHE_DISABLED = os.getenv("HTTP_CACHE_DISABLED", "").lower() in ("1", "true")
+
+# seconds a response is served without revalidation, per source
+DEFAULT_TTLS = {
+    "indeed": 6 * 60 * 60,
+    "remote_ok": 60 * 60,
+    "serp_api": 24 * 60 * 60,
+}
+DEFAULT_TTL = 60 * 60
+
+# params that identify the caller rather than the resource
+SENSITIVE_PARAMS = {"api_key", "apikey", "key", "token", "access_token"}
+
+
+def source_ttl(source: str) -> int:
+    env_ttl = os.getenv(f"HTTP_CACHE_TTL_{source.upper()}")
+    if env_ttl:
+        return int(env_ttl)
+    return DEFAULT_TTLS.get(source, DEFAULT_TTL)
+
+
+def cache_key(url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    """Hash of the normalized url + sorted params, without credentials"""
+    parts = urlsplit(url)
+    netloc = parts.hostname or ""
+    if parts.port and not (
+        (parts.scheme == "http" and parts.port == 80)
+        or (parts.scheme == "https" and parts.port == 443)
+    ):
+        netloc = f"{netloc}:{parts.port}"
+
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query.extend((k, str(v)) for k, v in (params or {}).items() if v is not None)
+    query = sorted((k, v) for k, v in query if k.lower() not in SENSITIVE_PARAMS)
+
+    normalized = urlunsplit(
+        (
+            parts.scheme.lower(),
+            netloc.lower(),
+            parts.path or "/",
+            urlencode(query),
+            "",
+        )
+    )
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+class CachedResponse:
+    """The bits of an httpx.Response the sources use, rebuilt from cache"""
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        headers: Dict[str, str],
+        content: bytes,
+        from_cache: bool = False,
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.from_cache = from_cache
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise httpx.HTTPStatusError(
+                f"{self.status_code} error for url: {self.url}",
+                request=httpx.Request("GET", self.url),
+                response=self,  # type: ignore[arg-type]
+            )
+
+
+class HttpCache:
+    def __init__(
+        self,
+        path: str = HTTP_CACHE_PATH,
+        max_bytes: int = HTTP_CACHE_MAX_BYTES,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_http_cache_last_access ON http_cache (last_access)"
+        )
+        self._conn.commit()
+        # source -> {"hits": n, "misses": n, "revalidated": n, "stores": n}
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "revalidated": 0, "stores": 0}
+        )
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status, headers, body, etag, last_modified, expires_at "
+                "FROM http_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE http_cache SET last_access = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self._conn.commit()
+        url, status, headers, body, etag, last_modified, expires_at = row
+        return {
+            "response": CachedResponse(
+                url, status, json.loads(headers), zlib.decompress(body), True
+            ),
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": expires_at > time.time(),
+        }
+
+    def store(self, key: str, source: str, response, ttl: int) -> None:
+        body = zlib.compress(response.content, 6)
+        headers = {
+            k: v
+            for k, v in response.headers.items()
+            if k.lower() in ("content-type", "etag", "last-modified")
+        }
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_cache "
+                "(key, source, url, status, headers, body, etag, last_modified, expires_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    source,
+                    str(response.url),
+                    response.status_code,
+                    json.dumps(headers),
+                    body,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    now + ttl,
+                    now,
+                    len(body),
+                ),
+            )
+            self._evict()
+            self._conn.commit()
+        self.stats[source]["stores"] += 1
+
+    def touch(self, key: str, ttl: int) -> None:
+        """Extend a revalidated (304) entry for another TTL"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE http_cache SET expires_at = ?, last_access = ? WHERE key = ?",
+                (now + ttl, now, key),
+            )
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until under max_bytes (lock held)"""
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM http_cache"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM http_cache ORDER BY last_access ASC"
+        ).fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM http_cache WHERE key = ?", doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM http_cache")
+            self._conn.commit()
+
+    def get(
+        self,
+        source: str,
+        url: str,
+        params: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+        session=None,
+        ttl: Optional[int] = None,
+    ):
+        """
+        GET through the cache: fresh hit -> cached body, stale hit -> conditional
+        request (304 keeps the cached body), miss -> fetch & store 2xx responses
+        """
+        ttl = source_ttl(source) if ttl is None else ttl
+        key = cache_key(url, params)
+        entry = self.lookup(key)
+
+        if entry and entry["fresh"]:
+            self.stats[source]["hits"] += 1
+            return entry["response"]
+
+        request_headers = dict(headers or {})
+        if entry:
+            if entry["etag"]:
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = limited_get(
+            session, url, params=params, headers=request_headers, timeout=timeout
+        )
+        if entry and response.status_code == 304:
+            self.stats[source]["revalidated"] += 1
+            self.touch(key, ttl)
+            return entry["response"]
+
+        self.stats[source]["misses"] += 1
+        if 200 <= response.status_code < 300:
+            self.store(key, source, response, ttl)
+        return response
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{source}: {s['hits']} hit / {s['revalidated']} revalidated / {s['misses']} miss"
+            for source, s in sorted(self.stats.items())
+        )
+
+
+_http_cache: Optional[HttpCache] = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """Process-wide cache (None when disabled via HTTP_CACHE_DISABLED)"""
+    global _http_cache
+    if HTTP_CACHE_DISABLED:
+        return None
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HttpCache()
+    return _http_cache
+
+
+def cached_get(
+    source: str,
+    url: str,
+    params: Optional[Mapping[str, Any]] = None,
+    headers: Optional[Mapping[str, str]] = None,
+    timeout: Optional[float] = None,
+    session=None,
+):
+    """
+    GET via the shared cache, or straight through when it's disabled.
+    timeout caps the source's connect/read timeouts (see source_timeout)
+    """
+    timeout = source_timeout(source, timeout)
+    cache = get_http_cache()
+    if cache is None:
+        return limited_get(
+            session, url, params=params, headers=headers, timeout=timeout
+        )
+    return cache.get(source, url, params, headers, timeout, session)
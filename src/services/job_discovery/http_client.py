@@ -0,0 +1,140 @@
+"""
+Pooled httpx clients shared by every discovery source
+
+One sync client per process (httpx.Client is thread-safe, so the sources'
+worker threads share its keep-alive pool). HTTP/2 is negotiated when the
+`h2` package is installed; gzip/deflate are always decoded, brotli/zstd
+when their packages are (httpx[http2,brotli] pulls both in; a warning is
+logged once when they're missing).
+Bodies are streamed & capped at HTTP_MAX_BODY_BYTES.
+"""
+
+import atexit
+import importlib.util
+import logging
+import os
+import threading
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+HTTP2 = importlib.util.find_spec("h2") is not None
+BROTLI = any(importlib.util.find_spec(m) for m in ("brotli", "brotlicffi"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_MAX_BODY_BYTES = int(os.getenv("HTTP_MAX_BODY_BYTES", str(64 * 1024 * 1024)))
+
+# source -> (connect, read) seconds; HTTP_TIMEOUT_<SOURCE>="connect:read"
+DEFAULT_TIMEOUTS = {
+    "indeed": (5.0, 15.0),
+    "remote_ok": (5.0, 30.0),  # multi-MB feed
+    "serp_api": (5.0, 20.0),
+}
+DEFAULT_TIMEOUT = (5.0, 20.0)
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+
+# errors worth retrying: the request may not have reached the server
+TRANSIENT_ERRORS = (httpx.TransportError,)
+
+
+def source_timeout(source: str, cap: Optional[float] = None) -> httpx.Timeout:
+    """
+    Connect/read timeouts for a source's requests; `cap` (e.g. what's left
+    of the source's overall deadline) bounds both
+    """
+    env_timeout = os.getenv(f"HTTP_TIMEOUT_{source.upper()}")
+    if env_timeout:
+        connect, read = (float(part) for part in env_timeout.split(":"))
+    else:
+        connect, read = DEFAULT_TIMEOUTS.get(source, DEFAULT_TIMEOUT)
+    if cap is not None:
+        connect, read = min(connect, cap), min(read, cap)
+    return httpx.Timeout(read, connect=connect)
+
+
+def _client_options() -> dict:
+    return {
+        "http2": HTTP2,
+        "follow_redirects": True,
+        "headers": {"User-Agent": USER_AGENT},
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        ),
+        "timeout": httpx.Timeout(DEFAULT_TIMEOUT[1], connect=DEFAULT_TIMEOUT[0]),
+    }
+
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+_warned = False
+
+
+def _warn_missing_extras() -> None:
+    """Once per process: say what the pool runs without"""
+    global _warned
+    missing = [name for name, ok in (("h2", HTTP2), ("brotli", BROTLI)) if not ok]
+    if missing and not _warned:
+        logger.warning(
+            "%s not installed, HTTP/2 or brotli is off for discovery requests: "
+            "install httpx[http2,brotli]",
+            " & ".join(missing),
+        )
+    _warned = True
+
+
+def get_client() -> httpx.Client:
+    """Process-wide sync client"""
+    global _client
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            _warn_missing_extras()
+            _client = httpx.Client(**_client_options())
+        return _client
+
+
+def http_get(client, url: str, **kwargs):
+    """
+    GET with the body streamed in (decoded chunk by chunk) and capped, so a
+    huge or endless response fails fast instead of filling memory.
+    Non-httpx clients (e.g. a requests.Session) just get .get().
+    """
+    if not isinstance(client, httpx.Client):
+        return client.get(url, **kwargs)
+    with client.stream("GET", url, **kwargs) as response:
+        body = bytearray()
+        for chunk in response.iter_bytes():
+            body.extend(chunk)
+            if len(body) > HTTP_MAX_BODY_BYTES:
+                raise httpx.DecodingError(
+                    f"response body over {HTTP_MAX_BODY_BYTES} bytes",
+                    request=response.request,
+                )
+    # the body is already decoded, so it's served without its content-encoding
+    headers = [
+        (name, value)
+        for name, value in response.headers.multi_items()
+        if name not in ("content-encoding", "content-length")
+    ]
+    return httpx.Response(
+        response.status_code,
+        headers=headers,
+        content=bytes(body),
+        request=response.request,
+        extensions=response.extensions,
+    )
+
+
+@atexit.register
+def close_client() -> None:
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
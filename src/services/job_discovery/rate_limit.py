@@ -0,0 +1,181 @@
+"""
+Per-host token bucket rate limiting for the discovery sources
+
+One limiter is shared by every thread in the process. Callers reserve a
+token under a lock and then sleep outside it, so each host runs at its
+configured rate instead of a fixed pause. 429/503 responses block the host
+for Retry-After (or a backoff).
+"""
+
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from services.job_discovery.health import backoff_delay
+from services.job_discovery.http_client import TRANSIENT_ERRORS, get_client, http_get
+from services.job_discovery.transport import get_transport
+
+# host -> (requests per second, burst)
+DEFAULT_RATES: Dict[str, Tuple[float, int]] = {
+    "www.indeed.com": (1.0, 2),
+    "remoteok.io": (1.0, 2),
+    "serpapi.com": (5.0, 5),
+}
+DEFAULT_RATE = (2.0, 2)
+# seconds to back off after a 429 without Retry-After (doubles each time)
+DEFAULT_BACKOFF = 5.0
+MAX_BACKOFF = 300.0
+MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "2"))
+# per-request timeout when the caller doesn't pass one (None means none in httpx)
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "20"))
+# first wait before retrying a connection error / timeout (doubles, jittered)
+RETRY_BACKOFF = float(os.getenv("RETRY_BACKOFF", "1.0"))
+
+
+def host_of(url: str) -> str:
+    return (urlsplit(url).netloc or url).lower()
+
+
+def host_rate(host: str) -> Tuple[float, int]:
+    """Rate for a host; override with RATE_LIMIT_<HOST>="<rps>:<burst>" """
+    env_rate = os.getenv(
+        "RATE_LIMIT_" + host.upper().replace(".", "_").replace(":", "_")
+    )
+    if env_rate:
+        rate, _, burst = env_rate.partition(":")
+        return float(rate), int(burst or 1)
+    return DEFAULT_RATES.get(host, DEFAULT_RATE)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds (it may be delta-seconds or an HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.backoff = DEFAULT_BACKOFF
+
+    def reserve(self, now: float) -> float:
+        """Take a token & return how long the caller must wait to use it"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        # a negative balance is a queue of reservations ahead of this caller
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+
+    def block(self, now: float, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, now + seconds)
+        self.tokens = min(self.tokens, 0.0)
+
+
+class HostRateLimiter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        # host -> {"requests", "waited", "max_wait", "throttled"}
+        self.metrics: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"requests": 0, "waited": 0.0, "max_wait": 0.0, "throttled": 0}
+        )
+
+    def _bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(*host_rate(host))
+        return self._buckets[host]
+
+    def reserve(self, url: str) -> float:
+        host = host_of(url)
+        with self._lock:
+            wait = self._bucket(host).reserve(time.monotonic())
+            metrics = self.metrics[host]
+            metrics["requests"] += 1
+            metrics["waited"] += wait
+            metrics["max_wait"] = max(metrics["max_wait"], wait)
+        return wait
+
+    def acquire(self, url: str) -> float:
+        """Block the calling thread until a request to url's host is allowed"""
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def observe(self, url: str, status_code: int, retry_after: Optional[str]) -> bool:
+        """Record a response; returns True when the host asked us to back off"""
+        host = host_of(url)
+        with self._lock:
+            bucket = self._bucket(host)
+            if status_code not in (429, 503):
+                bucket.backoff = DEFAULT_BACKOFF
+                return False
+            delay = parse_retry_after(retry_after)
+            if delay is None:
+                # jittered so parallel callers don't all come back at once
+                delay = bucket.backoff / 2 + random.uniform(0, bucket.backoff / 2)
+                bucket.backoff = min(bucket.backoff * 2, MAX_BACKOFF)
+            bucket.block(time.monotonic(), delay)
+            self.metrics[host]["throttled"] += 1
+        return True
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{host}: {int(m['requests'])} req, waited {m['waited']:.1f}s "
+            f"(max {m['max_wait']:.1f}s), {int(m['throttled'])} throttled"
+            for host, m in sorted(self.metrics.items())
+        )
+
+
+rate_limiter = HostRateLimiter()
+
+
+def limited_get(session, url: str, max_retries: int = MAX_RETRIES, **kwargs):
+    """
+    GET url on session (default: the shared pooled client) paced by the
+    shared limiter, retrying 429s after Retry-After and connection errors /
+    timeouts with jittered backoff
+    """
+    session = session or get_client()
+    if kwargs.get("timeout") is None:
+        kwargs["timeout"] = REQUEST_TIMEOUT
+    transport = get_transport()
+    if transport is not None and transport.offline:
+        # replaying: nothing reaches the host, so there's no rate to respect
+        return transport.get(session, url, **kwargs)
+    for attempt in range(max_retries + 1):
+        rate_limiter.acquire(url)
+        try:
+            if transport is not None:
+                response = transport.get(session, url, **kwargs)
+            else:
+                response = http_get(session, url, **kwargs)
+        except TRANSIENT_ERRORS:
+            if attempt == max_retries:
+                raise
+            time.sleep(backoff_delay(RETRY_BACKOFF, attempt, MAX_BACKOFF))
+            continue
+        throttled = rate_limiter.observe(
+            url, response.status_code, response.headers.get("Retry-After")
+        )
+        if not throttled or attempt == max_retries:
+            return response
+    return response
@@ -0,0 +1,42 @@
+"""
+Common interface + registry for job discovery sources
+"""
+
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Optional, Protocol, runtime_checkable
+from core.models import JobPosting, JobSearchQuery
+
+
+@runtime_checkable
+class JobSource(Protocol):
+    """
+    A job board / API that streams postings for a query as they're parsed.
+    Sources whose requests ignore the query location may set
+    `uses_location = False` so batch runs coalesce across locations.
+    With `since` set, a source stops (or stops paginating) once it reaches
+    postings posted before it - the caller has already seen those.
+    """
+
+    name: str
+
+    def stream(
+        self,
+        query: JobSearchQuery,
+        timeout: Optional[float] = None,
+        since: Optional[datetime] = None,
+    ) -> AsyncIterator[JobPosting]: ...
+
+
+# source name -> factory; a factory returns None when the source can't run
+# (e.g. missing API key) so the coordinator can skip it
+SOURCE_REGISTRY: Dict[str, Callable[[], Optional[JobSource]]] = {}
+
+
+def register_source(name: str):
+    """Decorator registering a JobSource factory under `name`"""
+
+    def decorator(factory: Callable[[], Optional[JobSource]]):
+        SOURCE_REGISTRY[name] = factory
+        return factory
+
+    return decorator
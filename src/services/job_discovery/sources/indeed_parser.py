@@ -0,0 +1,177 @@
+"""
+Pluggable parsers for Indeed search result pages
+
+Every backend pulls the same fields out of each job card (matching on class
+substrings, like the original BeautifulSoup lambdas) so they can be swapped
+freely. INDEED_PARSER picks one: auto | selectolax | lxml | soup-lxml | soup
+"""
+
+import os
+import re
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+try:
+    from bs4 import BeautifulSoup, SoupStrainer
+except ImportError:
+    BeautifulSoup = SoupStrainer = None  # type: ignore[assignment, misc]
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:
+    etree = lxml_html = None  # type: ignore[assignment]
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None  # type: ignore[assignment, misc]
+
+INDEED_PARSER = os.getenv("INDEED_PARSER", "auto")
+
+CARD_CLASS = "job_seen_beacon"
+# field -> (tag, class substring); the title link is matched on data-jk instead
+FIELD_CLASSES = {
+    "company": ("span", "companyName"),
+    "location": ("div", "companyLocation"),
+    "summary": ("div", "summary"),
+    "posted": ("span", "date"),
+}
+
+
+class IndeedCard(NamedTuple):
+    """Raw fields of one job card; None when the card doesn't have it"""
+
+    title: Optional[str]
+    href: Optional[str]
+    company: Optional[str]
+    location: Optional[str]
+    summary: Optional[str]
+    posted: Optional[str]
+
+
+class SoupParser:
+    """
+    BeautifulSoup, building only the job-card subtrees (SoupStrainer) and
+    matching classes with precompiled regexes instead of per-node lambdas
+    """
+
+    def __init__(self, features: str = "html.parser"):
+        self.name = "soup" if features == "html.parser" else f"soup-{features}"
+        self.features = features
+        self.card_re = re.compile(CARD_CLASS)
+        self.strainer = SoupStrainer("div", class_=self.card_re)
+        self.fields = {
+            field: (tag, re.compile(class_part))
+            for field, (tag, class_part) in FIELD_CLASSES.items()
+        }
+
+    def parse(self, content: bytes, max_results: int = 10) -> Iterator[IndeedCard]:
+        soup = BeautifulSoup(content, self.features, parse_only=self.strainer)
+        for card in soup.find_all("div", class_=self.card_re, limit=max_results):
+            title = card.find("a", attrs={"data-jk": True})
+            found = {
+                field: card.find(tag, class_=class_re)
+                for field, (tag, class_re) in self.fields.items()
+            }
+            yield IndeedCard(
+                title=title.get_text(strip=True) if title else None,
+                href=title.get("href") if title else None,
+                **{
+                    field: elem.get_text(strip=True) if elem else None
+                    for field, elem in found.items()
+                },
+            )
+
+
+def _xpath_contains(tag: str, class_part: str) -> str:
+    return f"(.//{tag}[contains(@class, '{class_part}')])[1]"
+
+
+class LxmlParser:
+    """lxml.html with XPath expressions compiled once"""
+
+    name = "lxml"
+
+    def __init__(self):
+        self.cards = etree.XPath(f"//div[contains(@class, '{CARD_CLASS}')]")
+        self.title = etree.XPath("(.//a[@data-jk])[1]")
+        self.fields = {
+            field: etree.XPath(_xpath_contains(tag, class_part))
+            for field, (tag, class_part) in FIELD_CLASSES.items()
+        }
+
+    @staticmethod
+    def _text(elems: List) -> Optional[str]:
+        # same as bs4's get_text(strip=True): stripped strings, no separator
+        if not elems:
+            return None
+        return "".join(part.strip() for part in elems[0].itertext())
+
+    def parse(self, content: bytes, max_results: int = 10) -> Iterator[IndeedCard]:
+        tree = lxml_html.fromstring(content)
+        for card in self.cards(tree)[:max_results]:
+            title = self.title(card)
+            yield IndeedCard(
+                title=self._text(title),
+                href=title[0].get("href") if title else None,
+                **{
+                    field: self._text(xpath(card))
+                    for field, xpath in self.fields.items()
+                },
+            )
+
+
+class SelectolaxParser:
+    """selectolax (lexbor) with CSS selectors"""
+
+    name = "selectolax"
+
+    def __init__(self):
+        self.card_selector = f"div[class*='{CARD_CLASS}']"
+        self.fields = {
+            field: f"{tag}[class*='{class_part}']"
+            for field, (tag, class_part) in FIELD_CLASSES.items()
+        }
+
+    @staticmethod
+    def _text(node) -> Optional[str]:
+        return node.text(deep=True, separator="", strip=True) if node else None
+
+    def parse(self, content: bytes, max_results: int = 10) -> Iterator[IndeedCard]:
+        tree = HTMLParser(content)
+        for card in tree.css(self.card_selector)[:max_results]:
+            title = card.css_first("a[data-jk]")
+            yield IndeedCard(
+                title=self._text(title),
+                href=title.attributes.get("href") if title else None,
+                **{
+                    field: self._text(card.css_first(selector))
+                    for field, selector in self.fields.items()
+                },
+            )
+
+
+# name -> factory, fastest first; a factory returns None when its library
+# isn't installed
+PARSERS: Dict[str, Callable[[], Optional[object]]] = {
+    "selectolax": lambda: SelectolaxParser() if HTMLParser else None,
+    "lxml": lambda: LxmlParser() if lxml_html else None,
+    "soup-lxml": lambda: SoupParser("lxml") if BeautifulSoup and lxml_html else None,
+    "soup": lambda: SoupParser() if BeautifulSoup else None,
+}
+
+
+def available_parsers() -> List[str]:
+    return [name for name, factory in PARSERS.items() if factory() is not None]
+
+
+def get_parser(name: str = INDEED_PARSER):
+    """The named backend, or the fastest installed one for "auto" """
+    if name != "auto":
+        parser = PARSERS[name]()
+        if parser is None:
+            raise ImportError(f"Indeed parser '{name}' isn't installed")
+        return parser
+    for factory in PARSERS.values():
+        if (parser := factory()) is not None:
+            return parser
+    raise ImportError("no HTML parser installed (pip install beautifulsoup4)")
@@ -3,18 +3,26 @@ Web scraping job search implementation
 No authentication required - scrapes public job boards
 """
 
-import requests
+import asyncio
+import httpx
+from datetime import datetime
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    print("BeautifulSoup not installed. Install with: pip install beautifulsoup4")
-    BeautifulSoup = None
-
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Iterator, List, Dict, Optional
 from urllib.parse import urljoin, quote
-from core.models import JobPosting
-import time
+from core.models import JobPosting, JobSearchQuery
+from core.posted_date import parse_posted_date
+from services.job_discovery.http_cache import cached_get
+from services.job_discovery.http_client import get_client
+from services.job_discovery.sources.base import register_source
+from services.job_discovery.sources.indeed_parser import get_parser
+from services.job_discovery.sources.remote_ok_index import get_snapshot
+import os
+
+# answer Remote OK queries from an indexed feed snapshot instead of
+# downloading & scanning the whole feed per query
+REMOTE_OK_SNAPSHOT = os.getenv("REMOTE_OK_SNAPSHOT", "true").lower() in ("1", "true")
+# result pages fetched per Indeed query at most (fewer once seen postings show up)
+INDEED_MAX_PAGES = int(os.getenv("INDEED_MAX_PAGES", "3"))
 
 
 class PublicJobScraper:
@@ -22,145 +30,254 @@ class PublicJobScraper:
     Scrapes job postings from public job boards that don't require login
     """
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
+    def __init__(
+        self,
+        indeed_url: str = "https://www.indeed.com/jobs",
+        remote_ok_url: str = "https://remoteok.io/api",
+        indeed_parser=None,
+    ):
+        self.indeed_url = indeed_url
+        self.remote_ok_url = remote_ok_url
+        self.remote_ok_snapshot = REMOTE_OK_SNAPSHOT
+        try:
+            self.indeed_parser = indeed_parser or get_parser()
+        except ImportError as e:
+            print(f"Indeed scraping unavailable: {e}")
+            self.indeed_parser = None
+        # shared keep-alive pool (already sends a browser User-Agent)
+        self.session = get_client()
+
+    def fetch_indeed_page(
+        self,
+        query: str,
+        location: str = "United States",
+        max_results: int = 10,
+        timeout: Optional[float] = None,
+        start: int = 0,
+    ) -> bytes:
+        """Download an Indeed search results page (newest first)"""
+        params = {
+            "q": query,
+            "l": location,
+            "limit": min(max_results, 50),  # Indeed's limit
+            "sort": "date",
+        }
+        if start:
+            params["start"] = start
+        response = cached_get(
+            "indeed",
+            self.indeed_url,
+            params=params,
+            timeout=timeout,
+            session=self.session,
         )
+        response.raise_for_status()
+        return response.content
+
+    def parse_indeed_jobs(
+        self, content: bytes, max_results: int = 10
+    ) -> Iterator[JobPosting]:
+        """Yield a JobPosting for each job card on an Indeed results page"""
+        # Find job cards (Indeed's structure as of 2024)
+        for card in self.indeed_parser.parse(content, max_results):
+            try:
+                # Job URL
+                job_url = (
+                    urljoin("https://www.indeed.com", card.href) if card.href else ""
+                )
+
+                yield JobPosting(
+                    title=card.title or "N/A",
+                    company=card.company or "N/A",
+                    location=card.location or "N/A",
+                    description=card.summary or "N/A",
+                    url=job_url,
+                    # "Posted 3 days ago", "Just posted", ...
+                    posted_date=card.posted,
+                    posted_at=parse_posted_date(card.posted),
+                    source="Indeed (Public Scraping)",
+                )
+
+            except Exception as e:
+                print(f"Error parsing job card: {e}")
+                continue
 
     def search_indeed_jobs(
-        self, query: str, location: str = "United States", max_results: int = 10
+        self,
+        query: str,
+        location: str = "United States",
+        max_results: int = 10,
+        timeout: Optional[float] = None,
     ) -> List[JobPosting]:
         """
         Search Indeed for jobs (public, no auth required)
         """
         jobs = []
         try:
-            # Indeed search URL
-            base_url = "https://www.indeed.com/jobs"
-            params = {
-                "q": query,
-                "l": location,
-                "limit": min(max_results, 50),  # Indeed's limit
-            }
-
-            response = self.session.get(base_url, params=params)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, "html.parser")  # type: ignore[return-value]
-
-            # Find job cards (Indeed's structure as of 2024)
-            job_cards = soup.find_all(
-                "div", {"class": lambda x: x and "job_seen_beacon" in x}  # type: ignore[return-value]
-            )  # type: ignore[return-value]
-
-            for card in job_cards[:max_results]:
-                try:
-                    # Extract job details
-                    title_elem = card.find("a", {"data-jk": True})
-                    title = title_elem.get_text(strip=True) if title_elem else "N/A"
-
-                    company_elem = card.find(
-                        "span", {"class": lambda x: x and "companyName" in x}
-                    )
-                    company = (
-                        company_elem.get_text(strip=True) if company_elem else "N/A"
-                    )
-
-                    location_elem = card.find(
-                        "div", {"class": lambda x: x and "companyLocation" in x}
-                    )
-                    job_location = (
-                        location_elem.get_text(strip=True) if location_elem else "N/A"
-                    )
-
-                    # Job URL
-                    job_url = (
-                        urljoin("https://www.indeed.com", title_elem["href"])
-                        if title_elem and title_elem.get("href")
-                        else ""
-                    )
-
-                    # Summary/snippet
-                    summary_elem = card.find(
-                        "div", {"class": lambda x: x and "summary" in x}
-                    )
-                    description = (
-                        summary_elem.get_text(strip=True) if summary_elem else "N/A"
-                    )
-
-                    job = JobPosting(
-                        title=title,
-                        company=company,
-                        location=job_location,
-                        description=description,
-                        url=job_url,
-                        source="Indeed (Public Scraping)",
-                    )
-                    jobs.append(job)
-
-                except Exception as e:
-                    print(f"Error parsing job card: {e}")
-                    continue
-
-            # Be respectful - add delay
-            time.sleep(1)
-
-        except requests.RequestException as e:
+            content = self.fetch_indeed_page(query, location, max_results, timeout)
+            jobs.extend(self.parse_indeed_jobs(content, max_results))
+
+        except httpx.HTTPError as e:
             print(f"Error scraping Indeed: {e}")
 
         return jobs
 
+    def fetch_remote_ok_feed(self, timeout: Optional[float] = None) -> list:
+        """Download the full Remote OK feed (public API, no auth required)"""
+        response = cached_get(
+            "remote_ok", self.remote_ok_url, timeout=timeout, session=self.session
+        )
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def remote_ok_posting(job_data: dict) -> JobPosting:
+        return JobPosting(
+            title=job_data.get("position", "N/A"),
+            company=job_data.get("company", "N/A"),
+            location="Remote",
+            description=job_data.get("description", "N/A"),
+            url=job_data.get("url", ""),
+            salary_range=job_data.get("salary_range", None),
+            posted_date=job_data.get("date"),
+            posted_at=parse_posted_date(job_data.get("epoch") or job_data.get("date")),
+            source="Remote OK",
+        )
+
+    def parse_remote_ok_jobs(
+        self, data: list, query: str, max_results: int = 10
+    ) -> Iterator[JobPosting]:
+        """Yield feed items whose title or tags match the query (linear scan)"""
+        query_lower = query.lower()
+        count = 0
+
+        for job_data in data[1:]:  # First item is metadata
+            if count >= max_results:
+                break
+
+            # Check if query matches title or tags
+            title = job_data.get("position", "").lower()
+            tags = " ".join(job_data.get("tags", [])).lower()
+
+            if query_lower in title or any(
+                term in tags for term in query_lower.split()
+            ):
+                yield self.remote_ok_posting(job_data)
+                count += 1
+
+    def search_remote_ok_snapshot(
+        self, query: str, max_results: int = 10, timeout: Optional[float] = None
+    ) -> Iterator[JobPosting]:
+        """Yield matches from the shared, TTL-refreshed feed index"""
+        snapshot = get_snapshot(self.remote_ok_url)
+        for job_data in snapshot.search(
+            query, lambda: self.fetch_remote_ok_feed(timeout), max_results
+        ):
+            yield self.remote_ok_posting(job_data)
+
     def search_remote_ok_jobs(
-        self, query: str, max_results: int = 10
+        self, query: str, max_results: int = 10, timeout: Optional[float] = None
     ) -> List[JobPosting]:
         """
         Search Remote OK for remote jobs (public API, no auth required)
         """
         jobs = []
         try:
-            # Remote OK has a simple API
-            api_url = "https://remoteok.io/api"
-            response = self.session.get(api_url)
-            response.raise_for_status()
-
-            data = response.json()
-
-            # Filter jobs by query
-            query_lower = query.lower()
-            count = 0
-
-            for job_data in data[1:]:  # First item is metadata
-                if count >= max_results:
-                    break
-
-                # Check if query matches title or tags
-                title = job_data.get("position", "").lower()
-                tags = " ".join(job_data.get("tags", [])).lower()
-
-                if query_lower in title or any(
-                    term in tags for term in query_lower.split()
-                ):
-                    job = JobPosting(
-                        title=job_data.get("position", "N/A"),
-                        company=job_data.get("company", "N/A"),
-                        location="Remote",
-                        description=job_data.get("description", "N/A"),
-                        url=job_data.get("url", ""),
-                        salary_range=job_data.get("salary_range", None),
-                        source="Remote OK",
-                    )
-                    jobs.append(job)
-                    count += 1
-
-        except requests.RequestException as e:
+            if self.remote_ok_snapshot:
+                jobs.extend(self.search_remote_ok_snapshot(query, max_results, timeout))
+            else:
+                data = self.fetch_remote_ok_feed(timeout)
+                jobs.extend(self.parse_remote_ok_jobs(data, query, max_results))
+
+        except httpx.HTTPError as e:
             print(f"Error fetching from Remote OK: {e}")
 
         return jobs
 
 
+class IndeedSource:
+    """JobSource streaming Indeed search results"""
+
+    name = "indeed"
+
+    def __init__(self, scraper: Optional[PublicJobScraper] = None):
+        self.scraper = scraper or PublicJobScraper()
+
+    async def stream(
+        self,
+        query: JobSearchQuery,
+        timeout: Optional[float] = None,
+        since: Optional[datetime] = None,
+    ) -> AsyncIterator[JobPosting]:
+        """Page through newest-first results until max_results or a seen posting"""
+        max_results = query.max_results // 2
+        emitted = 0
+        start = 0
+        for _ in range(INDEED_MAX_PAGES):
+            content = await asyncio.to_thread(
+                self.scraper.fetch_indeed_page,
+                query.keywords,
+                query.location,
+                max_results - emitted,
+                timeout,
+                start,
+            )
+            cards = 0
+            for job in self.scraper.parse_indeed_jobs(content, max_results - emitted):
+                cards += 1
+                if since and job.posted_at and job.posted_at < since:
+                    return
+                yield job
+                emitted += 1
+            if not cards or emitted >= max_results:
+                return
+            start += cards
+
+
+class RemoteOKSource:
+    """JobSource streaming matches from the Remote OK feed"""
+
+    name = "remote_ok"
+    uses_location = False  # the feed is remote-only
+
+    def __init__(self, scraper: Optional[PublicJobScraper] = None):
+        self.scraper = scraper or PublicJobScraper()
+
+    async def stream(
+        self,
+        query: JobSearchQuery,
+        timeout: Optional[float] = None,
+        since: Optional[datetime] = None,
+    ) -> AsyncIterator[JobPosting]:
+        max_results = query.max_results // 2
+        if self.scraper.remote_ok_snapshot:
+            jobs = await asyncio.to_thread(
+                list,
+                self.scraper.search_remote_ok_snapshot(
+                    query.keywords, max_results, timeout
+                ),
+            )
+        else:
+            data = await asyncio.to_thread(self.scraper.fetch_remote_ok_feed, timeout)
+            jobs = self.scraper.parse_remote_ok_jobs(data, query.keywords, max_results)
+        for job in jobs:
+            # the feed is newest first, so everything after this was seen
+            if since and job.posted_at and job.posted_at < since:
+                return
+            yield job
+
+
+@register_source("indeed")
+def make_indeed_source() -> Optional[IndeedSource]:
+    source = IndeedSource()
+    return source if source.scraper.indeed_parser else None
+
+
+@register_source("remote_ok")
+def make_remote_ok_source() -> Optional[RemoteOKSource]:
+    return RemoteOKSource()
+
+
 def search_ai_engineer_jobs_no_auth(
     location: str = "United States",
 ) -> List[JobPosting]:
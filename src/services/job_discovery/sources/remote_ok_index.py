@@ -0,0 +1,122 @@
+"""
+In-memory snapshot of the Remote OK feed with an inverted token index
+
+The feed is downloaded & parsed once per TTL; each keyword query is then
+answered from token -> item postings instead of rescanning every item.
+"""
+
+import heapq
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+REMOTE_OK_SNAPSHOT_TTL = int(os.getenv("REMOTE_OK_SNAPSHOT_TTL", str(60 * 60)))
+
+TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class RemoteOKIndex:
+    """
+    Token index over feed item positions & tags.
+    A query matches an item when its title contains the query phrase, or when
+    any query term is one of the item's tag tokens.
+    """
+
+    def __init__(self, feed: list):
+        self.items: List[dict] = [item for item in feed[1:] if isinstance(item, dict)]
+        self.titles: List[str] = []
+        # postings are item positions in feed order, so lists stay sorted
+        self.title_postings: Dict[str, List[int]] = defaultdict(list)
+        self.tag_postings: Dict[str, List[int]] = defaultdict(list)
+
+        for i, item in enumerate(self.items):
+            title = str(item.get("position") or "").lower()
+            self.titles.append(title)
+            for token in dict.fromkeys(tokenize(title)):
+                self.title_postings[token].append(i)
+            tag_tokens = dict.fromkeys(
+                token for tag in item.get("tags") or [] for token in tokenize(str(tag))
+            )
+            for token in tag_tokens:
+                self.tag_postings[token].append(i)
+
+        self.title_sets: Dict[str, Set[int]] = {
+            token: set(postings) for token, postings in self.title_postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _title_matches(self, terms: List[str], query_lower: str) -> Iterator[int]:
+        """Items whose title has every term (rarest first) & the exact phrase"""
+        if any(term not in self.title_postings for term in terms):
+            return
+        rarest = min(terms, key=lambda term: len(self.title_postings[term]))
+        others = [self.title_sets[term] for term in terms if term != rarest]
+        for i in self.title_postings[rarest]:
+            if all(i in other for other in others) and query_lower in self.titles[i]:
+                yield i
+
+    def search(self, query: str, max_results: int = 10) -> List[dict]:
+        """Feed items matching the query, in feed (newest first) order"""
+        query_lower = query.lower()
+        terms = list(dict.fromkeys(tokenize(query_lower)))
+        if not terms:
+            return []
+
+        # lazily merge the sorted postings so we stop after max_results
+        candidates = heapq.merge(
+            self._title_matches(terms, query_lower),
+            *(self.tag_postings.get(term, []) for term in terms),
+        )
+        results: List[dict] = []
+        last = -1
+        for i in candidates:
+            if i == last:
+                continue
+            last = i
+            results.append(self.items[i])
+            if len(results) >= max_results:
+                break
+        return results
+
+
+class RemoteOKSnapshot:
+    """Thread-safe RemoteOKIndex, rebuilt with fetch_feed() once the TTL passes"""
+
+    def __init__(self, ttl: int = REMOTE_OK_SNAPSHOT_TTL):
+        self.ttl = ttl
+        self._index: Optional[RemoteOKIndex] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def index(self, fetch_feed: Callable[[], list]) -> RemoteOKIndex:
+        with self._lock:
+            if self._index is None or time.monotonic() - self._built_at > self.ttl:
+                self._index = RemoteOKIndex(fetch_feed())
+                self._built_at = time.monotonic()
+            return self._index
+
+    def search(
+        self, query: str, fetch_feed: Callable[[], list], max_results: int = 10
+    ) -> List[dict]:
+        return self.index(fetch_feed).search(query, max_results)
+
+
+# feed url -> snapshot, shared by every scraper in the process
+_snapshots: Dict[str, RemoteOKSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_snapshot(url: str) -> RemoteOKSnapshot:
+    with _snapshots_lock:
+        if url not in _snapshots:
+            _snapshots[url] = RemoteOKSnapshot()
+        return _snapshots[url]
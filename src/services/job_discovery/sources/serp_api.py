@@ -3,27 +3,103 @@ SerpAPI-based job search implementation
 No authentication cookies required - just API key
 """
 
+import asyncio
+import contextlib
+import logging
 import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
 from dotenv import load_dotenv
-import requests
-from typing import List, Dict, Optional
-from core.models import JobPosting
+import httpx
+from typing import AsyncIterator, Callable, Iterator, List, Dict, Optional
+from core.models import JobPosting, JobSearchQuery
+from core.posted_date import parse_posted_date
+from services.job_discovery.http_cache import cached_get
+from services.job_discovery.sources.base import register_source
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# each uncached SerpAPI request costs one search credit
+SERP_API_DAILY_CREDITS = int(os.getenv("SERP_API_DAILY_CREDITS", "100"))
+SERP_API_RUN_CREDITS = int(os.getenv("SERP_API_RUN_CREDITS", "25"))
+# Google Jobs returns 10 results per page
+PAGE_SIZE = 10
+SOURCE_LABEL = "Google Jobs (SerpAPI)"
+
+
+class CreditBudgetExceeded(Exception):
+    """Raised instead of making a request the credit budget can't cover"""
+
+
+class CreditBudget:
+    """Search credits the process may still spend, shared by every query"""
+
+    def __init__(self, limit: Optional[int] = SERP_API_RUN_CREDITS):
+        self.limit = limit
+        self.spent = 0
+        self.pages = 0  # including pages served from the http cache
+        self.denied = 0
+        self._lock = threading.Lock()
+
+    def reset(self, limit: Optional[int]) -> None:
+        with self._lock:
+            self.limit = limit
+            self.spent = self.pages = self.denied = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.limit is not None and self.spent >= self.limit
+
+    def spend(self) -> None:
+        with self._lock:
+            if self.exhausted:
+                self.denied += 1
+                raise CreditBudgetExceeded(
+                    f"SerpAPI credit budget spent: {self.summary()}"
+                )
+            self.spent += 1
+
+    def refund(self) -> None:
+        with self._lock:
+            self.spent -= 1
+
+    def settle(self, from_cache: bool) -> None:
+        """Count a fetched page; cached pages don't cost a credit"""
+        with self._lock:
+            self.pages += 1
+            if from_cache:
+                self.spent -= 1
+
+    def summary(self) -> str:
+        return (
+            f"{self.spent}/{self.limit} credits, {self.pages} pages, "
+            f"{self.denied} requests over budget"
+        )
+
+
+credit_budget = CreditBudget()
+
 
 class SerpAPIJobSearch:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self, api_key: Optional[str] = None, budget: CreditBudget = credit_budget
+    ):
         self.api_key = api_key or os.getenv("SERP_API_KEY")
         self.base_url = "https://serpapi.com/search"
+        self.budget = budget
 
-    def search_jobs(
-        self, query: str, location: str = "United States", num_results: int = 10
-    ) -> List[JobPosting]:
-        """
-        Search for jobs using SerpAPI (Google Jobs)
-        No authentication required beyond API key
-        """
+    def fetch_jobs(
+        self,
+        query: str,
+        location: str = "United States",
+        num_results: int = 10,
+        timeout: Optional[float] = None,
+        next_page_token: Optional[str] = None,
+    ) -> dict:
+        """Request one page of Google Jobs results (the first, or the one a token points to)"""
         if not self.api_key:
             raise ValueError(
                 "SERP_API_KEY environment variable or api_key parameter required"
@@ -36,34 +112,156 @@ class SerpAPIJobSearch:
             "api_key": self.api_key,
             "num": num_results,
         }
-
+        if next_page_token:
+            params["next_page_token"] = next_page_token
+        self.budget.spend()
         try:
-            response = requests.get(self.base_url, params=params)
+            response = cached_get(
+                "serp_api", self.base_url, params=params, timeout=timeout
+            )
             response.raise_for_status()
-            data = response.json()
-
-            jobs = []
-            for job_data in data.get("jobs_results", []):
-                job = JobPosting(
-                    title=job_data.get("title", ""),
-                    company=job_data.get("company_name", ""),
-                    location=job_data.get("location", ""),
-                    description=job_data.get("description", ""),
-                    url=job_data.get("share_link", ""),
-                    posted_date=job_data.get("detected_extensions", {}).get(
-                        "posted_at", ""
-                    ),
-                    source="Google Jobs (SerpAPI)",
-                )
-                jobs.append(job)
+        except Exception:
+            self.budget.refund()  # failed searches aren't billed
+            raise
+        self.budget.settle(getattr(response, "from_cache", False))
+        return response.json()
 
-            return jobs
+    def iter_pages(
+        self,
+        query: str,
+        location: str = "United States",
+        num_results: int = 10,
+        timeout: Optional[float] = None,
+        keep_going: Optional[Callable[[List[JobPosting]], bool]] = None,
+    ) -> Iterator[List[JobPosting]]:
+        """
+        Yield each result page's postings until num_results are covered, the
+        results run out, keep_going(postings) says stop, or the credit
+        budget is spent. The next page is requested as soon as the current
+        one arrives, so it downloads while the caller works through the
+        current one.
+        """
+        args = (query, location, min(num_results, PAGE_SIZE), timeout)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future: Optional[Future] = pool.submit(self.fetch_jobs, *args)
+            results = 0
+            try:
+                while future is not None:
+                    try:
+                        data = future.result()
+                    except CreditBudgetExceeded as e:
+                        logger.warning(f"Stopped paging '{query}': {e}")
+                        return
+                    future = None
+                    jobs = list(self.parse_jobs(data))
+                    results += len(jobs)
+                    token = data.get("serpapi_pagination", {}).get("next_page_token")
+                    if (
+                        token
+                        and results < num_results
+                        and not self.budget.exhausted
+                        and (keep_going is None or keep_going(jobs))
+                    ):
+                        future = pool.submit(
+                            self.fetch_jobs, *args, next_page_token=token
+                        )
+                    yield jobs
+            finally:
+                if future is not None:
+                    future.cancel()
+
+    def parse_jobs(self, data: dict) -> Iterator[JobPosting]:
+        """Yield a JobPosting for each Google Jobs result"""
+        for job_data in data.get("jobs_results", []):
+            posted_date = job_data.get("detected_extensions", {}).get("posted_at", "")
+            yield JobPosting(
+                title=job_data.get("title", ""),
+                company=job_data.get("company_name", ""),
+                location=job_data.get("location", ""),
+                description=job_data.get("description", ""),
+                url=job_data.get("share_link", ""),
+                posted_date=posted_date,
+                posted_at=parse_posted_date(posted_date),
+                source=SOURCE_LABEL,
+            )
+
+    def search_jobs(
+        self,
+        query: str,
+        location: str = "United States",
+        num_results: int = 10,
+        timeout: Optional[float] = None,
+    ) -> List[JobPosting]:
+        """
+        Search for jobs using SerpAPI (Google Jobs)
+        No authentication required beyond API key
+        """
+        try:
+            return [
+                job
+                for jobs in self.iter_pages(query, location, num_results, timeout)
+                for job in jobs
+            ][:num_results]
 
-        except requests.RequestException as e:
-            print(f"Error searching jobs via SerpAPI: {e}")
+        except httpx.HTTPError as e:
+            logger.error(f"Error searching jobs via SerpAPI: {e}")
             return []
 
 
+class SerpAPISource:
+    """JobSource streaming Google Jobs results via SerpAPI"""
+
+    name = "serp_api"
+
+    def __init__(self, searcher: Optional[SerpAPIJobSearch] = None):
+        self.searcher = searcher or SerpAPIJobSearch()
+
+    async def stream(
+        self,
+        query: JobSearchQuery,
+        timeout: Optional[float] = None,
+        since: Optional[datetime] = None,
+    ) -> AsyncIterator[JobPosting]:
+        """Page through results, stopping at max_results or a page of seen postings"""
+
+        def has_unseen(jobs: List[JobPosting]) -> bool:
+            # results are ranked by relevance, not date: only a page with
+            # nothing newer than `since` says the rest is stale too
+            return since is None or any(
+                job.posted_at is None or job.posted_at >= since for job in jobs
+            )
+
+        pages = self.searcher.iter_pages(
+            query.keywords, query.location, query.max_results, timeout, has_unseen
+        )
+        emitted = 0
+        try:
+            while emitted < query.max_results:
+                jobs = await asyncio.to_thread(next, pages, None)
+                if jobs is None:
+                    break
+                for job in jobs:
+                    if since and job.posted_at and job.posted_at < since:
+                        continue
+                    yield job
+                    emitted += 1
+                    if emitted >= query.max_results:
+                        break
+        finally:
+            # ValueError: a cancelled next() is still running in its thread
+            with contextlib.suppress(ValueError):
+                await asyncio.to_thread(pages.close)
+
+
+@register_source("serp_api")
+def make_serp_api_source() -> Optional[SerpAPISource]:
+    searcher = SerpAPIJobSearch()
+    if not searcher.api_key:
+        logger.warning("can't initialize source SerpAPIJobSearch: check API key")
+        return None
+    return SerpAPISource(searcher)
+
+
 def search_ai_engineer_jobs(location: str = "United States") -> List[JobPosting]:
     """
     Convenience function to search for AI Engineer jobs
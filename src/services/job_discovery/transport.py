@@ -0,0 +1,195 @@
+"""
+Record / replay transport for the discovery sources
+
+Every source request goes through rate_limit.limited_get, which hands it to
+the process-wide transport when one is configured:
+  record - pass requests through & keep each response in an archive
+  replay - answer from the archive (nothing goes over the network), after a
+           simulated latency + jitter
+The archive is gzipped JSON lines keyed like the http cache (credentials
+stripped), so a recorded run can be replayed offline & deterministically.
+
+DISCOVERY_TRANSPORT=live|record|replay, DISCOVERY_ARCHIVE=path,
+REPLAY_LATENCY_MS, REPLAY_JITTER_MS, REPLAY_SEED
+"""
+
+import atexit
+import base64
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from core.db import PROJECT_ROOT
+from services.job_discovery.http_client import http_get
+
+DISCOVERY_TRANSPORT = os.getenv("DISCOVERY_TRANSPORT", "live")
+DISCOVERY_ARCHIVE = os.getenv(
+    "DISCOVERY_ARCHIVE", os.path.join(PROJECT_ROOT, "discovery_archive.jsonl.gz")
+)
+REPLAY_LATENCY_MS = float(os.getenv("REPLAY_LATENCY_MS", "0"))
+REPLAY_JITTER_MS = float(os.getenv("REPLAY_JITTER_MS", "0"))
+REPLAY_SEED = int(os.getenv("REPLAY_SEED", "0"))
+
+# response headers worth keeping in the archive
+KEPT_HEADERS = ("content-type", "etag", "last-modified", "retry-after")
+
+
+def request_key(url: str, params=None) -> str:
+    from services.job_discovery.http_cache import cache_key
+
+    return cache_key(url, params)
+
+
+def _encode_body(content: bytes) -> Dict[str, str]:
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"b64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(entry: dict) -> bytes:
+    if "text" in entry:
+        return entry["text"].encode("utf-8")
+    return base64.b64decode(entry["b64"])
+
+
+class RecordingTransport:
+    """Sends requests with the caller's session & archives every response"""
+
+    offline = False
+
+    def __init__(self, path: str = DISCOVERY_ARCHIVE):
+        self.path = path
+        self.entries: List[dict] = []
+        self._saved = 0
+        self._lock = threading.Lock()
+        atexit.register(self.save)
+
+    def get(self, session, url: str, params=None, **kwargs):
+        response = http_get(session, url, params=params, **kwargs)
+        parts = urlsplit(url)
+        entry = {
+            "key": request_key(url, params),
+            # no query string: it may carry credentials
+            "url": urlunsplit((parts.scheme, parts.netloc, parts.path, "", "")),
+            "status": response.status_code,
+            "headers": {
+                k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS
+            },
+            **_encode_body(response.content),
+        }
+        with self._lock:
+            self.entries.append(entry)
+        return response
+
+    def save(self) -> None:
+        with self._lock:
+            if len(self.entries) == self._saved:
+                return
+            with gzip.open(self.path, "wt", encoding="utf-8") as f:
+                for entry in self.entries:
+                    f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self._saved = len(self.entries)
+        print(f"Recorded {len(self.entries)} responses to {self.path}")
+
+
+class ReplayTransport:
+    """
+    Serves archived responses in recorded order per request (repeating the
+    last one), each after latency + uniform(0, jitter) seconds. The jitter
+    for the n-th replay of a request is seeded, so runs are repeatable.
+    """
+
+    offline = True
+
+    def __init__(
+        self,
+        path: str = DISCOVERY_ARCHIVE,
+        latency: float = REPLAY_LATENCY_MS / 1000,
+        jitter: float = REPLAY_JITTER_MS / 1000,
+        seed: int = REPLAY_SEED,
+    ):
+        self.path = path
+        self.latency = latency
+        self.jitter = jitter
+        self.seed = seed
+        self.responses: Dict[str, List[dict]] = defaultdict(list)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                self.responses[entry["key"]].append(entry)
+        self.replayed: Dict[str, int] = defaultdict(int)
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def delay_for(self, key: str, n: int) -> float:
+        rng = random.Random(f"{self.seed}:{key}:{n}")
+        return self.latency + rng.uniform(0, self.jitter)
+
+    def get(self, session, url: str, params=None, **kwargs):
+        from services.job_discovery.http_cache import CachedResponse
+
+        key = request_key(url, params)
+        with self._lock:
+            n = self.replayed[key]
+            self.replayed[key] += 1
+        time.sleep(self.delay_for(key, n))
+
+        recorded = self.responses.get(key)
+        if not recorded:
+            with self._lock:
+                self.misses += 1
+            print(f"No recorded response for {url}; replaying a 404")
+            return CachedResponse(url, 404, {}, b"")
+        entry = recorded[min(n, len(recorded) - 1)]
+        return CachedResponse(
+            entry["url"], entry["status"], entry["headers"], _decode_body(entry)
+        )
+
+    def summary(self) -> str:
+        return (
+            f"replayed {sum(self.replayed.values())} requests "
+            f"({self.misses} unrecorded) at {self.latency * 1000:.0f}ms "
+            f"+ {self.jitter * 1000:.0f}ms jitter"
+        )
+
+
+_transport = None
+_transport_lock = threading.Lock()
+_transport_configured = False
+
+
+def configure_transport(
+    mode: str = DISCOVERY_TRANSPORT, path: str = DISCOVERY_ARCHIVE, **replay_options
+):
+    """Install the process-wide transport (None for live requests)"""
+    if mode == "record":
+        transport = RecordingTransport(path)
+    elif mode == "replay":
+        transport = ReplayTransport(path, **replay_options)
+    elif mode == "live":
+        transport = None
+    else:
+        raise ValueError(f"unknown DISCOVERY_TRANSPORT '{mode}'")
+    return set_transport(transport)
+
+
+def set_transport(transport):
+    global _transport, _transport_configured
+    with _transport_lock:
+        _transport = transport
+        _transport_configured = True
+    return transport
+
+
+def get_transport():
+    """Process-wide transport, set up from the environment on first use"""
+    if not _transport_configured:
+        configure_transport()
+    return _transport
@@ -1,25 +1,207 @@
-from src.core.llm import make_llm
+import asyncio
+import os
+import re
+from typing import AsyncIterator, List, Optional, Tuple
+from core.description import CHARS_PER_TOKEN, clean_description, estimate_tokens
+from core.llm import get_llm, llm_concurrency, role_provider
 from langchain_core.messages import SystemMessage, HumanMessage
-from src.core.models import JobSummary
+from core.models import JobPosting, JobSummary
+from core.repositories import JobSummaryRepo
 
 SUMMARY_SYS = """
 You are a professional job description summarizer. Your task is to analyze job descriptions and create clear, **concise** summaries.
 Keep summaries factual, well-organized, and **easy to scan**. Use a maximum of 3 bullet points per section and a maximum of 25 words per bullet, use ';' instead of 'and ', there's no need to continually repeat the same word to describe the job, i.e. if the role is on the security team, use the word 'security' sparingly. put the exact, case-sensitive string: 'not listed' in places where the information is not available in the job description
 """
+EXTRACT_SYS = """
+You are reading one section of a longer job description. Extract only what this section states about: salary / pay, job type (full time, contract, ...), experience level, standout features (role & responsibilities, mission & culture, PTO & benefits) and qualifications (tech stack, skills, education, nice to haves).
+Reply with short bullet points under those headings and skip headings the section says nothing about. Never guess.
+"""
+
+# descriptions over this many tokens are summarized map-reduce style; a
+# small local model's context fills up long before a hosted model's does
+SUMMARY_INPUT_TOKENS = {
+    "ollama": int(os.getenv("OLLAMA_SUMMARY_INPUT_TOKENS", "1200")),
+    "azure": int(os.getenv("AZURE_OPENAI_SUMMARY_INPUT_TOKENS", "12000")),
+}
+DEFAULT_SUMMARY_INPUT_TOKENS = 1200
+
+# a line that opens a new section: "Requirements:", "What You'll Do", "## Benefits"
+HEADING_RE = re.compile(r"^(#+\s*\S.*|[A-Z][\w'’&/ ,()-]{1,60}:?)$")
+
+
+def is_heading(line: str) -> bool:
+    return (
+        len(line.split()) <= 6
+        and not line.endswith((".", ";", "!", "?"))
+        and bool(HEADING_RE.match(line))
+    )
+
+
+def split_sections(text: str, max_tokens: int) -> List[str]:
+    """
+    Chunks of at most ~max_tokens, split at section headings where possible,
+    else between paragraphs (and, for a huge paragraph, anywhere)
+    """
+    sections: List[List[str]] = [[]]
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if is_heading(line) and sections[-1]:
+            sections.append([])
+        sections[-1].append(line)
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces = []
+    for section in sections:
+        joined = "\n".join(section)
+        if estimate_tokens(joined) <= max_tokens:
+            pieces.append(joined)
+            continue
+        for line in section:
+            pieces.extend(
+                line[i : i + max_chars] for i in range(0, len(line), max_chars)
+            )
+
+    chunks: List[str] = []
+    for piece in pieces:
+        if chunks and estimate_tokens(chunks[-1] + "\n" + piece) <= max_tokens:
+            chunks[-1] += "\n" + piece
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+def llm_description(job: JobPosting) -> str:
+    """What the LLM gets: the cleaned text (cleaned now for older postings)"""
+    if job.description_text is None:
+        return clean_description(job.description).text
+    return job.description_text
+
+
+def copy_summary(
+    job: JobPosting, job_summary_repo: JobSummaryRepo
+) -> JobSummary | None:
+    """The canonical posting's summary, re-keyed to this duplicate"""
+    canonical_summary = job_summary_repo.get_by_job_post_id(job.canonical_posting_id)  # type: ignore[arg-type]
+    if canonical_summary is None:
+        return None
+    return JobSummary(
+        **canonical_summary.model_dump(exclude={"id", "created_at", "job_posting_id"}),
+        job_posting_id=job.id,
+    )
 
 
 class SummaryAgent:
     def __init__(self):
+        provider = role_provider("summary")
+        self.max_concurrency = llm_concurrency(provider)
+        self.max_input_tokens = SUMMARY_INPUT_TOKENS.get(
+            provider, DEFAULT_SUMMARY_INPUT_TOKENS
+        )
+        self.map_reduced = 0  # descriptions too long for a single call
         try:
-            self.llm = make_llm()
+            self.llm = get_llm("summary")
         except Exception as e:
             print(f"SummaryAgent error: {e}")
+            raise  # the summarize step / worker task reports it
 
-    def summarize_job(self, job_description: str | None = None) -> JobSummary:
-        prompt = [
+    @staticmethod
+    def prompt(job_description: str | None) -> list:
+        return [
             SystemMessage(content=SUMMARY_SYS),
             HumanMessage(content=job_description),
         ]
-        summary = self.llm.with_structured_output(JobSummary).invoke(input=prompt)
+
+    @staticmethod
+    def extract_prompt(chunk: str, part: int, parts: int) -> list:
+        return [
+            SystemMessage(content=EXTRACT_SYS),
+            HumanMessage(content=f"(section {part} of {parts})\n{chunk}"),
+        ]
+
+    @staticmethod
+    def reduce_prompt(notes: List[str]) -> list:
+        return SummaryAgent.prompt(
+            "Notes extracted from each section of one job description:\n\n"
+            + "\n\n".join(notes)
+        )
+
+    def chunks(self, job_description: str | None) -> List[str]:
+        """One chunk when the description fits a single call, else its sections"""
+        text = job_description or ""
+        if estimate_tokens(text) <= self.max_input_tokens:
+            return [text]
+        return split_sections(text, self.max_input_tokens)
+
+    def summarize_job(self, job_description: str | None = None) -> JobSummary:
+        structured = self.llm.with_structured_output(JobSummary)
+        chunks = self.chunks(job_description)
+        if len(chunks) == 1:
+            prompt = self.prompt(job_description)
+        else:
+            self.map_reduced += 1
+            notes = self.llm.batch(
+                [
+                    self.extract_prompt(chunk, i + 1, len(chunks))
+                    for i, chunk in enumerate(chunks)
+                ],
+                config={"max_concurrency": self.max_concurrency},
+            )
+            prompt = self.reduce_prompt([str(note.content) for note in notes])
+        summary = structured.invoke(input=prompt)
 
         return summary  # type: ignore[return-value]
+
+    async def asummarize_jobs(
+        self,
+        job_descriptions: List[str | None],
+        max_concurrency: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[int, JobSummary | Exception]]:
+        """
+        Summarize many descriptions with at most max_concurrency (default:
+        the provider's limit) LLM calls in flight, yielding (index, summary)
+        as each completes; a failed summary yields its exception instead of
+        raising. Long descriptions are summarized map-reduce style: their
+        sections' facts are extracted concurrently, then combined.
+        """
+        limit = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        structured = self.llm.with_structured_output(JobSummary)
+
+        async def call(runnable, prompt):
+            async with limit:
+                return await runnable.ainvoke(prompt)
+
+        async def summarize(i: int, job_description: str | None):
+            try:
+                chunks = self.chunks(job_description)
+                if len(chunks) == 1:
+                    return i, await call(structured, self.prompt(job_description))
+                self.map_reduced += 1
+                notes = await asyncio.gather(
+                    *(
+                        call(self.llm, self.extract_prompt(chunk, n + 1, len(chunks)))
+                        for n, chunk in enumerate(chunks)
+                    )
+                )
+                prompt = self.reduce_prompt([str(note.content) for note in notes])
+                return i, await call(structured, prompt)
+            except Exception as e:
+                return i, e
+
+        tasks = [
+            asyncio.ensure_future(summarize(i, description))
+            for i, description in enumerate(job_descriptions)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def asummarize_job(self, job_description: str | None = None) -> JobSummary:
+        [summary] = [s async for _, s in self.asummarize_jobs([job_description])]
+        if isinstance(summary, Exception):
+            raise summary
+        return summary
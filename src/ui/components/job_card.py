@@ -1,11 +1,14 @@
 import streamlit as st
 from core.models import JobPosting, JobSummary
 from core.utils import disappearing_message
-from services.apply.apply import create_job_app
+from core.task_queue import TASK_QUEUE
+from services.apply.apply import create_job_app, queue_job_apps
 
+# session_state key of a job card's "select" checkbox (for bulk apply)
+SELECT_KEY = "select_job_{}"
 
-def handle_create_app(job_post: str) -> None:
-    # todo -- make async
+
+def handle_create_app(job_post: str, job_posting_id: int | None = None) -> None:
     try:
         disappearing_message(
             st=st,
@@ -18,7 +21,20 @@ def handle_create_app(job_post: str) -> None:
             raise ValueError("No logged in user found.")
         if isinstance(user_id, list):
             user_id = user_id[0]
-        create_job_app(job_post, user_id=int(user_id))
+        if TASK_QUEUE and job_posting_id is not None:  # a worker writes them
+            queued = queue_job_apps([job_posting_id], user_id=int(user_id))
+            disappearing_message(
+                st=st,
+                message=(
+                    "Application materials queued!"
+                    if queued
+                    else "Application materials are already queued for this job."
+                ),
+                msg_type="success",
+                duration=2,
+            )
+            return
+        create_job_app(job_post, user_id=int(user_id), job_posting_id=job_posting_id)
         disappearing_message(
             st=st,
             message="Application materials created successfully!",
@@ -43,8 +59,12 @@ def render_job_card(job_post: JobPosting, job_summary: JobSummary):
             key=job_post.id,
             help="click here to create a resume & cover letter for this job",
             on_click=handle_create_app,
-            kwargs={"job_post": job_post.description},
+            kwargs={
+                "job_post": job_post.description_text or job_post.description,
+                "job_posting_id": job_post.id,
+            },
         )
+        apply_bttn.checkbox("select", key=SELECT_KEY.format(job_post.id))
 
     st.markdown(f"**{job_post.company}** · {job_post.location}")
 
@@ -1,12 +1,40 @@
 import streamlit as st
 from core.db import get_session
+from core.models import JobPosting
 from core.repositories import JobPostingRepo, JobSummaryRepo
-from ui.components.job_card import render_job_card
+from core.task_queue import TASK_QUEUE
+from services.apply.apply import create_job_apps, queue_job_apps
+from ui.components.job_card import SELECT_KEY, render_job_card
 
-# todo - add selector for job cards & bulk apply action (make apply async first)
 NUM_COLS = 3
 
 
+def handle_bulk_apply(jobs: list[JobPosting]) -> None:
+    try:
+        user_id = st.session_state.get("user_id")
+        if not user_id:
+            raise ValueError("No logged in user found.")
+        if isinstance(user_id, list):
+            user_id = user_id[0]
+        if TASK_QUEUE:  # workers write them
+            queued = queue_job_apps([job.id for job in jobs], user_id=int(user_id))  # type: ignore[misc]
+            st.success(
+                f"Application materials queued for {queued} job(s)"
+                f" ({len(jobs) - queued} already queued)."
+            )
+            return
+        results = create_job_apps(jobs, user_id=int(user_id))
+        failed = [(job, r) for job, r in zip(jobs, results) if isinstance(r, Exception)]
+        if len(failed) < len(jobs):
+            st.success(
+                f"Application materials created for {len(jobs) - len(failed)} job(s)!"
+            )
+        for job, error in failed:
+            st.error(f"Error creating application materials for {job.title}: {error}")
+    except Exception as e:
+        st.error(f"Error creating application materials: {str(e)}")
+
+
 db_session = get_session()
 jobs_repo = JobPostingRepo(db_session)
 summaries_repo = JobSummaryRepo(db_session)
@@ -34,6 +62,16 @@ jobs = jobs_repo.search_jobs(query=query, location=location_filter, sort_by=sort
 
 st.subheader(f"{len(jobs)} job(s) found")
 
+selected = [job for job in jobs if st.session_state.get(SELECT_KEY.format(job.id))]
+with st.sidebar:
+    st.button(
+        f"apply to {len(selected)} selected",
+        disabled=not selected,
+        help="create a resume & cover letter for each selected job",
+        on_click=handle_bulk_apply,
+        kwargs={"jobs": selected},
+    )
+
 if not jobs:
     st.info("No jobs match your filters yet. Try broadening your search.")
 
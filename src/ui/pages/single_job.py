@@ -132,7 +132,7 @@ with job_description:
 
     st.header("full post")
     if job_summary and job_post and job_post.description:
-        st.html(f"{job_post.description}")
+        st.html(f"{job_post.description_html or job_post.description}")
     else:
         st.markdown("No job description available.")
 
@@ -0,0 +1,256 @@
+"""
+Runs queued LLM tasks (see core.task_queue) until stopped, or until no
+task is due with --once. More slots / processes / machines (sharing the db
+file via DATABASE_PATH) all pull from the same queue.
+
+    python src/worker.py --slots 4 --processes 2
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from core.db import get_session, init_db
+from core.models import Task
+from core.repositories import (
+    CompanyInfoRepo,
+    JobPostingRepo,
+    JobSummaryRepo,
+    TaskRepo,
+)
+from core.llm import llm_concurrency
+from core.llm_routing import route_stats
+from core.run_report import RunReport
+from core.task_queue import (
+    APPLICATION,
+    COMPANY_REVIEW,
+    SUMMARIZE,
+    TASK_LEASE_SECONDS,
+    retry_delay,
+    worker_id,
+)
+from services.apply.apply import acreate_job_app
+from services.company_review.review import ReviewAgent
+from services.job_summary.summarize import SummaryAgent, copy_summary, llm_description
+
+logger = logging.getLogger("worker")
+
+# a task still running after this long is abandoned (& retried)
+TASK_TIMEOUT_SECONDS = 600.0
+POLL_SECONDS = 2.0
+
+
+async def summarize(payload: dict) -> str:
+    with get_session() as db:
+        job_posting_repo = JobPostingRepo(db)
+        job_summary_repo = JobSummaryRepo(db)
+        job = job_posting_repo.get_by_id(payload["job_posting_id"])
+        if job is None:
+            return "posting no longer exists"
+        if job.job_summary_id:
+            return f"already summarized ({job.job_summary_id})"
+        summary = None
+        if job.canonical_posting_id:
+            summary = copy_summary(job, job_summary_repo)
+        if summary is None:
+            summary = await SummaryAgent().asummarize_job(llm_description(job))
+            summary.job_posting_id = job.id
+        job_summary_repo.add_many([summary])
+        return f"summary {summary.id}"
+
+
+async def review_company(payload: dict) -> str:
+    company = payload["company"]
+    with get_session() as db:
+        company_info_repo = CompanyInfoRepo(db)
+        company_info = company_info_repo.get_by_name(company)
+        if company_info is None:
+            company_info = company_info_repo.add(
+                await ReviewAgent().areview_company(company)
+            )
+        linked = JobPostingRepo(db).link_company(company, company_info.id)  # type: ignore[arg-type]
+        return f"company info {company_info.id}, {linked} posting(s) linked"
+
+
+async def create_application(payload: dict) -> str:
+    with get_session() as db:
+        job = JobPostingRepo(db).get_by_id(payload["job_posting_id"])
+    if job is None:
+        return "posting no longer exists"
+    materials = await acreate_job_app(
+        job.description_text or job.description, payload["user_id"], job.id
+    )
+    return f"application materials {materials.id}"
+
+
+HANDLERS: Dict[str, Callable[[dict], Awaitable[str]]] = {
+    SUMMARIZE: summarize,
+    COMPANY_REVIEW: review_company,
+    APPLICATION: create_application,
+}
+
+
+async def run_task(task: Task) -> Optional[str]:
+    return await asyncio.wait_for(
+        HANDLERS[task.kind](json.loads(task.payload)), timeout=TASK_TIMEOUT_SECONDS
+    )
+
+
+def finish(
+    task_repo: TaskRepo,
+    worker: str,
+    task: Task,
+    future: asyncio.Future,
+    report: RunReport,
+) -> None:
+    """Record a finished task: done, back in the queue for a retry, or failed"""
+    error = future.exception()
+    if error is None:
+        task_repo.complete(task.id, worker, future.result())  # type: ignore[arg-type]
+        logger.info(f"Task {task.id} ({task.kind}) done: {future.result()}")
+        report.incr("tasks_done")
+        return
+    message = f"{type(error).__name__}: {error}"
+    if task.attempts < task.max_attempts:
+        delay = retry_delay(task.attempts)
+        task_repo.fail(task.id, worker, message, retry_at=time.time() + delay)  # type: ignore[arg-type]
+        logger.warning(
+            f"Task {task.id} ({task.kind}) attempt {task.attempts} failed, "
+            f"retrying in {delay:.0f}s: {message}"
+        )
+        report.incr("tasks_retried")
+    else:
+        task_repo.fail(task.id, worker, message)  # type: ignore[arg-type]
+        logger.error(f"Task {task.id} ({task.kind}) failed for good: {message}")
+        report.incr("tasks_failed")
+
+
+async def run_worker(
+    slots: int,
+    batch_size: int,
+    kinds: Optional[List[str]] = None,
+    once: bool = False,
+    lease_seconds: float = TASK_LEASE_SECONDS,
+    poll_seconds: float = POLL_SECONDS,
+) -> RunReport:
+    """
+    Keep up to `slots` tasks running, claiming at most batch_size at a
+    time, & renew their leases while they run
+    """
+    worker = worker_id()
+    report = RunReport()
+    started = time.monotonic()
+    running: Dict[asyncio.Future, Task] = {}
+    renewed = time.monotonic()
+    with get_session() as db:
+        task_repo = TaskRepo(db)
+        try:
+            while True:
+                free = slots - len(running)
+                if free:
+                    claimed = task_repo.claim(
+                        worker, min(free, batch_size), lease_seconds, time.time(), kinds
+                    )
+                    report.incr("tasks_claimed", len(claimed))
+                    for task in claimed:
+                        if task.kind not in HANDLERS:
+                            error = f"no handler for task kind '{task.kind}'"
+                        elif task.attempts > task.max_attempts:  # lease kept expiring
+                            error = "out of attempts (lease expired)"
+                        else:
+                            running[asyncio.ensure_future(run_task(task))] = task
+                            continue
+                        task_repo.fail(task.id, worker, error)  # type: ignore[arg-type]
+                        logger.error(f"Task {task.id} ({task.kind}) failed: {error}")
+                        report.incr("tasks_failed")
+                if not running:
+                    if once:
+                        break
+                    await asyncio.sleep(poll_seconds)
+                    continue
+                done, _ = await asyncio.wait(
+                    running, timeout=poll_seconds, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    finish(task_repo, worker, running.pop(future), future, report)
+                if running and time.monotonic() - renewed >= lease_seconds / 3:
+                    task_repo.extend_leases(
+                        [task.id for task in running.values()],  # type: ignore[misc]
+                        worker,
+                        time.time() + lease_seconds,
+                    )
+                    renewed = time.monotonic()
+        finally:
+            # unfinished tasks are reclaimed by any worker once their lease ends
+            for future in running:
+                future.cancel()
+            elapsed = time.monotonic() - started
+            finished = report.counters["tasks_done"] + report.counters["tasks_failed"]
+            report.set("tasks_per_minute", finished / max(elapsed, 1e-6) * 60)
+            report.note(f"Worker {worker}: {task_repo.counts()} tasks in the queue")
+            if route_stats.calls:
+                report.note(f"LLM routes: {route_stats.summary()}")
+    return report
+
+
+def work(slots: int, batch_size: int, kinds: Optional[List[str]], once: bool) -> None:
+    """One worker process"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(process)d - %(levelname)s - %(message)s",
+    )
+    try:
+        report = asyncio.run(run_worker(slots, batch_size, kinds, once))
+    except KeyboardInterrupt:
+        return
+    report.log(logger)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--slots",
+        type=int,
+        default=llm_concurrency(),
+        help="tasks run at once per process (default: the LLM provider's limit)",
+    )
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument(
+        "--batch", type=int, default=8, help="most tasks claimed at a time"
+    )
+    parser.add_argument(
+        "--kind",
+        action="append",
+        choices=sorted(HANDLERS),
+        help="only run these kinds of task (repeatable)",
+    )
+    parser.add_argument("--once", action="store_true", help="exit once no task is due")
+    args = parser.parse_args()
+
+    init_db()
+    if args.processes <= 1:
+        work(args.slots, args.batch, args.kind, args.once)
+        return
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=work, args=(args.slots, args.batch, args.kind, args.once)
+        )
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import os
+import sys
+import unittest
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from core.description import BoilerplateLibrary, clean_description, paragraph_hash
+
+EEO = (
+    "Acme is an equal opportunity employer. All qualified applicants will "
+    "receive consideration without regard to race, color, religion or sex."
+)
+PAY = (
+    "Pay transparency: the base salary range for this role is $150,000 - "
+    "$190,000, plus equity. We are an equal opportunity employer."
+)
+
+
+class BoilerplateTest(unittest.TestCase):
+    def test_short_eeo_statement_dropped(self):
+        text = clean_description(f"<p>Build APIs in Go.</p><p>{EEO}</p>").text
+        self.assertEqual(text, "Build APIs in Go.")
+
+    def test_pay_figures_kept(self):
+        self.assertIn("$150,000", clean_description(f"<p>{PAY}</p>").text)
+        self.assertIn("120k", clean_description("Salary: 120k - 140k DOE").text)
+
+    def test_pay_figures_kept_even_when_repeated(self):
+        library = BoilerplateLibrary({paragraph_hash(PAY): 10})
+        self.assertFalse(library.is_boilerplate(PAY))
+
+    def test_long_paragraph_mentioning_eeo_kept(self):
+        long = "You will own our hiring platform end to end. " * 10 + EEO
+        self.assertFalse(BoilerplateLibrary().is_boilerplate(long))
+
+    def test_repeated_paragraph_dropped(self):
+        blurb = "We offer great benefits, a remote-first culture and a generous learning budget."
+        library = BoilerplateLibrary()
+        for _ in range(3):
+            library.observe([blurb])
+        self.assertTrue(library.is_boilerplate(blurb))
+
+
+if __name__ == "__main__":
+    unittest.main()
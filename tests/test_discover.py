@@ -0,0 +1,133 @@
+import asyncio
+import os
+import sys
+import unittest
+from datetime import datetime, timezone
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from core.models import JobPosting, JobSearchQuery
+from services.job_discovery.discover import (
+    JobDiscoveryService,
+    _FetchDone,
+    abatched,
+    watermark_key,
+)
+
+KEY = ("remote_ok", "ai engineer", None)
+
+
+def day(n: int) -> datetime:
+    return datetime(2025, 1, n, tzinfo=timezone.utc)
+
+
+def posting(title: str, posted_day: int) -> JobPosting:
+    return JobPosting(
+        title=title,
+        company="Acme",
+        location="Remote",
+        description="",
+        url=f"https://example.com/{title}",
+        source="fake",
+        posted_at=day(posted_day),
+    )
+
+
+class FakeSource:
+    uses_location = False
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+
+    async def stream(self, query, timeout=None, since=None):
+        for job in self.jobs:
+            yield job
+
+
+class AdvanceWatermarkTest(unittest.TestCase):
+    def setUp(self):
+        self.service = JobDiscoveryService()
+
+    def test_advances_from_empty(self):
+        self.service._yielded(KEY, posting("a", 2))
+        self.service._advance(_FetchDone(KEY, True, 3))
+        self.assertEqual(self.service.high_water[watermark_key(KEY)], day(2))
+        self.assertEqual(self.service.last_yields[watermark_key(KEY)], 3)
+
+    def test_keeps_the_newest(self):
+        for posted_day in (3, 1):
+            self.service._yielded(KEY, posting("a", posted_day))
+            self.service._advance(_FetchDone(KEY, True, 1))
+        self.assertEqual(self.service.high_water[watermark_key(KEY)], day(3))
+
+    def test_incomplete_fetch_leaves_no_mark(self):
+        self.service._yielded(KEY, posting("a", 2))
+        self.service._advance(_FetchDone(KEY, False, 2))
+        self.assertNotIn(watermark_key(KEY), self.service.high_water)
+
+
+class CappedFetchTest(unittest.TestCase):
+    def run_query(self, sources, max_results: int):
+        service = JobDiscoveryService(concurrent=False)
+        service.sources = sources
+        query = JobSearchQuery(keywords="ai engineer", max_results=max_results)
+
+        async def run():
+            return [job async for job in service.astream_jobs(query)]
+
+        jobs = asyncio.run(run())
+        marks = {source: mark for (source, _), mark in service.high_water.items()}
+        return jobs, marks
+
+    def test_capped_source_keeps_its_old_mark(self):
+        a = FakeSource([posting("a1", 3), posting("a2", 2)])
+        b = FakeSource([posting("b1", 4), posting("b2", 1)])
+        jobs, marks = self.run_query([("a", a), ("b", b)], max_results=2)
+        self.assertEqual([job.title for job in jobs], ["a1", "a2"])
+        self.assertEqual(marks, {"a": day(3)})
+
+    def test_partly_capped_source_keeps_its_old_mark(self):
+        a = FakeSource([posting("a1", 3), posting("a2", 2), posting("a3", 1)])
+        jobs, marks = self.run_query([("a", a)], max_results=2)
+        self.assertEqual(len(jobs), 2)
+        self.assertEqual(marks, {})
+
+    def test_mark_is_newest_yielded_not_newest_seen(self):
+        a = FakeSource([posting("a1", 3)])
+        # b's newest posting duplicates a's & isn't yielded
+        b = FakeSource([posting("a1", 5), posting("b2", 2)])
+        jobs, marks = self.run_query([("a", a), ("b", b)], max_results=10)
+        self.assertEqual([job.title for job in jobs], ["a1", "b2"])
+        self.assertEqual(marks, {"a": day(3), "b": day(2)})
+
+
+class BatchedTest(unittest.TestCase):
+    def collect(self, stream, max_size: int = 25):
+        async def run():
+            return [batch async for batch in abatched(stream, max_size)]
+
+        return asyncio.run(run())
+
+    def test_regroups_the_stream(self):
+        async def stream():
+            for i in range(5):
+                yield i
+
+        batches = self.collect(stream(), max_size=2)
+        self.assertEqual([i for batch in batches for i in batch], list(range(5)))
+        self.assertTrue(all(len(batch) <= 2 for batch in batches))
+
+    def test_stream_error_is_raised(self):
+        async def stream():
+            yield 1
+            yield 2
+            raise TypeError("boom")
+
+        with self.assertRaises(TypeError):
+            self.collect(stream())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import sys
+import unittest
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from core.fingerprint import canonical_url, same_role
+from core.models import JobPosting
+
+
+class CanonicalUrlTest(unittest.TestCase):
+    def test_empty(self):
+        self.assertIsNone(canonical_url(None))
+        self.assertIsNone(canonical_url(""))
+
+    def test_host_fragment_slash_and_query_order(self):
+        self.assertEqual(
+            canonical_url("http://WWW.Example.com/jobs/42/?b=2&a=1#apply"),
+            "https://example.com/jobs/42?a=1&b=2",
+        )
+
+    def test_tracking_params_dropped(self):
+        self.assertEqual(
+            canonical_url(
+                "https://example.com/job?id=7&utm_source=x&utm_medium=y&gclid=z&ref=feed"
+            ),
+            "https://example.com/job?id=7",
+        )
+
+    def test_indeed_keeps_only_jk(self):
+        self.assertEqual(
+            canonical_url("https://www.indeed.com/viewjob?jk=abc123&from=serp&vjs=3"),
+            "https://indeed.com/viewjob?jk=abc123",
+        )
+
+    def test_indeed_sponsored_links_stay_distinct(self):
+        first = canonical_url("https://www.indeed.com/pagead/clk?mo=r&ad=AAA&p=1")
+        second = canonical_url("https://www.indeed.com/pagead/clk?mo=r&ad=BBB&p=2")
+        self.assertEqual(first, "https://indeed.com/pagead/clk?ad=AAA&mo=r&p=1")
+        self.assertNotEqual(first, second)
+
+
+def posting(title, company):
+    return JobPosting(title=title, company=company, location="Remote", source="test")
+
+
+class SameRoleTest(unittest.TestCase):
+    def test_same_company_similar_title(self):
+        self.assertTrue(
+            same_role(
+                posting("Senior Backend Engineer", "Acme, Inc."),
+                posting("Senior Backend Engineer (Remote)", "ACME Inc"),
+            )
+        )
+
+    def test_other_company(self):
+        self.assertFalse(
+            same_role(
+                posting("Backend Engineer", "Acme"),
+                posting("Backend Engineer", "Globex"),
+            )
+        )
+
+    def test_other_role_at_same_company(self):
+        self.assertFalse(
+            same_role(
+                posting("Backend Engineer", "Acme"),
+                posting("Product Designer", "Acme"),
+            )
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()